@@ -1,12 +1,18 @@
 
 from __future__ import annotations
 
+import asyncio
 from datetime import timedelta
 import logging
 
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import dt as dt_util, slugify
 
 from .const import (
     DOMAIN,
@@ -15,26 +21,90 @@ from .const import (
     CONF_TOKEN,
     CONF_POLL_SECONDS,
     CONF_REQUEST_TIMEOUT,
+    CONF_RECORD_TRACE,
+    CONF_ALIGN_POLLS,
+    CONF_MAX_FAILED_POLLS,
+    CONF_MAX_STALE_SECONDS,
+    CONF_SCHEDULE,
+    CONF_SALT_LOW_PPM,
+    CONF_VERIFY_WRITES,
     DEFAULT_POLL_SECONDS,
     DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_ALIGN_POLLS,
+    DEFAULT_MAX_FAILED_POLLS,
+    DEFAULT_MAX_STALE_SECONDS,
+    DEFAULT_VERIFY_WRITES,
+    PLATFORMS,
+    SERVICE_PROFILE,
+    ATTR_DURATION,
+    TRACE_DIR,
+    TOPOLOGY_STORAGE_VERSION,
+    SCHEDULE_STORAGE_VERSION,
 )
 from .api import PoolSyncApi
 from .coordinator import PoolSyncCoordinator
+from .events import DEFAULT_SALT_LOW_PPM, TransitionDetector
+from .fleet import async_get_fleet, async_track_hub
+from .model import HubTopology
+from .profiler import (
+    DEFAULT_PROFILE_SECONDS,
+    MAX_PROFILE_SECONDS,
+    PROFILER,
+    profile_seconds_from_env,
+)
+from .schedule import PoolSyncScheduler, Schedule
+from .statistics import PoolSyncStatistics
+from .trace import SnapshotTraceRecorder, TraceWriter
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[str] = [
-    "sensor",
-    "switch",
-    "number",
-    "binary_sensor",
-    "climate",
-    "button",
-]
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_PROFILE_SECONDS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PROFILE_SECONDS)
+        ),
+    }
+)
+
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    async def _async_handle_profile(call: ServiceCall) -> None:
+        _async_start_profile(hass, call.data[ATTR_DURATION])
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, _async_handle_profile, schema=PROFILE_SCHEMA
+    )
+
+    if seconds := profile_seconds_from_env():
+        _async_start_profile(hass, seconds)
+
     return True
 
+
+def _async_start_profile(hass: HomeAssistant, seconds: int) -> None:
+    """Profile for a bounded window, then write the report to the config dir."""
+    if not PROFILER.start():
+        _LOGGER.warning("PoolSync profiling is already running")
+        return
+    _LOGGER.warning("PoolSync profiling started for %ss", seconds)
+
+    async def _async_finish() -> None:
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            report = PROFILER.stop()
+        stamp = dt_util.now().strftime("%Y%m%d-%H%M%S")
+        path = hass.config.path(f"poolsync_profile_{stamp}.txt")
+        await hass.async_add_executor_job(_write_report, path, report)
+        _LOGGER.warning("PoolSync profile written to %s", path)
+
+    hass.async_create_background_task(_async_finish(), "poolsync_profile")
+
+
+def _write_report(path: str, report: str) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(report)
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})
 
@@ -57,12 +127,80 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass=hass,
         api=api,
         scan_interval=timedelta(seconds=poll_seconds),
+        store=_topology_store(hass, entry),
+        align_polls=bool(data.get(CONF_ALIGN_POLLS, DEFAULT_ALIGN_POLLS)),
+        max_failed_polls=int(data.get(CONF_MAX_FAILED_POLLS, DEFAULT_MAX_FAILED_POLLS)),
+        max_stale=timedelta(
+            seconds=int(data.get(CONF_MAX_STALE_SECONDS, DEFAULT_MAX_STALE_SECONDS))
+        ),
     )
-    await coordinator.async_config_entry_first_refresh()
+
+    coordinator.verify_writes = bool(data.get(CONF_VERIFY_WRITES, DEFAULT_VERIFY_WRITES))
+
+    # poolsync_* events for boost/fault/online/compressor/salt transitions
+    salt_low = int(data.get(CONF_SALT_LOW_PPM, DEFAULT_SALT_LOW_PPM))
+    coordinator.events = TransitionDetector(salt_low_ppm=salt_low or None)
+
+    # Troubleshooting: record every response for tests/replay.py
+    if data.get(CONF_RECORD_TRACE):
+        hub = slugify(data.get("mac") or entry.entry_id)
+        coordinator.trace = SnapshotTraceRecorder(
+            hass, TraceWriter(hass.config.path(TRACE_DIR, f"{hub}.jsonl.gz"))
+        )
+        entry.async_on_unload(coordinator.trace.async_close)
+
+    if await coordinator.async_load_topology():
+        # Known hub: register entities now (restored state) and poll in the
+        # background, so a slow or dead hub doesn't hold up startup
+        coordinator.async_refresh_in_background(entry)
+    else:
+        await coordinator.async_config_entry_first_refresh()
 
     hass.data[DOMAIN][entry.entry_id] = {"api": api, "coordinator": coordinator}
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Hub counters go to long-term statistics in hourly batches
+    if "recorder" in hass.config.components:
+        statistics = PoolSyncStatistics(
+            hass,
+            hub_id=api.mac_address or data.get("mac") or entry.entry_id,
+            title=entry.title,
+        )
+        statistics.async_record(coordinator.data)
+        # Unload callbacks run last-registered first: stop recording, then flush
+        entry.async_on_unload(statistics.async_flush)
+        entry.async_on_unload(
+            coordinator.async_add_listener(
+                lambda: statistics.async_record(coordinator.data)
+            )
+        )
+
+    # Site-wide roll-ups, updated as this hub publishes
+    entry.async_on_unload(
+        async_track_hub(async_get_fleet(hass), entry.entry_id, coordinator)
+    )
+
+    # Only the platforms this hub's devices have entities on; Home Assistant
+    # imports a platform module the first time it is forwarded
+    topology = coordinator.topology or HubTopology()
+    platforms = topology.platforms
+    hass.data[DOMAIN][entry.entry_id]["platforms"] = platforms
+    await hass.config_entries.async_forward_entry_setups(entry, platforms)
+    entry.async_on_unload(
+        coordinator.async_add_topology_listener(
+            lambda new: _async_topology_changed(hass, entry, topology, new)
+        )
+    )
+
+    # Time-based targets for the chlorinator and heat pump: one timer per hub
+    try:
+        schedule = Schedule.parse(data.get(CONF_SCHEDULE))
+    except ValueError as err:
+        _LOGGER.error("PoolSync schedule ignored: %s", err)
+        schedule = Schedule()
+    scheduler = PoolSyncScheduler(hass, coordinator, schedule, _schedule_store(hass, entry))
+    hass.data[DOMAIN][entry.entry_id]["scheduler"] = scheduler
+    await scheduler.async_start()
+    entry.async_on_unload(scheduler.async_stop)
 
     _LOGGER.debug(
         "PoolSync setup complete: base_url=%s, user_id=%s, poll=%ss, timeout=%ss",
@@ -76,13 +214,47 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     return True
 
+@callback
+def _async_topology_changed(
+    hass: HomeAssistant, entry: ConfigEntry, setup: HubTopology, topology: HubTopology
+) -> None:
+    """Reload when the hub reports a device type it didn't have at setup.
+
+    The reload forwards the new type's platforms and adds its entities to the
+    platforms already loaded.
+    """
+    if added := topology.types - setup.types:
+        _LOGGER.info(
+            "PoolSync hub %s reports new devices %s; reloading",
+            entry.title,
+            ", ".join(sorted(added)),
+        )
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    runtime = hass.data[DOMAIN].get(entry.entry_id, {})
+    unload_ok = await hass.config_entries.async_unload_platforms(
+        entry, runtime.get("platforms", PLATFORMS)
+    )
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id, None)
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await _topology_store(hass, entry).async_remove()
+    await _schedule_store(hass, entry).async_remove()
+
+
+def _topology_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    return Store(hass, TOPOLOGY_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.topology")
+
+
+def _schedule_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    return Store(hass, SCHEDULE_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.schedule")
+
+
 async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
     await hass.config_entries.async_reload(entry.entry_id)
@@ -5,8 +5,10 @@ import asyncio
 import json
 import logging
 import os
+import time
 import uuid
-from typing import Any, Dict, Optional, Tuple
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 
 import aiohttp
 from aiohttp import ClientSession, ClientTimeout
@@ -14,8 +16,114 @@ from aiohttp import ClientSession, ClientTimeout
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
+from .metrics import (
+    ERROR_CLIENT,
+    ERROR_HTTP_STATUS,
+    ERROR_OTHER,
+    ERROR_PARSE,
+    ERROR_TIMEOUT,
+    AdaptiveTimeout,
+    PayloadRing,
+    RequestMetrics,
+)
+from .profiler import PROFILER
+from .util import REDACT_KEYS, LazyRedact, RequestLogSampler
+
 _LOGGER = logging.getLogger(__name__)
 UNMASK_LOGS = bool(int(os.environ.get("POOLSYNC_UNMASK_LOGS", "0")))
+# Debug-log one in this many successful requests per hub (1 = all of them)
+LOG_SAMPLE_EVERY = int(os.environ.get("POOLSYNC_LOG_SAMPLE", "20"))
+# The same failure on one hub is logged at most once per this many seconds
+LOG_ERROR_INTERVAL = 60.0
+# Characters of a response body that make it into the log
+LOG_BODY_CHARS = 300
+# Methods whose timeout follows the hub's latency (the rest use the default)
+ADAPTIVE_TIMEOUT_METHODS = ("GET", "PATCH")
+
+# Per-poll timeout while waiting for the LINK button
+PUSHLINK_POLL_TIMEOUT = 5.0
+# Extra seconds allowed past the hub's reported timeRemaining
+PUSHLINK_WINDOW_SLACK = 1.0
+# Each answer that the button isn't pressed yet stretches the next pause by
+# this, up to PUSHLINK_BACKOFF times poll_interval
+PUSHLINK_BACKOFF_STEP = 1.2
+PUSHLINK_BACKOFF = 4.0
+
+# Verified writes read the device back at once, then after each of these delays
+VERIFY_DELAYS: Tuple[float, ...] = (0.5, 1.0, 2.0)
+# Numbers the hub echoes back (setpoints) may come back as float or int
+VERIFY_TOLERANCE = 0.01
+
+
+class PoolSyncRequestError(RuntimeError):
+    """A request without a usable answer; ``status`` is 0 when none arrived."""
+
+    def __init__(self, message: str, status: int) -> None:
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def transient(self) -> bool:
+        """Worth retrying soon: no answer, a server error or a garbled body."""
+        return not 400 <= self.status < 500
+
+
+class PoolSyncVerifyError(RuntimeError):
+    """A write the hub accepted but didn't apply within the verify window."""
+
+    def __init__(self, device_index: int, expected: Dict[str, Any], actual: Any) -> None:
+        super().__init__(
+            f"device {device_index} did not apply {expected}: config is {actual}"
+        )
+        self.device_index = device_index
+        self.expected = expected
+        self.actual = actual
+
+
+def value_matches(actual: Any, expected: Any) -> bool:
+    """Whether a config value reported by the hub equals one we wrote."""
+    if isinstance(expected, bool):
+        return actual is not None and bool(actual) == expected
+    if isinstance(expected, (int, float)):
+        try:
+            return abs(float(actual) - expected) <= VERIFY_TOLERANCE
+        except (TypeError, ValueError):
+            return False
+    return actual == expected
+
+
+def pushlink_interval(poll_interval: float, waiting: int, remaining: float) -> float:
+    """Pause before the next push-link poll.
+
+    ``waiting`` is how many answers in a row said the button isn't pressed
+    yet. The first polls go at ``poll_interval``, so an early press gets its
+    token as fast as before; a longer wait backs off gradually, and the last
+    seconds of the window (``remaining``) are polled at ``poll_interval`` again.
+    """
+    stretch = PUSHLINK_BACKOFF_STEP ** max(0, waiting - 1)
+    backed_off = poll_interval * min(PUSHLINK_BACKOFF, stretch)
+    return min(backed_off, max(poll_interval, remaining / PUSHLINK_BACKOFF))
+
+
+def _readback(device: Dict[str, Any], config: Dict[str, Any], key: str) -> Any:
+    """The value a device reports for a field we PATCH."""
+    if key == "boostMode":
+        # Write-only: the hub reports a boost as minutes left, not as a flag
+        status = device.get("status")
+        remaining = status.get("boostRemaining") if isinstance(status, dict) else None
+        try:
+            return float(remaining) > 0
+        except (TypeError, ValueError):
+            return None
+    return config.get(key)
+
+
+def _applied(device: Any, payload: Dict[str, Any]) -> bool:
+    """Whether the device reports every field of a PATCH payload."""
+    config = device.get("config") if isinstance(device, dict) else None
+    if not isinstance(config, dict):
+        return False
+    return all(value_matches(_readback(device, config, k), v) for k, v in payload.items())
 
 
 class PoolSyncApi:
@@ -36,12 +144,79 @@ class PoolSyncApi:
         self.user_id = user_id or None  # device expects a lower-case 'user' header; may be None
         self.mac_address: Optional[str] = None
         self._session: ClientSession = session or async_get_clientsession(hass)
-        # default timeout used when a call doesn't provide one explicitly
+        # Upper bound for calls that don't pass a timeout explicitly
         self._default_timeout: float = float(request_timeout) if request_timeout else 15.0
+        self.timeouts = {
+            method: AdaptiveTimeout(self._default_timeout) for method in ADAPTIVE_TIMEOUT_METHODS
+        }
+        self.metrics = RequestMetrics()
+        # Cleared when the hub rejects GET cmd=devices&device=<n> read-backs
+        self.device_read_supported = True
+        self.recent_payloads = PayloadRing()
+        self.log_sampler = RequestLogSampler(LOG_SAMPLE_EVERY, LOG_ERROR_INTERVAL)
+
+    @property
+    def base_url(self) -> str:
+        return self._base_url
+
+    @property
+    def default_timeout(self) -> float:
+        return self._default_timeout
+
+    def timeout_for(self, method: str) -> float:
+        """Timeout for a request that doesn't pass one explicitly."""
+        adaptive = self.timeouts.get(method)
+        return adaptive.value if adaptive is not None else self._default_timeout
+
+    def base_headers(self) -> Dict[str, str]:
+        headers = {
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        }
+        if self.token:
+            headers["Authorization"] = self.token
+        if self.user_id:
+            headers["user"] = self.user_id  # device requires a lowercase 'user' header
+        return headers
 
     # -----------------------
     # Internal request helper
     # -----------------------
+    def _log_response(
+        self, endpoint: str, status: int, latency: float, text: str, parsed: Any
+    ) -> None:
+        if status != 200:
+            self._log_failure(endpoint, f"HTTP {status}", f"status={status}")
+            return
+        if not self.log_sampler.success():
+            return
+        _LOGGER.debug(
+            "hub=%s request=%r status=%s latency_ms=%.0f bytes=%d body=%s",
+            self._base_url,
+            endpoint,
+            status,
+            latency * 1000.0,
+            len(text),
+            LazyRedact(
+                text if UNMASK_LOGS or parsed is None else parsed,
+                LOG_BODY_CHARS,
+                keys=frozenset() if UNMASK_LOGS else REDACT_KEYS,
+                secrets=() if UNMASK_LOGS else (self.token, self.user_id),
+            ),
+        )
+
+    def _log_failure(self, endpoint: str, key: str, detail: str) -> None:
+        suppressed = self.log_sampler.failure(f"{endpoint} {key}")
+        if suppressed is None:
+            return
+        _LOGGER.debug(
+            "hub=%s request=%r failed: %s%s",
+            self._base_url,
+            endpoint,
+            detail,
+            f" ({suppressed} repeats suppressed)" if suppressed else "",
+        )
+
     async def _request_json(
         self,
         method: str,
@@ -56,18 +231,13 @@ class PoolSyncApi:
         params = params or {}
         headers = headers or {}
 
-        base_headers = {
-            "Accept": "application/json",
-            "Accept-Encoding": "gzip, deflate",
-        }
-        if self.token:
-            base_headers["Authorization"] = self.token
-        if self.user_id:
-            base_headers["user"] = self.user_id  # device requires a lowercase 'user' header
-
+        base_headers = self.base_headers()
         base_headers.update(headers)
 
-        total = timeout_total if timeout_total is not None else self._default_timeout
+        total = timeout_total if timeout_total is not None else self.timeout_for(method)
+        endpoint = f"{method} {params.get('cmd', path)}"
+        adaptive = self.timeouts.get(method)
+        started = time.perf_counter()
 
         try:
             async with self._session.request(
@@ -79,34 +249,60 @@ class PoolSyncApi:
                 timeout=ClientTimeout(total=total),
             ) as resp:
                 text = await resp.text()
-                _LOGGER.debug(
-                    "%s %s %s -> %s, body[%d]=%s",
-                    method, url, params, resp.status, len(text), text[:300],
-                )
+                latency = time.perf_counter() - started
+                if adaptive is not None:
+                    adaptive.add(latency)
                 parsed: Optional[Dict[str, Any]] = None
+                parse_started = time.perf_counter()
                 if text:
-                    try:
-                        parsed = json.loads(text)
-                    except Exception:
-                        parsed = None
+                    with PROFILER.span("json_parse"):
+                        try:
+                            parsed = json.loads(text)
+                        except Exception:
+                            parsed = None
+                            self.metrics.record_error(ERROR_PARSE, endpoint)
+                self.metrics.record_response(
+                    endpoint, latency, len(text), time.perf_counter() - parse_started
+                )
+                self.recent_payloads.add(endpoint, resp.status, text)
+                if resp.status != 200:
+                    self.metrics.record_error(ERROR_HTTP_STATUS, f"{endpoint} {resp.status}")
+                if _LOGGER.isEnabledFor(logging.DEBUG):
+                    self._log_response(endpoint, resp.status, latency, text, parsed)
                 return resp.status, text, parsed
+        except asyncio.TimeoutError as exc:
+            self.metrics.record_error(ERROR_TIMEOUT, endpoint)
+            if adaptive is not None:
+                adaptive.add(total)
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                self._log_failure(endpoint, ERROR_TIMEOUT, f"timeout after {total:.1f}s")
+            return 0, str(exc) or "timeout", None
+        except aiohttp.ClientError as exc:
+            self.metrics.record_error(ERROR_CLIENT, f"{endpoint} {type(exc).__name__}")
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                self._log_failure(endpoint, type(exc).__name__, f"{type(exc).__name__}: {exc}")
+            return 0, str(exc), None
         except Exception as exc:
-            _LOGGER.debug("HTTP request error %s %s: %s", method, url, exc)
+            self.metrics.record_error(ERROR_OTHER, f"{endpoint} {type(exc).__name__}")
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                self._log_failure(endpoint, type(exc).__name__, f"{type(exc).__name__}: {exc}")
             return 0, str(exc), None
 
     # -----------------------
     # Public high-level calls
     # -----------------------
-    async def get_poolsync_all(self) -> Dict[str, Any]:
+    async def get_poolsync_all(self, timeout: Optional[float] = None) -> Dict[str, Any]:
         """GET /api/poolsync?cmd=poolSync&all."""
         status, text, data = await self._request_json(
             "GET",
             "/api/poolsync",
             params={"cmd": "poolSync", "all": ""},
-            timeout_total=None,  # use default
+            timeout_total=timeout,  # None: adaptive
         )
         if status != 200 or not isinstance(data, dict):
-            raise RuntimeError(f"poolSync all failed: status={status}, body={text}")
+            raise PoolSyncRequestError(
+                f"poolSync all failed: status={status}, body={text}", status
+            )
 
         # learn MAC if present
         try:
@@ -118,23 +314,62 @@ class PoolSyncApi:
 
         return data
 
-    async def set_chlor_output(self, device_index: int, value: int) -> Dict[str, Any]:
+    async def get_device(
+        self, device_index: int, timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """GET /api/poolsync?cmd=devices&device=<index>: one device, not the whole hub."""
+        status, text, data = await self._request_json(
+            "GET",
+            "/api/poolsync",
+            params={"cmd": "devices", "device": str(device_index)},
+            timeout_total=timeout,  # None: adaptive
+        )
+        if status != 200 or not isinstance(data, dict):
+            raise PoolSyncRequestError(
+                f"device {device_index} read failed: status={status}, body={text}", status
+            )
+        return data
+
+    async def set_chlor_output(
+        self, device_index: int, value: int, verify: bool = False
+    ) -> Dict[str, Any]:
         """PATCH /api/poolsync?cmd=devices&device=<index> with {'chlorOutput': <int>}."""
-        return await self._patch_devices(device_index, {"chlorOutput": int(value)})
+        return await self._patch_devices(device_index, {"chlorOutput": int(value)}, verify)
 
-    async def set_boost_mode(self, device_index: int, on: bool) -> Dict[str, Any]:
+    async def set_boost_mode(
+        self, device_index: int, on: bool, verify: bool = False
+    ) -> Dict[str, Any]:
         """PATCH /api/poolsync?cmd=devices&device=<index> with {'boostMode': bool}."""
-        return await self._patch_devices(device_index, {"boostMode": bool(on)})
+        return await self._patch_devices(device_index, {"boostMode": bool(on)}, verify)
 
-    async def set_heatpump_setpoint(self, device_index: int, value: float) -> Dict[str, Any]:
+    async def set_heatpump_setpoint(
+        self, device_index: int, value: float, verify: bool = False
+    ) -> Dict[str, Any]:
         """PATCH device setpoint for heat pump."""
-        return await self._patch_devices(device_index, {"setpoint": value})
+        return await self._patch_devices(device_index, {"setpoint": value}, verify)
 
-    async def set_heatpump_mode(self, device_index: int, mode: int) -> Dict[str, Any]:
+    async def set_heatpump_mode(
+        self, device_index: int, mode: int, verify: bool = False
+    ) -> Dict[str, Any]:
         """PATCH device mode for heat pump."""
-        return await self._patch_devices(device_index, {"mode": int(mode)})
-
-    async def _patch_devices(self, device_index: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._patch_devices(device_index, {"mode": int(mode)}, verify)
+
+    async def set_device_config(
+        self, device_index: int, config: Dict[str, Any], verify: bool = False
+    ) -> Dict[str, Any]:
+        """PATCH several config fields of one device in a single request."""
+        return await self._patch_devices(device_index, dict(config), verify)
+
+    async def _patch_devices(
+        self, device_index: int, payload: Dict[str, Any], verify: bool = False
+    ) -> Dict[str, Any]:
+        """PATCH a device; with ``verify``, return the device once it shows the change.
+
+        Verification reads back only the written device (never ``poolSync&all``)
+        and raises PoolSyncVerifyError if the change doesn't show up in time.
+        Hubs that reject the single-device read get the unverified PATCH answer,
+        and aren't asked again.
+        """
         headers = {"Content-Type": "application/json"}
         status, text, data = await self._request_json(
             "PATCH",
@@ -142,12 +377,53 @@ class PoolSyncApi:
             params={"cmd": "devices", "device": str(device_index)},
             headers=headers,
             json_body=payload,
-            timeout_total=None,  # use default
+            timeout_total=None,  # adaptive
         )
         if status != 200:
-            raise RuntimeError(f"devices PATCH failed: status={status}, body={text}")
+            raise PoolSyncRequestError(
+                f"devices PATCH failed: status={status}, body={text}", status
+            )
+        if verify and self.device_read_supported:
+            return await self._verify_device(device_index, payload)
         return {"ok": True, "raw": text} if data is None else data
 
+    async def _verify_device(
+        self, device_index: int, payload: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        actual: Any = None
+        for attempt, delay in enumerate((0.0, *VERIFY_DELAYS)):
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                device = await self.get_device(device_index)
+            except PoolSyncRequestError as err:
+                if not err.transient:
+                    # The firmware doesn't serve cmd=devices reads; the caller
+                    # refreshes the whole hub instead
+                    _LOGGER.debug(
+                        "hub=%s can't read back device %s (%s); writes go unverified",
+                        self._base_url,
+                        device_index,
+                        err,
+                    )
+                    self.device_read_supported = False
+                    return {"ok": True, "verified": False}
+                # A dropped read-back isn't a failed write; try again
+                actual = str(err)
+                continue
+            if _applied(device, payload):
+                if attempt:
+                    _LOGGER.debug(
+                        "hub=%s device %s applied %s after %d read-backs",
+                        self._base_url,
+                        device_index,
+                        payload,
+                        attempt + 1,
+                    )
+                return device
+            actual = device.get("config")
+        raise PoolSyncVerifyError(device_index, payload, actual)
+
     # -----------------------
     # Push-link (auto-ephemeral user)
     # -----------------------
@@ -185,8 +461,22 @@ class PoolSyncApi:
             int(timeout),
         )
 
+        # Status polls are tiny: a hung one must not eat the pairing window.
+        # All requests go through the same session, so the hub's keep-alive
+        # connection is reused instead of reconnecting per poll.
+        poll_timeout = min(PUSHLINK_POLL_TIMEOUT, self._default_timeout)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        def _track_window(data: Optional[Dict[str, Any]]) -> None:
+            # Never wait past the window the hub reports (plus clock slack)
+            nonlocal deadline
+            rem = data.get("timeRemaining") if isinstance(data, dict) else None
+            if isinstance(rem, (int, float)) and rem > 0:
+                deadline = min(deadline, loop.time() + rem + PUSHLINK_WINDOW_SLACK)
+
         # 1) Start the window
-        st, text, _ = await self._request_json(
+        st, text, data = await self._request_json(
             "PUT",
             base_path,
             params={"cmd": "pushLink", "start": ""},
@@ -195,42 +485,48 @@ class PoolSyncApi:
         )
         if st != 200:
             return False, None, None, used_user, f"pushLink start failed: status={st}, body={text}"
+        _track_window(data)
 
-        # 2) Poll
-        loop = asyncio.get_running_loop()
-        deadline = loop.time() + timeout
+        # 2) Poll until the password shows up or the window closes, backing
+        #    off while the hub keeps waiting for the button
         poll = 0
+        waiting = 0
+        last_seen: Optional[Tuple[int, Tuple[str, ...]]] = None
 
         while True:
-            if loop.time() >= deadline:
-                _LOGGER.debug("push-link timed out after %.0fs", timeout)
+            now = loop.time()
+            if now >= deadline:
+                _LOGGER.debug("push-link timed out after %d polls", poll)
                 return False, None, None, used_user, "push-link timed out"
 
             poll += 1
+            waiting += 1
             st, text, data = await self._request_json(
                 "GET",
                 base_path,
                 params={"cmd": "pushLink", "status": ""},
                 headers=_push_headers(),
-                timeout_total=self._default_timeout,
+                timeout_total=min(poll_timeout, max(0.1, deadline - now)),
             )
 
-            if debug_full:
-                _LOGGER.debug("push-link poll #%d RAW: %s", poll, text)
-            else:
-                # Log response details without exposing tokens/passwords
-                redacted = None
-                if isinstance(data, dict):
-                    redacted = {
-                        k: ("<redacted>" if k.lower() in {"password", "pass", "token"} else v)
-                        for k, v in data.items()
-                    }
-                _LOGGER.debug(
-                    "push-link poll #%d: status=%s body=%s",
-                    poll,
-                    st,
-                    redacted if redacted is not None else f"<non-json len={len(text)}>",
-                )
+            # Only log when the shape of the answer changes, not every countdown tick
+            seen = (st, tuple(sorted(data)) if isinstance(data, dict) else ())
+            if seen != last_seen and _LOGGER.isEnabledFor(logging.DEBUG):
+                last_seen = seen
+                if debug_full:
+                    _LOGGER.debug("push-link poll #%d RAW: %s", poll, text)
+                else:
+                    # Log response details without exposing tokens/passwords
+                    _LOGGER.debug(
+                        "push-link poll #%d: status=%s body=%s",
+                        poll,
+                        st,
+                        (
+                            LazyRedact(data)
+                            if isinstance(data, dict)
+                            else f"<non-json len={len(text)}>"
+                        ),
+                    )
 
             if st == 200 and isinstance(data, dict):
                 mac = data.get("macAddress") or data.get("mac")
@@ -244,13 +540,15 @@ class PoolSyncApi:
                     self.token = pw
                     if debug_full:
                         _LOGGER.debug(
-                            "push-link SUCCESS: mac=%s password=%s",
+                            "push-link SUCCESS after %d polls: mac=%s password=%s",
+                            poll,
                             self.mac_address or "?",
                             pw,
                         )
                     else:
                         _LOGGER.debug(
-                            "push-link SUCCESS: mac=%s password_len=%d",
+                            "push-link SUCCESS after %d polls: mac=%s password_len=%d",
+                            poll,
                             self.mac_address or "?",
                             len(pw),
                         )
@@ -262,6 +560,65 @@ class PoolSyncApi:
                         rem,
                     )
                     return False, None, None, used_user, "push-link ended without password"
+                _track_window(data)
+            else:
+                # Not an answer about the button: no reason to wait longer
+                waiting = 0
+
+            # Scheduled from the poll's start: a slow poll shortens the pause
+            interval = pushlink_interval(poll_interval, waiting, deadline - now)
+            pause = min(now + interval, deadline) - loop.time()
+            if pause > 0:
+                await asyncio.sleep(pause)
+
+
+@dataclass(frozen=True)
+class PushLinkResult:
+    """Outcome of one hub's push-link during bulk pairing."""
+
+    base_url: str
+    ok: bool
+    mac: Optional[str] = None
+    token: Optional[str] = None
+    user_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+async def async_pushlink_many(
+    hass: HomeAssistant,
+    base_urls: Iterable[str],
+    *,
+    session: Optional[ClientSession] = None,
+    concurrency: int = 32,
+    poll_interval: float = 0.5,
+    timeout: float = 60.0,
+    on_result: Optional[Callable[[PushLinkResult], None]] = None,
+) -> list[PushLinkResult]:
+    """Run push-link on several hubs at once, at most ``concurrency`` at a time.
+
+    All hubs share one client session (and so its keep-alive connections);
+    with enough concurrency every window runs in parallel and the whole batch
+    takes about as long as a single pairing. Results keep the input order.
+    """
+    session = session or async_get_clientsession(hass)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _pair(base_url: str) -> PushLinkResult:
+        async with semaphore:
+            api = PoolSyncApi(hass=hass, base_url=base_url, session=session, request_timeout=30.0)
+            ok, mac, token, used_user, err = await api.async_pushlink_exchange(
+                user_id=None, poll_interval=poll_interval, timeout=timeout
+            )
+        result = PushLinkResult(
+            base_url=base_url,
+            ok=bool(ok and token),
+            mac=mac,
+            token=token,
+            user_id=used_user,
+            error=None if ok and token else (err or "unknown error"),
+        )
+        if on_result is not None:
+            on_result(result)
+        return result
 
-            await asyncio.sleep(poll_interval)
-
+    return list(await asyncio.gather(*(_pair(url) for url in base_urls)))
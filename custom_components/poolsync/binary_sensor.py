@@ -9,25 +9,88 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_OFF, STATE_ON
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import PoolSyncCoordinator
-from .util import _g
+from .entity import PoolSyncRestoreEntity
+from .flags import CTRL_FLAG_NAMES, STATE_FLAG_NAMES, Fault
+from .model import EMPTY_SNAPSHOT, PoolSyncSnapshot
 
 
 @dataclass(frozen=True)
 class PoolSyncBinarySensorDesc(BinarySensorEntityDescription):
     """Descriptor with a value extractor."""
 
-    value_fn: Callable[[dict[str, Any]], Any] | None = None
+    value_fn: Callable[[PoolSyncSnapshot], Any] | None = None
+    attr_fn: Callable[[PoolSyncSnapshot], dict[str, Any]] | None = None
 
 
-class PoolSyncBinarySensor(CoordinatorEntity[PoolSyncCoordinator], BinarySensorEntity):
+def _fault_attrs(faults: tuple[Fault, ...]) -> dict[str, Any]:
+    return {"faults": [fault.as_dict() for fault in faults]}
+
+
+# Flags with a sensor of their own below, read the way they always have been
+_OWN_SENSOR_FLAGS = frozenset({"flow", "fan"})
+
+
+def _flag_sensor(kind: str, flag: str) -> PoolSyncBinarySensorDesc:
+    """Binary sensor for one named bit of ``ctrlFlags``/``stateFlags``."""
+    return PoolSyncBinarySensorDesc(
+        key=f"heatpump_{flag}",
+        name=f"Heat Pump {flag.replace('_', ' ').title()}",
+        value_fn=lambda s: flag in getattr(s.heatpump.flags, kind),
+    )
+
+
+HEATPUMP_BINARY_SENSORS: tuple[PoolSyncBinarySensorDesc, ...] = (
+    PoolSyncBinarySensorDesc(
+        key="heatpump_online",
+        name="Heat Pump Online",
+        device_class=BinarySensorDeviceClass.CONNECTIVITY,
+        value_fn=lambda s: s.heatpump.online,
+    ),
+    PoolSyncBinarySensorDesc(
+        key="heatpump_fault",
+        name="Heat Pump Fault",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda s: bool(s.heatpump.flags.faults),
+        attr_fn=lambda s: _fault_attrs(s.heatpump.flags.faults),
+    ),
+    PoolSyncBinarySensorDesc(
+        key="heatpump_flow",
+        name="Heat Pump Flow",
+        value_fn=lambda s: s.heatpump.flags.flow,
+    ),
+    PoolSyncBinarySensorDesc(
+        key="heatpump_compressor",
+        name="Heat Pump Compressor",
+        value_fn=lambda s: s.heatpump.flags.compressor,
+    ),
+    PoolSyncBinarySensorDesc(
+        key="heatpump_fan",
+        name="Heat Pump Fan",
+        value_fn=lambda s: s.heatpump.flags.fan,
+    ),
+    *(
+        _flag_sensor("ctrl", flag)
+        for flag in CTRL_FLAG_NAMES.values()
+        if flag not in _OWN_SENSOR_FLAGS
+    ),
+    *(
+        _flag_sensor("state", flag)
+        for flag in STATE_FLAG_NAMES.values()
+        if flag not in _OWN_SENSOR_FLAGS
+    ),
+)
+
+
+class PoolSyncBinarySensor(PoolSyncRestoreEntity, BinarySensorEntity):
     """Generic PoolSync binary sensor."""
 
     entity_description: PoolSyncBinarySensorDesc
+    _attr_has_entity_name = True
 
     def __init__(
         self,
@@ -38,21 +101,15 @@ class PoolSyncBinarySensor(CoordinatorEntity[PoolSyncCoordinator], BinarySensorE
         super().__init__(coordinator)
         self.entity_description = description
 
-        mac = coordinator.api.mac_address or entry.data.get("mac") or "poolsync"
+        mac = coordinator.hub_id(entry)
         self._attr_unique_id = f"{mac}_{description.key}"
-        self._attr_has_entity_name = True
-        self._attr_name = description.name
-
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, mac)},
-            "manufacturer": "AquaCal",
-            "name": "PoolSync",
-            "model": "PoolSync",
-        }
+        self._attr_device_info = coordinator.device_info(entry)
 
     @property
     def is_on(self) -> Optional[bool]:
-        data = self.coordinator.data or {}
+        if self.stale:
+            return {STATE_ON: True, STATE_OFF: False}.get(self._restored.state)
+        data = self.coordinator.data or EMPTY_SNAPSHOT
         if self.entity_description.value_fn is None:
             return None
         try:
@@ -71,6 +128,14 @@ class PoolSyncBinarySensor(CoordinatorEntity[PoolSyncCoordinator], BinarySensorE
     def available(self) -> bool:
         return self.is_on is not None
 
+    @property
+    def extra_state_attributes(self) -> Optional[dict[str, Any]]:
+        if self.stale:
+            return self.restored_attributes()
+        if self.entity_description.attr_fn is None:
+            return None
+        return self.entity_description.attr_fn(self.coordinator.data or EMPTY_SNAPSHOT)
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities
@@ -79,54 +144,9 @@ async def async_setup_entry(
 
     entities: list[PoolSyncBinarySensor] = []
 
-    data = coordinator.data or {}
-    device_types = _g(data, "deviceType", default={}) or {}
-    heatpump_idx = next(
-        (idx for idx, dev in device_types.items() if dev == "heatPump"),
-        None,
-    )
-
-    if heatpump_idx is not None:
-        hp_idx = str(heatpump_idx)
-        sensors = [
-            PoolSyncBinarySensorDesc(
-                key="heatpump_online",
-                name="Heat Pump Online",
-                device_class=BinarySensorDeviceClass.CONNECTIVITY,
-                value_fn=lambda d, i=hp_idx: _g(d, "devices", i, "nodeAttr", "online"),
-            ),
-            PoolSyncBinarySensorDesc(
-                key="heatpump_fault",
-                name="Heat Pump Fault",
-                device_class=BinarySensorDeviceClass.PROBLEM,
-                value_fn=lambda d, i=hp_idx: (
-                    any(f != 0 for f in (_g(d, "devices", i, "faults") or []))
-                ),
-            ),
-            PoolSyncBinarySensorDesc(
-                key="heatpump_flow",
-                name="Heat Pump Flow",
-                value_fn=lambda d, i=hp_idx: (
-                    (_g(d, "devices", i, "status", "ctrlFlags") or 0) >= 1
-                ),
-            ),
-            PoolSyncBinarySensorDesc(
-                key="heatpump_compressor",
-                name="Heat Pump Compressor",
-                value_fn=lambda d, i=hp_idx: (
-                    (_g(d, "devices", i, "status", "stateFlags") or 0) == 8
-                ),
-            ),
-            PoolSyncBinarySensorDesc(
-                key="heatpump_fan",
-                name="Heat Pump Fan",
-                value_fn=lambda d, i=hp_idx: (
-                    (_g(d, "devices", i, "status", "stateFlags") or 0) in (8, 520)
-                ),
-            ),
-        ]
-        for desc in sensors:
+    if coordinator.heatpump_index is not None:
+        for desc in HEATPUMP_BINARY_SENSORS:
             entities.append(PoolSyncBinarySensor(coordinator, entry, desc))
 
     if entities:
-        async_add_entities(entities, update_before_add=True)
+        async_add_entities(entities)
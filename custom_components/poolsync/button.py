@@ -20,19 +20,15 @@ async def async_setup_entry(
 class PoolSyncPingButton(ButtonEntity):
     """Ping button that is always available and can attempt to recover the integration."""
 
+    _attr_name = "Ping"
+    _attr_icon = "mdi:lan-connect"
+
     def __init__(self, api: PoolSyncApi, coordinator: PoolSyncCoordinator, entry: ConfigEntry) -> None:
         self.api = api
         self.coordinator = coordinator
-        mac = api.mac_address or entry.data.get("mac") or "poolsync"
+        mac = coordinator.hub_id(entry)
         self._attr_unique_id = f"{mac}_ping"
-        self._attr_name = "Ping"
-        self._attr_icon = "mdi:lan-connect"
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, mac)},
-            "manufacturer": "AquaCal",
-            "name": "PoolSync",
-            "model": "PoolSync",
-        }
+        self._attr_device_info = coordinator.device_info(entry)
 
     @property
     def available(self) -> bool:
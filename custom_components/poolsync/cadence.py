@@ -0,0 +1,231 @@
+"""Learn when the hub refreshes its readings so polls can land just after.
+
+The hub reads the ChlorSync/heat pump on its own schedule and stamps the
+result in ``status.dateTime``. Successive distinct stamps give the refresh
+period; the smallest observed age of a stamp (our clock minus the stamp) gives
+the offset between the hub's clock and ours, whatever its time zone. Together
+they predict the next refresh in our clock.
+
+The offset is an upper bound: predictions can only be late, never early, so an
+aligned poll never fetches the previous reading. A drop in ``upTimeSecs``
+(reboot) or a stamp older than a period invalidates what was learned.
+
+This assumes ``dateTime`` stamps the last refresh. Changes in the readings
+themselves can't stand in for it: at the usual poll intervals every poll sees
+new readings, which only says a refresh happened somewhere in between. If
+``dateTime`` is missing, or no consistent period shows up within
+``LEARN_POLLS`` polls, polls keep the plain interval and ``status`` says why.
+
+A ``dateTime`` that is the hub's wall clock moves on by exactly our own time
+between polls, which evenly spaced polls would otherwise take for a period.
+So would a real period that the poll interval is a multiple of; to tell them
+apart, while every change so far matched the time since the previous poll,
+the next poll is moved by ``PROBE_SHIFT``. A refreshing hub's stamp then no
+longer keeps pace with our clock. If the first ``MIN_CHANGES`` changes all
+match it, the hub is taken to have no refresh period. That result, like not
+finding a period within ``LEARN_POLLS`` polls, holds until the estimator is
+recreated, so it is reported once instead of flipping with every poll.
+"""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from typing import Any, Optional
+
+# Poll this long after the predicted refresh (HA schedules to about 1 s)
+ALIGN_MARGIN = 2.0
+# Distinct stamps needed before the period is trusted
+MIN_CHANGES = 3
+# Stamp differences must be whole multiples of the period within this
+PERIOD_TOLERANCE = 2.0
+# Never align to refresh periods shorter than this
+MIN_PERIOD = 5.0
+# Polls after which a missing period is reported rather than still awaited
+LEARN_POLLS = 12
+# Seconds a poll is moved to tell a wall clock from a period dividing the
+# poll interval
+PROBE_SHIFT = 7.0
+
+CADENCE_ALIGNED = "aligned"
+CADENCE_LEARNING = "learning"
+CADENCE_NO_STAMP = "no_stamp"
+CADENCE_NO_PERIOD = "no_period"
+
+
+def parse_stamp(value: Any) -> Optional[float]:
+    """``status.dateTime`` as seconds: epoch numbers or ISO strings.
+
+    Naive ISO times are read as UTC; the learned offset absorbs the zone.
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            return float(text)
+        except ValueError:
+            pass
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            return (parsed - datetime(1970, 1, 1)).total_seconds()
+        return parsed.timestamp()
+    return None
+
+
+class CadenceEstimator:
+    """Refresh period and phase of one hub, from the stamps of its snapshots."""
+
+    __slots__ = (
+        "_last_stamp",
+        "_last_uptime",
+        "_diffs",
+        "_period",
+        "_offset",
+        "_anchor",
+        "_polls",
+        "_stamped",
+        "_last_poll",
+        "_changes",
+        "_clock_like",
+        "_no_period",
+    )
+
+    def __init__(self) -> None:
+        self._last_stamp: Optional[float] = None
+        self._last_uptime: Optional[float] = None
+        self._diffs: deque[float] = deque(maxlen=16)
+        self._period: Optional[float] = None
+        # our wall clock minus hub stamp, upper bound
+        self._offset: Optional[float] = None
+        # our wall-clock time of the latest refresh
+        self._anchor: Optional[float] = None
+        # Polls observed since the last reset, and how many had a stamp
+        self._polls = 0
+        self._stamped = 0
+        # our wall-clock time of the previous poll
+        self._last_poll: Optional[float] = None
+        # Stamp changes since the last reset, and how many moved on by exactly
+        # the time since the previous poll
+        self._changes = 0
+        self._clock_like = 0
+        # Latched: no period will be learned from this hub
+        self._no_period = False
+
+    def reset(self) -> None:
+        self._polls = self._stamped = 0
+        self._changes = self._clock_like = 0
+        self._last_stamp = None
+        self._diffs.clear()
+        self._period = None
+        self._offset = None
+        self._anchor = None
+
+    def observe(self, now: float, stamp: Any, uptime: Any = None) -> None:
+        """Feed one successful poll: our wall time, dateTime and upTimeSecs."""
+        if isinstance(uptime, (int, float)) and not isinstance(uptime, bool):
+            if self._last_uptime is not None and uptime < self._last_uptime:
+                self.reset()
+            self._last_uptime = float(uptime)
+        elapsed = None if self._last_poll is None else now - self._last_poll
+        self._last_poll = now
+        self._polls += 1
+        if self._no_period:
+            return
+        seconds = parse_stamp(stamp)
+        if seconds is None:
+            return
+        self._stamped += 1
+        if self._last_stamp is not None and seconds != self._last_stamp:
+            diff = seconds - self._last_stamp
+            if diff > 0:
+                self._diffs.append(diff)
+                self._changes += 1
+                if elapsed is not None and abs(diff - elapsed) <= PERIOD_TOLERANCE:
+                    self._clock_like += 1
+                if self._changes == MIN_CHANGES and self._clock_like == MIN_CHANGES:
+                    # Wall clock, or a period the poll interval is a multiple of
+                    self._give_up()
+                    return
+                self._period = self._estimate_period()
+            else:
+                # Hub clock went backwards
+                self.reset()
+        self._last_stamp = seconds
+
+        age = now - seconds
+        period = self.period
+        if self._offset is None or age < self._offset:
+            self._offset = age
+        elif period is not None and age - self._offset > 1.5 * period:
+            # The stamp should have moved on by now: our offset is stale
+            self._offset = age
+        self._anchor = seconds + self._offset
+        if self._period is None and self._polls >= LEARN_POLLS:
+            self._give_up()
+
+    def _give_up(self) -> None:
+        self.reset()
+        self._no_period = True
+
+    @property
+    def period(self) -> Optional[float]:
+        """Seconds between refreshes (or a multiple of it), once consistent."""
+        return self._period
+
+    @property
+    def status(self) -> str:
+        """Whether polls are aligned, and if not, why."""
+        if self._no_period:
+            return CADENCE_NO_PERIOD
+        if self.period is not None:
+            return CADENCE_ALIGNED
+        if self._polls < LEARN_POLLS:
+            return CADENCE_LEARNING
+        return CADENCE_NO_PERIOD if self._stamped else CADENCE_NO_STAMP
+
+    def _estimate_period(self) -> Optional[float]:
+        # Largest period that every stamp difference is a whole multiple of
+        if len(self._diffs) < MIN_CHANGES:
+            return None
+        base = min(self._diffs)
+        for divisor in range(1, int(base // MIN_PERIOD) + 1):
+            candidate = base / divisor
+            tolerance = min(PERIOD_TOLERANCE, candidate / 10)
+            multiples = [round(d / candidate) for d in self._diffs]
+            if all(
+                abs(d - k * candidate) <= tolerance for d, k in zip(self._diffs, multiples)
+            ):
+                return sum(self._diffs) / sum(multiples)
+        return None
+
+    def next_delay(
+        self, now: float, interval: float, margin: float = ALIGN_MARGIN
+    ) -> Optional[float]:
+        """Seconds until the poll nearest ``interval`` from now that lands
+        ``margin`` after a predicted refresh; None until the cadence is known,
+        except for a probing poll while the stamp looks like a wall clock."""
+        period = self.period
+        if period is None or self._anchor is None:
+            if not self._no_period and self._clock_like and self._clock_like == self._changes:
+                return interval + PROBE_SHIFT
+            return None
+        target = now + interval
+        k = round((target - margin - self._anchor) / period)
+        when = self._anchor + k * period + margin
+        # Don't poll much sooner than asked
+        while when < now + interval / 2:
+            when += period
+        return when - now
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "status": self.status,
+            "period_s": None if self.period is None else round(self.period, 1),
+            "offset_s": None if self._offset is None else round(self._offset, 1),
+            "changes_seen": len(self._diffs),
+        }
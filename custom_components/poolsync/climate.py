@@ -1,14 +1,21 @@
 from __future__ import annotations
 
-from homeassistant.components.climate import ClimateEntity, HVACMode, ClimateEntityFeature
-from homeassistant.const import UnitOfTemperature
+from typing import Any, Optional
+
+from homeassistant.components.climate import (
+    ATTR_CURRENT_TEMPERATURE,
+    ClimateEntity,
+    ClimateEntityFeature,
+    HVACMode,
+)
+from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.config_entries import ConfigEntry
 
-from .const import DOMAIN
+from .const import ATTR_STALE, DOMAIN
 from .coordinator import PoolSyncCoordinator
-from .util import _g
+from .entity import PoolSyncRestoreEntity
+from .model import EMPTY_SNAPSHOT
 
 
 async def async_setup_entry(
@@ -17,26 +24,20 @@ async def async_setup_entry(
     """Set up PoolSync climate entity if a heat pump is present."""
     coordinator: PoolSyncCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
 
-    data = coordinator.data or {}
-    device_types = _g(data, "deviceType", default={}) or {}
-    heatpump_idx = next(
-        (idx for idx, dev in device_types.items() if dev == "heatPump"),
-        None,
-    )
-
     entities: list[ClimateEntity] = []
-    if heatpump_idx is not None:
+    if coordinator.heatpump_index is not None:
         entities.append(
-            PoolSyncHeatPumpClimate(coordinator, entry, device_index=int(heatpump_idx))
+            PoolSyncHeatPumpClimate(coordinator, entry, device_index=coordinator.heatpump_index)
         )
 
     if entities:
-        async_add_entities(entities, update_before_add=True)
+        async_add_entities(entities)
 
 
-class PoolSyncHeatPumpClimate(CoordinatorEntity[PoolSyncCoordinator], ClimateEntity):
+class PoolSyncHeatPumpClimate(PoolSyncRestoreEntity, ClimateEntity):
     """Climate entity representing the PoolSync heat pump."""
 
+    _attr_name = "Heat Pump"
     _attr_supported_features = ClimateEntityFeature.TARGET_TEMPERATURE
     _attr_hvac_modes = [HVACMode.OFF, HVACMode.HEAT, HVACMode.COOL]
 
@@ -45,9 +46,8 @@ class PoolSyncHeatPumpClimate(CoordinatorEntity[PoolSyncCoordinator], ClimateEnt
     ) -> None:
         super().__init__(coordinator)
         self._device_index = device_index
-        mac = coordinator.api.mac_address or entry.data.get("mac") or "poolsync"
+        mac = coordinator.hub_id(entry)
         self._attr_unique_id = f"{mac}_heat_pump_{device_index}"
-        self._attr_name = "Heat Pump"
 
         unit = coordinator.hass.config.units.temperature_unit
         self._attr_temperature_unit = unit
@@ -60,17 +60,17 @@ class PoolSyncHeatPumpClimate(CoordinatorEntity[PoolSyncCoordinator], ClimateEnt
             self._attr_max_temp = 40
             self._attr_target_temperature_step = 0.5
 
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, mac)},
-            "manufacturer": "AquaCal",
-            "name": "PoolSync",
-            "model": "PoolSync",
-        }
+        self._attr_device_info = coordinator.device_info(entry)
 
     @property
     def hvac_mode(self) -> HVACMode:
-        data = self.coordinator.data or {}
-        mode = _g(data, "devices", str(self._device_index), "config", "mode")
+        if self.stale:
+            try:
+                return HVACMode(self._restored.state)
+            except ValueError:
+                return HVACMode.OFF
+        data = self.coordinator.data or EMPTY_SNAPSHOT
+        mode = data.heatpump.config.mode
         try:
             mode_int = int(mode)
         except Exception:
@@ -89,13 +89,19 @@ class PoolSyncHeatPumpClimate(CoordinatorEntity[PoolSyncCoordinator], ClimateEnt
         }.get(hvac_mode)
         if mode_val is None:
             raise ValueError(f"Unsupported hvac_mode: {hvac_mode}")
-        await self.coordinator.api.set_heatpump_mode(self._device_index, mode_val)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_write_device(
+            self._device_index,
+            self.coordinator.api.set_heatpump_mode(
+                self._device_index, mode_val, verify=self.coordinator.verify_writes
+            ),
+        )
 
     @property
     def current_temperature(self) -> float | None:
-        data = self.coordinator.data or {}
-        temp = _g(data, "devices", str(self._device_index), "status", "waterTemp")
+        if self.stale:
+            return self._restored.attributes.get(ATTR_CURRENT_TEMPERATURE)
+        data = self.coordinator.data or EMPTY_SNAPSHOT
+        temp = data.heatpump.status.water_temp
         try:
             return float(temp)
         except Exception:
@@ -103,16 +109,26 @@ class PoolSyncHeatPumpClimate(CoordinatorEntity[PoolSyncCoordinator], ClimateEnt
 
     @property
     def target_temperature(self) -> float | None:
-        data = self.coordinator.data or {}
-        temp = _g(data, "devices", str(self._device_index), "config", "setpoint")
+        if self.stale:
+            return self._restored.attributes.get(ATTR_TEMPERATURE)
+        data = self.coordinator.data or EMPTY_SNAPSHOT
+        temp = data.heatpump.config.setpoint
         try:
             return float(temp)
         except Exception:
             return None
 
+    @property
+    def extra_state_attributes(self) -> Optional[dict[str, Any]]:
+        return {ATTR_STALE: True} if self.stale else None
+
     async def async_set_temperature(self, **kwargs) -> None:
         temp = kwargs.get("temperature")
         if temp is None:
             return
-        await self.coordinator.api.set_heatpump_setpoint(self._device_index, float(temp))
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_write_device(
+            self._device_index,
+            self.coordinator.api.set_heatpump_setpoint(
+                self._device_index, float(temp), verify=self.coordinator.verify_writes
+            ),
+        )
@@ -1,6 +1,8 @@
 # custom_components/poolsync/config_flow.py
 from __future__ import annotations
 
+import asyncio
+import ipaddress
 import logging
 from typing import Any, Dict, Optional
 
@@ -9,20 +11,38 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.selector import ObjectSelector
 
-from .api import PoolSyncApi
+from .api import PoolSyncApi, PushLinkResult, async_pushlink_many
 from .const import (
+    CONF_ALIGN_POLLS,
+    CONF_BASE_URLS,
+    CONF_HOSTS,
+    CONF_MAX_FAILED_POLLS,
+    CONF_MAX_STALE_SECONDS,
     CONF_POLL_SECONDS,
+    CONF_RECORD_TRACE,
     CONF_REQUEST_TIMEOUT,
+    CONF_SCHEDULE,
+    CONF_SALT_LOW_PPM,
+    CONF_VERIFY_WRITES,
+    DEFAULT_ALIGN_POLLS,
+    DEFAULT_MAX_FAILED_POLLS,
+    DEFAULT_MAX_STALE_SECONDS,
     DEFAULT_POLL_SECONDS,
     DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_VERIFY_WRITES,
 )
+from .discovery import DiscoveredHub, async_discover_hubs, expand_hosts, host_of
+from .events import DEFAULT_SALT_LOW_PPM
+from .schedule import Schedule
 
 DOMAIN = "poolsync"
 _LOGGER = logging.getLogger(__name__)
 
-STEP_USER_SCHEMA = vol.Schema(
+STEP_MANUAL_SCHEMA = vol.Schema(
     {
         vol.Required("base_url"): str,
         # No user_id requested up front; we auto-generate an ephemeral one for push-link
@@ -35,20 +55,220 @@ STEP_USER_SCHEMA = vol.Schema(
     }
 )
 
+DEFAULT_PUSHLINK_POLL = 0.5
+DEFAULT_PUSHLINK_TIMEOUT = 60
+# Enough to run every window of a typical site in parallel
+BULK_PAIRING_CONCURRENCY = 32
+BULK_MAX_HUBS = 64
+
+
+def _entry_title(mac: Optional[str]) -> str:
+    return f"PoolSync ({mac})" if mac else "PoolSync"
+
+
+def _entry_data(
+    base_url: str, mac: Optional[str], token: Optional[str], used_user: Optional[str]
+) -> Dict[str, Any]:
+    # Persist the token + the SAME ephemeral user used during push-link
+    return {
+        "base_url": base_url,
+        "token": token,
+        "user_id": used_user,  # critical: keep this for all subsequent calls
+        "mac": mac or "",
+        # Coordinator defaults; can be made options later
+        "poll_seconds": 300.0,
+        "request_timeout": 30.0,
+    }
+
 
 class PoolSyncConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for PoolSync."""
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        self._discovered: Dict[str, DiscoveredHub] = {}
+        self._bulk_urls: list[str] = []
+        self._bulk_task: Optional[asyncio.Task[list[PushLinkResult]]] = None
+        self._bulk_finished = 0
+
     async def async_step_user(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
+        return self.async_show_menu(step_id="user", menu_options=["discover", "manual", "bulk"])
+
+    async def async_step_manual(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
         if user_input is None:
-            return self.async_show_form(step_id="user", data_schema=STEP_USER_SCHEMA)
+            return self.async_show_form(step_id="manual", data_schema=STEP_MANUAL_SCHEMA)
+
+        return await self._async_pair(
+            user_input["base_url"].strip().rstrip("/"),
+            user_input["poll_interval"],
+            user_input["timeout"],
+        )
+
+    async def async_step_discover(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
+        """Scan a subnet or list of hosts for hubs that are not configured yet."""
+        errors: Dict[str, str] = {}
+        if user_input is not None:
+            try:
+                targets = expand_hosts(user_input[CONF_HOSTS])
+            except ValueError as err:
+                _LOGGER.debug("Invalid discovery hosts %r: %s", user_input[CONF_HOSTS], err)
+                errors[CONF_HOSTS] = "invalid_hosts"
+            else:
+                entries = self._async_current_entries(include_ignore=False)
+                hubs = await async_discover_hubs(
+                    async_get_clientsession(self.hass),
+                    targets,
+                    skip_hosts=[e.data.get("base_url", "") for e in entries],
+                    skip_macs=[e.data.get("mac", "") for e in entries],
+                )
+                if hubs:
+                    self._discovered = {hub.base_url: hub for hub in hubs}
+                    return await self.async_step_pick()
+                errors["base"] = "no_hubs_found"
+
+        default = (user_input or {}).get(CONF_HOSTS) or await self._async_default_scan()
+        return self.async_show_form(
+            step_id="discover",
+            data_schema=vol.Schema({vol.Required(CONF_HOSTS, default=default): str}),
+            errors=errors,
+        )
+
+    async def async_step_pick(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
+        errors: Dict[str, str] = {}
+        if user_input is not None:
+            selected: list[str] = user_input[CONF_BASE_URLS]
+            if len(selected) == 1:
+                return await self._async_pair(
+                    selected[0], DEFAULT_PUSHLINK_POLL, DEFAULT_PUSHLINK_TIMEOUT
+                )
+            if selected:
+                self._bulk_urls = selected
+                return await self.async_step_bulk_pair()
+            errors["base"] = "nothing_selected"
+
+        return self.async_show_form(
+            step_id="pick",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_BASE_URLS, default=list(self._discovered)): cv.multi_select(
+                        {url: hub.label for url, hub in self._discovered.items()}
+                    )
+                }
+            ),
+            description_placeholders={"count": str(len(self._discovered))},
+            errors=errors,
+        )
 
-        base_url: str = user_input["base_url"].strip().rstrip("/")
-        poll_interval: float = user_input["poll_interval"]
-        timeout: int = user_input["timeout"]
+    async def async_step_bulk(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
+        """Pair several hubs, entered by address, in one go."""
+        errors: Dict[str, str] = {}
+        if user_input is not None:
+            try:
+                urls = expand_hosts(user_input[CONF_HOSTS], max_hosts=BULK_MAX_HUBS)
+            except ValueError as err:
+                _LOGGER.debug("Invalid bulk hosts %r: %s", user_input[CONF_HOSTS], err)
+                errors[CONF_HOSTS] = "invalid_hosts"
+            else:
+                configured = {
+                    host_of(e.data.get("base_url", ""))
+                    for e in self._async_current_entries(include_ignore=False)
+                }
+                self._bulk_urls = [u for u in urls if host_of(u) not in configured]
+                if self._bulk_urls:
+                    return await self.async_step_bulk_pair()
+                errors["base"] = "nothing_selected"
 
+        return self.async_show_form(
+            step_id="bulk",
+            data_schema=vol.Schema({vol.Required(CONF_HOSTS): str}),
+            errors=errors,
+        )
+
+    async def async_step_bulk_pair(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
+        """Run every push-link window concurrently while showing progress."""
+        if self._bulk_task is None:
+            self._bulk_task = self.hass.async_create_task(
+                async_pushlink_many(
+                    self.hass,
+                    self._bulk_urls,
+                    concurrency=BULK_PAIRING_CONCURRENCY,
+                    poll_interval=DEFAULT_PUSHLINK_POLL,
+                    timeout=DEFAULT_PUSHLINK_TIMEOUT,
+                    on_result=self._async_bulk_result,
+                )
+            )
+        if not self._bulk_task.done():
+            return self.async_show_progress(
+                step_id="bulk_pair",
+                progress_action="pairing",
+                progress_task=self._bulk_task,
+                description_placeholders={"count": str(len(self._bulk_urls))},
+            )
+        return self.async_show_progress_done(next_step_id="bulk_done")
+
+    @callback
+    def _async_bulk_result(self, result: PushLinkResult) -> None:
+        self._bulk_finished += 1
+        _LOGGER.info(
+            "PoolSync bulk pairing %d/%d: %s %s",
+            self._bulk_finished,
+            len(self._bulk_urls),
+            result.base_url,
+            f"paired ({result.mac})" if result.ok else f"failed: {result.error}",
+        )
+        # Progress bar on Home Assistant versions that support it
+        if hasattr(self, "async_update_progress"):
+            self.async_update_progress(self._bulk_finished / len(self._bulk_urls))
+
+    async def async_step_bulk_done(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
+        """Create one entry per paired hub (via import flows) and summarise."""
+        assert self._bulk_task is not None
+        results = self._bulk_task.result()
+
+        lines = []
+        for result in results:
+            if result.ok:
+                self.hass.async_create_task(
+                    self.hass.config_entries.flow.async_init(
+                        DOMAIN,
+                        context={"source": config_entries.SOURCE_IMPORT},
+                        data=_entry_data(
+                            result.base_url, result.mac, result.token, result.user_id
+                        ),
+                    )
+                )
+                lines.append(f"- {result.base_url}: paired ({result.mac or 'unknown MAC'})")
+            else:
+                lines.append(f"- {result.base_url}: {result.error}")
+
+        return self.async_abort(
+            reason="bulk_done",
+            description_placeholders={
+                "paired": str(sum(r.ok for r in results)),
+                "count": str(len(results)),
+                "results": "\n".join(lines),
+            },
+        )
+
+    async def async_step_import(self, import_data: Dict[str, Any]) -> FlowResult:
+        """Create an entry for a hub paired by the bulk flow."""
+        await self.async_set_unique_id(import_data.get("mac") or import_data["base_url"])
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=_entry_title(import_data.get("mac")), data=import_data)
+
+    async def _async_default_scan(self) -> str:
+        """Suggest the /24 Home Assistant itself is on."""
+        try:
+            from homeassistant.components import network
+
+            source_ip = await network.async_get_source_ip(self.hass)
+            return str(ipaddress.ip_network(f"{source_ip}/24", strict=False))
+        except Exception as err:  # network integration missing, no IPv4, ...
+            _LOGGER.debug("Could not determine local subnet: %s", err)
+            return ""
+
+    async def _async_pair(self, base_url: str, poll_interval: float, timeout: int) -> FlowResult:
         # Create a temporary API client (no token, no user)
         session = async_get_clientsession(self.hass)
         api = PoolSyncApi(
@@ -74,22 +294,12 @@ class PoolSyncConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             _LOGGER.debug("Link mode failed: %s", err or "unknown error")
             return self.async_abort(reason="pushlink_failed")
 
-        # Create the entry and persist the token + the SAME ephemeral user used
-        title = f"PoolSync ({mac})" if mac else "PoolSync"
-        data = {
-            "base_url": base_url,
-            "token": token,
-            "user_id": used_user,  # critical: keep this for all subsequent calls
-            "mac": mac or "",
-            # Coordinator defaults; can be made options later
-            "poll_seconds": 300.0,
-            "request_timeout": 30.0,
-        }
-
         await self.async_set_unique_id(mac or base_url)
         self._abort_if_unique_id_configured()
 
-        return self.async_create_entry(title=title, data=data)
+        return self.async_create_entry(
+            title=_entry_title(mac), data=_entry_data(base_url, mac, token, used_user)
+        )
 
     @staticmethod
     @callback
@@ -111,10 +321,18 @@ class PoolSyncOptionsFlow(config_entries.OptionsFlow):
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
         """Manage PoolSync options."""
+        errors: Dict[str, str] = {}
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            try:
+                Schedule.parse(user_input.get(CONF_SCHEDULE))
+            except ValueError as err:
+                _LOGGER.debug("Invalid PoolSync schedule: %s", err)
+                errors[CONF_SCHEDULE] = "invalid_schedule"
+            else:
+                return self.async_create_entry(title="", data=user_input)
 
         return self.async_show_form(
+            errors=errors,
             step_id="init",
             data_schema=vol.Schema(
                 {
@@ -137,6 +355,46 @@ class PoolSyncOptionsFlow(config_entries.OptionsFlow):
                             ),
                         ),
                     ): int,
+                    vol.Optional(
+                        CONF_ALIGN_POLLS,
+                        default=self.config_entry.options.get(
+                            CONF_ALIGN_POLLS, DEFAULT_ALIGN_POLLS
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_MAX_FAILED_POLLS,
+                        default=self.config_entry.options.get(
+                            CONF_MAX_FAILED_POLLS, DEFAULT_MAX_FAILED_POLLS
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=20)),
+                    vol.Optional(
+                        CONF_MAX_STALE_SECONDS,
+                        default=self.config_entry.options.get(
+                            CONF_MAX_STALE_SECONDS, DEFAULT_MAX_STALE_SECONDS
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=86400)),
+                    vol.Optional(
+                        CONF_SALT_LOW_PPM,
+                        default=self.config_entry.options.get(
+                            CONF_SALT_LOW_PPM, DEFAULT_SALT_LOW_PPM
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=10000)),
+                    vol.Optional(
+                        CONF_VERIFY_WRITES,
+                        default=self.config_entry.options.get(
+                            CONF_VERIFY_WRITES, DEFAULT_VERIFY_WRITES
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_SCHEDULE,
+                        default=(user_input or self.config_entry.options).get(
+                            CONF_SCHEDULE, []
+                        ),
+                    ): ObjectSelector(),
+                    vol.Optional(
+                        CONF_RECORD_TRACE,
+                        default=self.config_entry.options.get(CONF_RECORD_TRACE, False),
+                    ): bool,
                 }
             ),
         )
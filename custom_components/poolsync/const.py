@@ -6,8 +6,52 @@ CONF_USER_ID = "user_id"
 CONF_TOKEN = "token"
 CONF_POLL_SECONDS = "poll_seconds"
 CONF_REQUEST_TIMEOUT = "request_timeout"
+CONF_RECORD_TRACE = "record_trace"
+CONF_ALIGN_POLLS = "align_polls"
+CONF_MAX_FAILED_POLLS = "max_failed_polls"
+CONF_MAX_STALE_SECONDS = "max_stale_seconds"
+CONF_SCHEDULE = "schedule"
+CONF_SALT_LOW_PPM = "salt_low_ppm"
+CONF_VERIFY_WRITES = "verify_writes"
+CONF_HOSTS = "hosts"
+CONF_BASE_URLS = "base_urls"
 
 DEFAULT_POLL_SECONDS = 300
 DEFAULT_REQUEST_TIMEOUT = 30
+DEFAULT_ALIGN_POLLS = True
+# Keep serving the last snapshot until this many polls in a row fail, or it
+# gets this old; then the hub's entities become unavailable
+DEFAULT_MAX_FAILED_POLLS = 3
+DEFAULT_MAX_STALE_SECONDS = 900
+# Read back each written device until it shows the change; needs firmware
+# that answers GET cmd=devices&device=<n>
+DEFAULT_VERIFY_WRITES = False
+
+# Recordings go to <config>/poolsync_traces/<hub>.jsonl.gz
+TRACE_DIR = "poolsync_traces"
+
+TOPOLOGY_STORAGE_VERSION = 1
+SCHEDULE_STORAGE_VERSION = 1
+
+PLATFORMS: list[str] = [
+    "sensor",
+    "switch",
+    "number",
+    "binary_sensor",
+    "climate",
+    "button",
+]
+# Forwarded for every hub: hub sensors and the ping button
+HUB_PLATFORMS: tuple[str, ...] = ("sensor", "button")
+# What each attached device type (``deviceType``) adds
+DEVICE_TYPE_PLATFORMS: dict[str, tuple[str, ...]] = {
+    "chlorSync": ("switch", "number"),
+    "heatPump": ("number", "binary_sensor", "climate"),
+}
 
 ATTR_MAC = "mac"
+# Set on entities showing a restored state until the first fresh snapshot
+ATTR_STALE = "stale"
+
+SERVICE_PROFILE = "profile"
+ATTR_DURATION = "duration"
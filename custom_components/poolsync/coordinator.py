@@ -1,25 +1,372 @@
-
 from __future__ import annotations
 
+import asyncio
+from dataclasses import replace
 import logging
+import time
 from datetime import timedelta
-from typing import Any, Dict
+from typing import Any, Awaitable, Callable, Dict, Optional
 
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .api import PoolSyncApi
+from .api import PoolSyncApi, PoolSyncRequestError, PoolSyncVerifyError
+from .cadence import CADENCE_NO_PERIOD, CADENCE_NO_STAMP, CadenceEstimator
+from .const import DEFAULT_MAX_FAILED_POLLS, DEFAULT_MAX_STALE_SECONDS, DOMAIN
+from .events import PoolSyncEvent, TransitionDetector
+from .model import ChlorSyncDevice, HeatPumpDevice, HubTopology, PoolSyncSnapshot
+from .profiler import PROFILER
+from .trace import SnapshotTraceRecorder
 
 _LOGGER = logging.getLogger(__name__)
 
-class PoolSyncCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
-    def __init__(self, hass: HomeAssistant, api: PoolSyncApi, scan_interval: timedelta) -> None:
-        super().__init__(hass, _LOGGER, name="PoolSync Coordinator", update_interval=scan_interval)
+# When setup runs from the cached topology, the first poll runs in the
+# background with a short timeout so a dead hub is noticed quickly; later polls
+# use the API's latency-adaptive timeout.
+INITIAL_REFRESH_TIMEOUT = 5.0
+# Retry this often until the first snapshot arrives
+STARTUP_RETRY_INTERVAL = timedelta(seconds=30)
+# While serving the last snapshot, retry transient errors after this, doubling
+# per failure up to the scan interval
+QUICK_RETRY_INTERVAL = timedelta(seconds=10)
+TOPOLOGY_SAVE_DELAY = 1.0
+
+
+class PoolSyncCoordinator(DataUpdateCoordinator[PoolSyncSnapshot]):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: PoolSyncApi,
+        scan_interval: timedelta,
+        store: Optional[Store] = None,
+        align_polls: bool = True,
+        max_failed_polls: int = DEFAULT_MAX_FAILED_POLLS,
+        max_stale: timedelta = timedelta(seconds=DEFAULT_MAX_STALE_SECONDS),
+    ) -> None:
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="PoolSync Coordinator",
+            update_interval=scan_interval,
+            # Refreshes that joined another fetch return the same snapshot;
+            # don't fan it out to every entity again
+            always_update=False,
+        )
         self.api = api
+        self._scan_interval = scan_interval
+        self._initial_timeout: Optional[float] = None
+        # Devices attached to the hub, cached in ``store`` across restarts
+        self.topology: Optional[HubTopology] = None
+        self._store = store
+        # Set when the entry records every poolSync&all response
+        self.trace: Optional[SnapshotTraceRecorder] = None
+        self._device_info: Optional[Dict[str, Any]] = None
+        # Writes read the device back (api setters' ``verify``); off by default
+        self.verify_writes = False
+        # Set when the entry fires poolsync_* transition events
+        self.events: Optional[TransitionDetector] = None
+        self._device_id: Optional[str] = None
+        # Schedules polls just after the hub refreshes its readings
+        self.cadence: Optional[CadenceEstimator] = CadenceEstimator() if align_polls else None
+        # Whether polls not being aligned has been logged
+        self._cadence_reported = False
+        # At most one fetch runs against the hub, plus one queued behind it
+        self._fetch_lock = asyncio.Lock()
+        self._follow_up: Optional[asyncio.Future[PoolSyncSnapshot]] = None
+        # Failed polls keep the last snapshot until either limit is reached
+        self._max_failed_polls = max(1, max_failed_polls)
+        self._max_stale = max_stale
+        # Failed polls in a row on the normal schedule; quick retries between
+        # them only count against max_stale
+        self._failed_polls = 0
+        self._quick_retry = False
+        # Told about every failed poll, including ones that don't update entities
+        self._failure_listeners: list[Callable[[], None]] = []
+        self._topology_listeners: list[Callable[[HubTopology], None]] = []
+
+    async def _async_update_data(self) -> PoolSyncSnapshot:
+        if not self._fetch_lock.locked():
+            async with self._fetch_lock:
+                return await self._async_fetch()
+        # A fetch is running (a tick, a setter's refresh, the ping button):
+        # everything requested meanwhile shares the one fetch that follows it
+        self.api.metrics.coalesced += 1
+        if self._follow_up is None:
+            self._follow_up = asyncio.ensure_future(self._async_fetch_next())
+        return await asyncio.shield(self._follow_up)
+
+    async def _async_fetch_next(self) -> PoolSyncSnapshot:
+        async with self._fetch_lock:
+            self._follow_up = None
+            return await self._async_fetch()
+
+    async def _async_fetch(self) -> PoolSyncSnapshot:
+        with PROFILER.span("coordinator_tick"):
+            started = time.perf_counter()
+            timeout, self._initial_timeout = self._initial_timeout, None
+            try:
+                data = await self.api.get_poolsync_all(timeout=timeout)
+            except Exception as err:
+                duration = time.perf_counter() - started
+                self.api.metrics.record_update(duration, ok=False, error=str(err))
+                self._check_overrun(duration)
+                return self._async_handle_failure(err)
+            if self.trace is not None:
+                self.trace.record(data)
+            # Parse once per poll; every entity reads attributes from the snapshot
+            with PROFILER.span("snapshot_build"):
+                snapshot = PoolSyncSnapshot.from_dict(data)
+            duration = time.perf_counter() - started
+            self.api.metrics.record_update(duration, ok=True)
+            self._failed_polls = 0
+            self._quick_retry = False
+            self.update_interval = self._next_interval(snapshot)
+            if self._check_overrun(duration):
+                # Back off: the hub spends no more than half its time answering us
+                self.update_interval = max(self.update_interval, timedelta(seconds=duration))
+            await self._async_update_topology(HubTopology.from_snapshot(snapshot))
+            return snapshot
+
+    def _async_handle_failure(self, err: Exception) -> PoolSyncSnapshot:
+        """Serve the last snapshot through a short outage, else raise UpdateFailed."""
+        for listener in list(self._failure_listeners):
+            listener()
+        if not self._quick_retry:
+            self._failed_polls += 1
+        self._quick_retry = False
+        if self.data is None:
+            self.update_interval = min(self._scan_interval, STARTUP_RETRY_INTERVAL)
+        elif self.stale_grace_left:
+            failures = self.api.metrics.consecutive_failures
+            if isinstance(err, PoolSyncRequestError) and not err.transient:
+                self.update_interval = self._scan_interval
+            else:
+                self.update_interval = min(
+                    self._scan_interval, QUICK_RETRY_INTERVAL * 2 ** (failures - 1)
+                )
+                self._quick_retry = self.update_interval < self._scan_interval
+            _LOGGER.debug(
+                "PoolSync poll failed (%d in a row), serving the last snapshot: %s",
+                failures,
+                err,
+            )
+            # Unchanged data: entities are not updated and stay available
+            return self.data
+        else:
+            self.update_interval = self._scan_interval
+        raise UpdateFailed(f"Error communicating with PoolSync API: {err}") from err
+
+    @property
+    def stale_grace_left(self) -> bool:
+        """Whether a failed poll may still serve the last snapshot."""
+        if self._failed_polls >= self._max_failed_polls:
+            return False
+        age = self.api.metrics.data_age
+        return age is not None and age < self._max_stale.total_seconds()
+
+    @property
+    def stale(self) -> bool:
+        """Serving the last good snapshot after failed polls."""
+        return (
+            self.data is not None
+            and self.last_update_success
+            and self.api.metrics.consecutive_failures > 0
+        )
+
+    @callback
+    def async_add_failure_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call ``listener`` on every failed poll; returns the remover."""
+        self._failure_listeners.append(listener)
+        return lambda: self._failure_listeners.remove(listener)
+
+    @callback
+    def async_add_topology_listener(
+        self, listener: Callable[[HubTopology], None]
+    ) -> Callable[[], None]:
+        """Call ``listener`` with the new topology when the hub's devices change."""
+        self._topology_listeners.append(listener)
+        return lambda: self._topology_listeners.remove(listener)
+
+    def _check_overrun(self, duration: float) -> bool:
+        """Count a fetch that took longer than the poll interval."""
+        if duration <= self._scan_interval.total_seconds():
+            return False
+        self.api.metrics.overruns += 1
+        _LOGGER.debug(
+            "PoolSync poll took %.1fs, longer than the %ss interval",
+            duration,
+            self._scan_interval.total_seconds(),
+        )
+        return True
+
+    def _next_interval(self, snapshot: PoolSyncSnapshot) -> timedelta:
+        """The scan interval, shifted to land just after the hub's next refresh."""
+        if self.cadence is None:
+            return self._scan_interval
+        self.cadence.observe(
+            time.time(), snapshot.status.date_time, snapshot.stats.up_time_secs
+        )
+        status = self.cadence.status
+        if not self._cadence_reported and status in (CADENCE_NO_STAMP, CADENCE_NO_PERIOD):
+            self._cadence_reported = True
+            _LOGGER.info(
+                "PoolSync hub %s: no refresh period in status.dateTime (%s); "
+                "polling every %ss without alignment",
+                self.api.base_url,
+                status,
+                self._scan_interval.total_seconds(),
+            )
+        return self._aligned_interval()
+
+    def _aligned_interval(self) -> timedelta:
+        delay = (
+            self.cadence.next_delay(time.time(), self._scan_interval.total_seconds())
+            if self.cadence is not None
+            else None
+        )
+        return self._scan_interval if delay is None else timedelta(seconds=delay)
 
-    async def _async_update_data(self) -> Dict[str, Any]:
+    @callback
+    def async_set_updated_data(self, data: PoolSyncSnapshot) -> None:
+        # Home Assistant schedules the next poll one interval from now; keep
+        # it on the hub's refresh cadence instead
+        if self.cadence is not None and self.cadence.period is not None:
+            self.update_interval = self._aligned_interval()
+        super().async_set_updated_data(data)
+
+    async def async_write_device(
+        self, device_index: int, write: Awaitable[Dict[str, Any]]
+    ) -> None:
+        """Await a write and show its read-back without polling the hub.
+
+        Unverified writes (no read-back to show) refresh the hub instead. If a
+        verified change didn't apply, a full refresh puts the entities back to
+        what the hub reports. Failures reach the caller (a service call) as
+        HomeAssistantError, so they are shown rather than logged as tracebacks.
+        """
         try:
-            data = await self.api.get_poolsync_all()
-            return data
-        except Exception as err:
-            raise UpdateFailed(f"Error communicating with PoolSync API: {err}") from err
+            device = await write
+        except PoolSyncVerifyError as err:
+            await self.async_request_refresh()
+            raise HomeAssistantError(f"PoolSync hub did not apply the change: {err}") from err
+        except PoolSyncRequestError as err:
+            raise HomeAssistantError(f"PoolSync hub did not take the change: {err}") from err
+        if not self.async_apply_device(device_index, device):
+            await self.async_request_refresh()
+
+    @callback
+    def async_apply_device(self, device_index: int, device: Dict[str, Any]) -> bool:
+        """Fold one device's read-back into the current snapshot.
+
+        False when it can't be applied (no snapshot yet, an unknown device or a
+        partial read-back); the caller should refresh instead.
+        """
+        if self.data is None or not all(
+            isinstance(device.get(key), dict) for key in ("status", "config")
+        ):
+            return False
+        if device_index == 0:
+            snapshot = replace(self.data, chlor=ChlorSyncDevice.from_dict(0, device))
+        elif device_index == self.data.heatpump_index:
+            snapshot = replace(
+                self.data, heatpump=HeatPumpDevice.from_dict(device_index, device)
+            )
+        else:
+            return False
+        self.async_set_updated_data(snapshot)
+        return True
+
+    @callback
+    def async_refresh_in_background(self, entry: ConfigEntry) -> None:
+        """Run the first poll without blocking setup, with a short timeout."""
+        self._initial_timeout = min(INITIAL_REFRESH_TIMEOUT, self.api.default_timeout)
+        entry.async_create_background_task(
+            self.hass, self.async_refresh(), f"poolsync_first_refresh_{entry.entry_id}"
+        )
+
+    def hub_id(self, entry: ConfigEntry) -> str:
+        """MAC (or fallback) identifying the hub's device and unique IDs."""
+        return self.api.mac_address or entry.data.get("mac") or "poolsync"
+
+    def device_info(self, entry: ConfigEntry) -> Dict[str, Any]:
+        """Device info shared by every entity of the hub (not copied per entity)."""
+        if self._device_info is None:
+            info: Dict[str, Any] = {
+                "identifiers": {(DOMAIN, self.hub_id(entry))},
+                "manufacturer": "AquaCal",
+                "name": "PoolSync",
+                "model": "PoolSync",
+            }
+            if self.topology and self.topology.fw_version:
+                info["sw_version"] = str(self.topology.fw_version)
+            self._device_info = info
+        return self._device_info
+
+    @property
+    def heatpump_index(self) -> Optional[int]:
+        return self.topology.heatpump_index if self.topology else None
+
+    async def async_load_topology(self) -> bool:
+        """Load the cached topology; True if entities can be set up from it."""
+        if self._store is None:
+            return False
+        data = await self._store.async_load()
+        if not isinstance(data, dict):
+            return False
+        self.topology = HubTopology.from_dict(data)
+        if self.topology.mac and not self.api.mac_address:
+            self.api.mac_address = self.topology.mac
+        return True
+
+    async def _async_update_topology(self, topology: HubTopology) -> None:
+        previous = self.topology
+        if topology == previous:
+            return
+        self.topology = topology
+        if self._store is not None:
+            if previous is not None and topology.types == previous.types:
+                self._store.async_delay_save(topology.as_dict, TOPOLOGY_SAVE_DELAY)
+            else:
+                # New devices reload the entry, which reads the topology back
+                # from the store; it has to be written before listeners hear
+                await self._store.async_save(topology.as_dict())
+        for listener in list(self._topology_listeners):
+            listener(topology)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        with PROFILER.span("entity_fanout"):
+            super().async_update_listeners()
+        # After the fan-out, so automations see the entities' new states
+        if self.events is not None and self.data is not None:
+            self._async_fire_events(self.events.update(self.data))
+
+    @callback
+    def _async_fire_events(self, events: list[PoolSyncEvent]) -> None:
+        if not events:
+            return
+        if self._device_id is None and self._device_info is not None:
+            device = dr.async_get(self.hass).async_get_device(
+                identifiers=self._device_info["identifiers"]
+            )
+            self._device_id = device.id if device else None
+        base = {"device_id": self._device_id, "mac": self.api.mac_address}
+        for event in events:
+            self.hass.bus.async_fire(event.event_type, {**base, **event.data})
+
+    def as_diagnostics(self) -> Dict[str, Any]:
+        """Coordinator state for the diagnostics download."""
+        return {
+            "last_update_success": self.last_update_success,
+            "stale": self.stale,
+            "update_interval": (
+                self.update_interval.total_seconds() if self.update_interval else None
+            ),
+            "topology": self.topology.as_dict() if self.topology else None,
+            "cadence": self.cadence.as_dict() if self.cadence else None,
+            "ticks": self.api.metrics.tick_history(),
+        }
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .api import PoolSyncApi
+from .const import DOMAIN
+from .coordinator import PoolSyncCoordinator
+from .fleet import DATA_FLEET
+from .util import redact, redact_text
+
+
+def _redact_body(api: PoolSyncApi, body: Any) -> Any:
+    """Mask credentials in a body kept as text; ``redact`` only walks dicts and lists."""
+    if isinstance(body, str):
+        return redact_text(body, secrets=(api.token, api.user_id))
+    return body
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a PoolSync config entry."""
+    runtime = hass.data[DOMAIN][entry.entry_id]
+    api: PoolSyncApi = runtime["api"]
+    coordinator: PoolSyncCoordinator = runtime["coordinator"]
+
+    return redact(
+        {
+            "entry": {
+                "title": entry.title,
+                "data": dict(entry.data),
+                "options": dict(entry.options),
+            },
+            "api": {
+                "base_url": api.base_url,
+                "mac_address": api.mac_address,
+                "headers": api.base_headers(),
+                "timeouts": {method: t.as_dict() for method, t in api.timeouts.items()},
+            },
+            "snapshot": asdict(coordinator.data) if coordinator.data else None,
+            "coordinator": coordinator.as_diagnostics(),
+            "schedule": runtime["scheduler"].as_dict() if "scheduler" in runtime else None,
+            "fleet": hass.data[DATA_FLEET].as_dict() if DATA_FLEET in hass.data else None,
+            "metrics": api.metrics.as_dict(),
+            "recent_responses": {
+                "compressed_bytes": api.recent_payloads.compressed_bytes,
+                "entries": [
+                    {**item, "body": _redact_body(api, item["body"])}
+                    for item in api.recent_payloads.entries()
+                ],
+            },
+        }
+    )
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import ipaddress
+import logging
+import re
+from typing import Any, Iterable, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiohttp import ClientSession, ClientTimeout
+
+_LOGGER = logging.getLogger(__name__)
+
+# A /24 is scanned in about two rounds of PROBE_TIMEOUT
+DISCOVERY_CONCURRENCY = 128
+PROBE_CONNECT_TIMEOUT = 0.75
+PROBE_TIMEOUT = 1.5
+# Refuse scans larger than a /22
+MAX_HOSTS = 1024
+
+_SPLIT = re.compile(r"[\s,;]+")
+
+
+@dataclass(frozen=True)
+class DiscoveredHub:
+    """A host that answered like a PoolSync hub.
+
+    ``mac``/``fw_version`` are only known when the hub serves ``poolSync&all``
+    without credentials; otherwise they stay None until push-link.
+    """
+
+    base_url: str
+    mac: Optional[str] = None
+    fw_version: Optional[str] = None
+    name: Optional[str] = None
+
+    @property
+    def host(self) -> str:
+        return host_of(self.base_url)
+
+    @property
+    def label(self) -> str:
+        details = ", ".join(v for v in (self.mac, self.fw_version and f"fw {self.fw_version}") if v)
+        return f"{self.base_url} ({details})" if details else self.base_url
+
+
+def host_of(url: str) -> str:
+    """Lower-cased ``host[:port]`` of a base URL."""
+    if "://" not in url:
+        url = f"http://{url}"
+    return (urlsplit(url).netloc or "").lower()
+
+
+def expand_hosts(text: str, max_hosts: int = MAX_HOSTS) -> list[str]:
+    """Turn "192.168.1.0/24, 10.0.0.7, http://pool.local:8080" into base URLs.
+
+    Raises ValueError for malformed networks or scans above ``max_hosts``.
+    """
+    urls: list[str] = []
+    seen: set[str] = set()
+
+    def _add(host: str) -> None:
+        url = f"http://{host}"
+        if url not in seen:
+            seen.add(url)
+            urls.append(url)
+
+    for token in _SPLIT.split(text.strip()):
+        if not token:
+            continue
+        if "/" in token and "://" not in token:
+            network = ipaddress.ip_network(token, strict=False)
+            if network.num_addresses > max_hosts + 2:
+                raise ValueError(f"{token} is larger than {max_hosts} hosts")
+            for address in network.hosts():
+                _add(str(address))
+            # hosts() of a /32 is empty on older Pythons
+            if network.num_addresses == 1:
+                _add(str(network.network_address))
+        else:
+            host = host_of(token)
+            if not host:
+                raise ValueError(f"invalid host {token!r}")
+            _add(host)
+        if len(urls) > max_hosts:
+            raise ValueError(f"more than {max_hosts} hosts")
+    return urls
+
+
+def _from_full(base_url: str, data: dict[str, Any]) -> DiscoveredHub:
+    hub = data.get("poolSync") or {}
+    system = hub.get("system") or {}
+    return DiscoveredHub(
+        base_url=base_url,
+        mac=system.get("macAddr"),
+        fw_version=system.get("fwVersion"),
+        name=(hub.get("config") or {}).get("name") or None,
+    )
+
+
+async def _get_json(session: ClientSession, url: str, params: dict[str, str]) -> Any:
+    async with session.get(
+        url,
+        params=params,
+        # Don't hold one of the hub's few sockets after the probe
+        headers={"Accept": "application/json", "Connection": "close"},
+        timeout=ClientTimeout(total=PROBE_TIMEOUT, sock_connect=PROBE_CONNECT_TIMEOUT),
+        allow_redirects=False,
+    ) as resp:
+        try:
+            return await resp.json(content_type=None)
+        except ValueError:
+            return None
+
+
+async def async_probe(session: ClientSession, base_url: str) -> Optional[DiscoveredHub]:
+    """Return a DiscoveredHub if ``base_url`` serves the PoolSync API."""
+    url = f"{base_url}/api/poolsync"
+    try:
+        data = await _get_json(session, url, {"cmd": "poolSync", "all": ""})
+        if isinstance(data, dict) and isinstance(data.get("poolSync"), dict):
+            return _from_full(base_url, data)
+        # Hubs that require credentials still answer the push-link status
+        data = await _get_json(session, url, {"cmd": "pushLink", "status": ""})
+    except (asyncio.TimeoutError, aiohttp.ClientError, OSError):
+        return None
+    if isinstance(data, dict) and ("timeRemaining" in data or "macAddress" in data):
+        return DiscoveredHub(base_url=base_url, mac=data.get("macAddress"))
+    return None
+
+
+async def async_discover_hubs(
+    session: ClientSession,
+    base_urls: Iterable[str],
+    *,
+    skip_hosts: Iterable[str] = (),
+    skip_macs: Iterable[str] = (),
+    concurrency: int = DISCOVERY_CONCURRENCY,
+) -> list[DiscoveredHub]:
+    """Probe hosts concurrently; skip hosts/MACs that are already configured."""
+    skip_host_set = {host_of(h) for h in skip_hosts if h}
+    skip_mac_set = {m.lower() for m in skip_macs if m}
+    targets = [u for u in base_urls if host_of(u) not in skip_host_set]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _probe(base_url: str) -> Optional[DiscoveredHub]:
+        async with semaphore:
+            return await async_probe(session, base_url)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    results = await asyncio.gather(*(_probe(u) for u in targets))
+    found = [
+        hub
+        for hub in results
+        if hub is not None and (hub.mac or "").lower() not in skip_mac_set
+    ]
+    _LOGGER.debug(
+        "PoolSync discovery probed %d hosts in %.1fs, found %d",
+        len(targets),
+        loop.time() - started,
+        len(found),
+    )
+    return found
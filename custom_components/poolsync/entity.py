@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from homeassistant.core import State
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import ATTR_STALE
+from .coordinator import PoolSyncCoordinator
+
+# Attributes Home Assistant writes itself; everything else came from the entity
+_HA_ATTRIBUTES = frozenset(
+    {
+        "friendly_name",
+        "icon",
+        "entity_picture",
+        "unit_of_measurement",
+        "device_class",
+        "state_class",
+        "supported_features",
+        "attribution",
+        "assumed_state",
+        "restored",
+        ATTR_STALE,
+    }
+)
+
+
+class PoolSyncRestoreEntity(CoordinatorEntity[PoolSyncCoordinator], RestoreEntity):
+    """Coordinator entity that shows its last known state until the first poll.
+
+    If the coordinator has no snapshot yet when the entity is added, the last
+    state is loaded from Home Assistant's restore cache. Platforms serve it
+    while ``stale`` is true (and expose ``stale: true`` as an attribute), and
+    stay available even if the first refresh fails; the first fresh snapshot
+    replaces it.
+    """
+
+    _restored: Optional[State] = None
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if self.coordinator.data is None:
+            self._restored = await self.async_get_last_state()
+
+    @property
+    def stale(self) -> bool:
+        return self.coordinator.data is None and self._restored is not None
+
+    @property
+    def available(self) -> bool:
+        # The restored state stands in for data while the first refresh fails
+        return self.stale or super().available
+
+    def restored_attributes(self) -> dict[str, Any]:
+        """Entity attributes of the restored state, flagged as stale."""
+        attrs: dict[str, Any] = {}
+        if self._restored is not None:
+            attrs = {
+                k: v for k, v in self._restored.attributes.items() if k not in _HA_ATTRIBUTES
+            }
+        attrs[ATTR_STALE] = True
+        return attrs
@@ -0,0 +1,183 @@
+"""Semantic transitions between snapshots, fired as ``poolsync_*`` bus events.
+
+Each poll is compared with the previous one and only what changed meaning is
+reported: boost ended, a fault appeared or cleared, a device went offline or
+came back, the compressor or water flow started or stopped, salt fell below a
+threshold. Automations subscribe to the event (or the matching device trigger)
+instead of state triggers on many entities.
+
+Event data always holds ``device_id`` (the hub's device) and ``mac``; see
+``PoolSyncEvent.data`` for the rest.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from .model import PoolSyncSnapshot
+
+# Trigger type -> event type ``poolsync_<trigger type>``
+TRIGGER_BOOST_FINISHED = "boost_finished"
+TRIGGER_FAULT_RAISED = "fault_raised"
+TRIGGER_FAULT_CLEARED = "fault_cleared"
+TRIGGER_WENT_OFFLINE = "went_offline"
+TRIGGER_CAME_ONLINE = "came_online"
+TRIGGER_COMPRESSOR_STARTED = "compressor_started"
+TRIGGER_COMPRESSOR_STOPPED = "compressor_stopped"
+TRIGGER_FLOW_LOST = "flow_lost"
+TRIGGER_FLOW_RESTORED = "flow_restored"
+TRIGGER_SALT_LOW = "salt_low"
+
+TRIGGER_TYPES: tuple[str, ...] = (
+    TRIGGER_BOOST_FINISHED,
+    TRIGGER_FAULT_RAISED,
+    TRIGGER_FAULT_CLEARED,
+    TRIGGER_WENT_OFFLINE,
+    TRIGGER_CAME_ONLINE,
+    TRIGGER_COMPRESSOR_STARTED,
+    TRIGGER_COMPRESSOR_STOPPED,
+    TRIGGER_FLOW_LOST,
+    TRIGGER_FLOW_RESTORED,
+    TRIGGER_SALT_LOW,
+)
+# Only offered as device triggers on hubs with a heat pump
+HEATPUMP_TRIGGER_TYPES = frozenset(
+    {
+        TRIGGER_COMPRESSOR_STARTED,
+        TRIGGER_COMPRESSOR_STOPPED,
+        TRIGGER_FLOW_LOST,
+        TRIGGER_FLOW_RESTORED,
+    }
+)
+
+DEFAULT_SALT_LOW_PPM = 2700
+# Salt must recover this far above the threshold before salt_low fires again
+SALT_HYSTERESIS_PPM = 100
+
+
+def event_type(trigger_type: str) -> str:
+    return f"poolsync_{trigger_type}"
+
+
+@dataclass(frozen=True, slots=True)
+class PoolSyncEvent:
+    trigger_type: str
+    data: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def event_type(self) -> str:
+        return event_type(self.trigger_type)
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _online(value: Any) -> Optional[bool]:
+    return None if value is None else bool(value)
+
+
+class TransitionDetector:
+    """Compares each snapshot with the previous one; the first is the baseline."""
+
+    __slots__ = ("salt_low_ppm", "_previous", "_salt_low")
+
+    def __init__(self, salt_low_ppm: Optional[float] = DEFAULT_SALT_LOW_PPM) -> None:
+        self.salt_low_ppm = salt_low_ppm
+        self._previous: Optional[PoolSyncSnapshot] = None
+        self._salt_low = False
+
+    def update(self, snapshot: PoolSyncSnapshot) -> list[PoolSyncEvent]:
+        previous, self._previous = self._previous, snapshot
+        events: list[PoolSyncEvent] = []
+        self._check_salt(snapshot, events, baseline=previous is None)
+        if previous is None or previous is snapshot:
+            return events
+
+        # Boost counts down in minutes
+        before = _number(previous.chlor.status.boost_remaining) or 0
+        after = _number(snapshot.chlor.status.boost_remaining) or 0
+        if before > 0 and after <= 0:
+            events.append(PoolSyncEvent(TRIGGER_BOOST_FINISHED))
+
+        for device, old, new in (
+            ("hub", previous.status.online, snapshot.status.online),
+            ("chlor", previous.chlor.online, snapshot.chlor.online),
+            ("heatpump", previous.heatpump.online, snapshot.heatpump.online),
+        ):
+            old, new = _online(old), _online(new)
+            if old is None or new is None or old == new:
+                continue
+            trigger = TRIGGER_CAME_ONLINE if new else TRIGGER_WENT_OFFLINE
+            events.append(PoolSyncEvent(trigger, {"device": device}))
+
+        self._check_faults(
+            "chlor", previous.chlor.active_faults, snapshot.chlor.active_faults, events
+        )
+        if previous.heatpump_index is not None and snapshot.heatpump_index is not None:
+            old_flags, new_flags = previous.heatpump.flags, snapshot.heatpump.flags
+            self._check_faults("heatpump", old_flags.faults, new_flags.faults, events)
+            if (
+                old_flags.state.value is not None
+                and new_flags.state.value is not None
+                and old_flags.compressor != new_flags.compressor
+            ):
+                events.append(
+                    PoolSyncEvent(
+                        TRIGGER_COMPRESSOR_STARTED
+                        if new_flags.compressor
+                        else TRIGGER_COMPRESSOR_STOPPED
+                    )
+                )
+            # Same reading as the Flow binary sensor
+            if (
+                old_flags.ctrl.value is not None
+                and new_flags.ctrl.value is not None
+                and old_flags.flow != new_flags.flow
+            ):
+                events.append(
+                    PoolSyncEvent(
+                        TRIGGER_FLOW_RESTORED if new_flags.flow else TRIGGER_FLOW_LOST
+                    )
+                )
+        return events
+
+    @staticmethod
+    def _check_faults(
+        device: str, old: tuple, new: tuple, events: list[PoolSyncEvent]
+    ) -> None:
+        if old == new:
+            return
+        # A word whose value changes clears the old value and raises the new one
+        for fault in new:
+            if fault not in old:
+                events.append(
+                    PoolSyncEvent(TRIGGER_FAULT_RAISED, {"device": device, **fault.as_dict()})
+                )
+        for fault in old:
+            if fault not in new:
+                events.append(
+                    PoolSyncEvent(TRIGGER_FAULT_CLEARED, {"device": device, **fault.as_dict()})
+                )
+
+    def _check_salt(
+        self, snapshot: PoolSyncSnapshot, events: list[PoolSyncEvent], baseline: bool
+    ) -> None:
+        salt = _number(snapshot.chlor.status.salt_ppm)
+        if self.salt_low_ppm is None or salt is None:
+            return
+        if salt < self.salt_low_ppm:
+            if not self._salt_low and not baseline:
+                events.append(
+                    PoolSyncEvent(
+                        TRIGGER_SALT_LOW, {"salt_ppm": salt, "threshold": self.salt_low_ppm}
+                    )
+                )
+            self._salt_low = True
+        elif salt >= self.salt_low_ppm + SALT_HYSTERESIS_PPM:
+            self._salt_low = False
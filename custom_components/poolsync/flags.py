@@ -0,0 +1,171 @@
+"""Decoded heat-pump flags and device fault words.
+
+The hub reports heat-pump state as two integers (``ctrlFlags``,
+``stateFlags``) and each device's faults as an array of words. They are
+decoded once per snapshot while parsing; entities read the named result.
+
+Any non-zero fault word is a fault. What the bits of a word mean isn't
+documented, so faults are reported as the word's position and raw value.
+
+Bit names cover what the integration has relied on so far; set bits without a name
+are kept in ``FlagSet.unknown_bits`` (and show up in diagnostics) so they can
+be identified and added to the tables, which also adds a binary sensor.
+
+Flow, fan and compressor were read from exact values before the bits were
+named. Those values keep their meaning; only values never seen before are
+read bit by bit.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+# bit -> flag name; every name becomes a ``heatpump_<name>`` binary sensor
+CTRL_FLAG_NAMES: dict[int, str] = {
+    0: "flow",
+}
+STATE_FLAG_NAMES: dict[int, str] = {
+    3: "fan",
+}
+
+# stateFlags values seen from heat pumps -> (compressor, fan), as the
+# integration has always reported them
+KNOWN_STATE_FLAGS: dict[int, tuple[bool, bool]] = {
+    0: (False, False),
+    8: (True, True),
+    520: (False, True),
+}
+
+# Distinct flag values are few; bound the cache anyway
+_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True, slots=True)
+class FlagSet:
+    """Named view of one flags integer."""
+
+    value: Optional[int] = None
+    # A tuple rather than a set so the snapshot stays JSON-serializable
+    names: tuple[str, ...] = ()
+    unknown_bits: tuple[int, ...] = ()
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.names
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "value": self.value,
+            "flags": list(self.names),
+            "unknown_bits": list(self.unknown_bits),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class Fault:
+    """One non-zero entry of a device's ``faults`` array."""
+
+    index: int
+    value: Any
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"index": self.index, "value": self.value}
+
+
+EMPTY_FLAGS = FlagSet()
+
+
+def _int(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _bits(value: int) -> Iterable[int]:
+    bit = 0
+    while value:
+        if value & 1:
+            yield bit
+        value >>= 1
+        bit += 1
+
+
+class FlagTable:
+    """Decodes flag integers against a bit-name table, memoized per value."""
+
+    __slots__ = ("names", "_cache")
+
+    def __init__(self, names: dict[int, str]) -> None:
+        self.names = names
+        self._cache: dict[int, FlagSet] = {}
+
+    def decode(self, value: Any) -> FlagSet:
+        number = _int(value)
+        if number is None or number < 0:
+            return EMPTY_FLAGS
+        flags = self._cache.get(number)
+        if flags is None:
+            bits = tuple(_bits(number))
+            flags = FlagSet(
+                value=number,
+                names=tuple(self.names[b] for b in bits if b in self.names),
+                unknown_bits=tuple(b for b in bits if b not in self.names),
+            )
+            if len(self._cache) >= _CACHE_SIZE:
+                self._cache.clear()
+            self._cache[number] = flags
+        return flags
+
+
+def active_faults(words: tuple) -> tuple[Fault, ...]:
+    """Every non-zero fault word, whatever its type."""
+    return tuple(Fault(index, word) for index, word in enumerate(words) if word != 0)
+
+
+CTRL_FLAGS = FlagTable(CTRL_FLAG_NAMES)
+STATE_FLAGS = FlagTable(STATE_FLAG_NAMES)
+
+
+@dataclass(frozen=True, slots=True)
+class HeatPumpFlags:
+    """Decoded ``ctrlFlags``/``stateFlags`` and faults of the heat pump."""
+
+    ctrl: FlagSet = EMPTY_FLAGS
+    state: FlagSet = EMPTY_FLAGS
+    faults: tuple[Fault, ...] = ()
+
+    @classmethod
+    def decode(cls, ctrl_flags: Any, state_flags: Any, faults: tuple) -> HeatPumpFlags:
+        return cls(
+            ctrl=CTRL_FLAGS.decode(ctrl_flags),
+            state=STATE_FLAGS.decode(state_flags),
+            faults=active_faults(faults),
+        )
+
+    @property
+    def flow(self) -> bool:
+        # Any ctrlFlags value has always meant flow
+        return (self.ctrl.value or 0) >= 1
+
+    @property
+    def compressor(self) -> bool:
+        known = KNOWN_STATE_FLAGS.get(self.state.value or 0)
+        if known is not None:
+            return known[0]
+        # 520 shows another bit next to the fan's can mean the compressor is
+        # held, so only the fan bit on its own counts
+        return "fan" in self.state and not self.state.unknown_bits
+
+    @property
+    def fan(self) -> bool:
+        known = KNOWN_STATE_FLAGS.get(self.state.value or 0)
+        if known is not None:
+            return known[1]
+        return "fan" in self.state
+
+
+EMPTY_HEATPUMP_FLAGS = HeatPumpFlags()
@@ -0,0 +1,233 @@
+"""Roll-ups across every PoolSync hub, kept up to date one hub at a time.
+
+Each hub's coordinator publishes a small ``HubSummary``; the aggregator
+subtracts the hub's previous summary and adds the new one, so an update costs
+the same with 2 hubs or 500, and only hubs whose summary changed cost anything.
+The fleet sensors (on a "PoolSync Fleet" device) are written at most once per
+event-loop pass, however many hubs published in it.
+"""
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .coordinator import PoolSyncCoordinator
+
+# hass.data key of the domain-wide FleetAggregator
+DATA_FLEET = f"{DOMAIN}_fleet"
+
+FLEET_DEVICE_INFO: dict[str, Any] = {
+    "identifiers": {(DOMAIN, "fleet")},
+    "manufacturer": "AquaCal",
+    "name": "PoolSync Fleet",
+    "model": "PoolSync Fleet",
+}
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class HubSummary:
+    """What one hub contributes to the fleet roll-ups."""
+
+    online: bool = False
+    in_fault: bool = False
+    salt_ppm: Optional[float] = None
+    water_temp: Optional[float] = None
+    # W, cell output voltage times forward current
+    cell_power: Optional[float] = None
+
+    @classmethod
+    def from_coordinator(cls, coordinator: PoolSyncCoordinator) -> HubSummary:
+        snapshot = coordinator.data
+        if snapshot is None:
+            return cls()
+        chlor = snapshot.chlor
+        volts, amps = chlor.status.out_voltage, chlor.status.fwd_current
+        return cls(
+            online=bool(coordinator.last_update_success),
+            in_fault=bool(chlor.active_faults or snapshot.heatpump.flags.faults),
+            salt_ppm=_number(chlor.status.salt_ppm),
+            water_temp=_number(chlor.status.water_temp),
+            cell_power=(
+                round(volts * amps, 2) if volts is not None and amps is not None else None
+            ),
+        )
+
+
+class FleetAggregator:
+    """Running totals over every hub's latest ``HubSummary``."""
+
+    def __init__(self) -> None:
+        self._hubs: dict[str, HubSummary] = {}
+        self.online = 0
+        self.in_fault = 0
+        # Sorted, so min/max survive a hub's value being taken out
+        self._salt: list[float] = []
+        self._temp_sum = 0.0
+        self._temp_count = 0
+        self._power_sum = 0.0
+        self._power_count = 0
+        # Entry whose sensor platform owns the fleet entities
+        self.owner: Optional[str] = None
+        # Loaded entries whose sensor platform can add them, in setup order
+        self._hosts: dict[str, tuple[HomeAssistant, Callable[[], None]]] = {}
+        self._listeners: list[Callable[[], None]] = []
+        self._notify: Optional[asyncio.Handle] = None
+
+    @property
+    def hubs(self) -> int:
+        return len(self._hubs)
+
+    @property
+    def salt_min(self) -> Optional[float]:
+        return self._salt[0] if self._salt else None
+
+    @property
+    def salt_max(self) -> Optional[float]:
+        return self._salt[-1] if self._salt else None
+
+    @property
+    def water_temp_avg(self) -> Optional[float]:
+        return round(self._temp_sum / self._temp_count, 1) if self._temp_count else None
+
+    @property
+    def cell_power_total(self) -> Optional[float]:
+        return round(self._power_sum, 1) if self._power_count else None
+
+    def update(self, hub: str, summary: HubSummary) -> bool:
+        """Replace one hub's contribution; False if nothing changed."""
+        previous = self._hubs.get(hub)
+        if previous == summary:
+            return False
+        if previous is not None:
+            self._apply(previous, -1)
+        self._hubs[hub] = summary
+        self._apply(summary, 1)
+        self._schedule_notify()
+        return True
+
+    def remove(self, hub: str) -> None:
+        previous = self._hubs.pop(hub, None)
+        if previous is not None:
+            self._apply(previous, -1)
+            self._schedule_notify()
+
+    def _apply(self, summary: HubSummary, sign: int) -> None:
+        self.online += sign * summary.online
+        self.in_fault += sign * summary.in_fault
+        if summary.salt_ppm is not None:
+            if sign > 0:
+                insort(self._salt, summary.salt_ppm)
+            else:
+                del self._salt[bisect_left(self._salt, summary.salt_ppm)]
+        if summary.water_temp is not None:
+            self._temp_sum += sign * summary.water_temp
+            self._temp_count += sign
+        if summary.cell_power is not None:
+            self._power_sum += sign * summary.cell_power
+            self._power_count += sign
+        if not self._hubs:
+            # Don't carry float rounding from removed hubs forever
+            self._temp_sum = self._power_sum = 0.0
+
+    @callback
+    def async_add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _schedule_notify(self) -> None:
+        # Hubs polled in the same loop pass share one write of the fleet sensors
+        if self._listeners and self._notify is None:
+            self._notify = asyncio.get_running_loop().call_soon(self._async_notify)
+
+    @callback
+    def _async_notify(self) -> None:
+        self._notify = None
+        for listener in list(self._listeners):
+            listener()
+
+    @callback
+    def async_claim(
+        self, hass: HomeAssistant, entry_id: str, add_entities: Callable[[], None]
+    ) -> None:
+        """Offer this entry's sensor platform to add the fleet entities.
+
+        Only sites with several hubs get them, and only from one entry at a
+        time; when that entry unloads, the next loaded entry adds them.
+        """
+        self._hosts[entry_id] = (hass, add_entities)
+        self._async_assign()
+
+    @callback
+    def async_release(self, entry_id: str) -> None:
+        """The entry's platforms are unloaded; hand the fleet entities on."""
+        self._hosts.pop(entry_id, None)
+        if self.owner == entry_id:
+            self.owner = None
+            self._async_assign()
+
+    @callback
+    def _async_assign(self) -> None:
+        if self.owner is not None:
+            return
+        for entry_id, (hass, add_entities) in self._hosts.items():
+            if len(hass.config_entries.async_entries(DOMAIN)) < 2:
+                return
+            self.owner = entry_id
+            add_entities()
+            return
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "hubs": self.hubs,
+            "online": self.online,
+            "in_fault": self.in_fault,
+            "salt_min": self.salt_min,
+            "salt_max": self.salt_max,
+            "water_temp_avg": self.water_temp_avg,
+            "cell_power_total": self.cell_power_total,
+        }
+
+
+@callback
+def async_get_fleet(hass: HomeAssistant) -> FleetAggregator:
+    fleet = hass.data.get(DATA_FLEET)
+    if fleet is None:
+        fleet = hass.data[DATA_FLEET] = FleetAggregator()
+    return fleet
+
+
+@callback
+def async_track_hub(
+    fleet: FleetAggregator, entry_id: str, coordinator: PoolSyncCoordinator
+) -> Callable[[], None]:
+    """Feed a hub's summaries to the fleet; returns the function that stops it."""
+
+    @callback
+    def _async_publish() -> None:
+        fleet.update(entry_id, HubSummary.from_coordinator(coordinator))
+
+    _async_publish()
+    unsub = coordinator.async_add_listener(_async_publish)
+
+    @callback
+    def _async_stop() -> None:
+        unsub()
+        fleet.remove(entry_id)
+        # Runs after the entry's platforms (and fleet entities) are unloaded
+        fleet.async_release(entry_id)
+
+    return _async_stop
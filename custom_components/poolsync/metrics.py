@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+from collections import deque
+import json
+import math
+import time
+from typing import Any, Optional
+import zlib
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS_MS: tuple[int, ...] = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+ERROR_TIMEOUT = "timeout"
+ERROR_CLIENT = "client"
+ERROR_HTTP_STATUS = "http_status"
+ERROR_PARSE = "parse"
+ERROR_OTHER = "other"
+ERROR_KINDS: tuple[str, ...] = (
+    ERROR_TIMEOUT,
+    ERROR_CLIENT,
+    ERROR_HTTP_STATUS,
+    ERROR_PARSE,
+    ERROR_OTHER,
+)
+
+
+class LatencyWindow:
+    """Histogram plus a bounded window of recent samples for percentiles.
+
+    Recording is O(buckets); percentiles are computed on demand from the
+    recent window and cached until the next sample arrives. Buffers are
+    allocated with the first sample, so windows that never see one (writes on
+    most hubs) stay small.
+    """
+
+    __slots__ = ("count", "total", "last", "_histogram", "_window", "_recent", "_sorted")
+
+    def __init__(self, window: int = 256) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.last: Optional[float] = None
+        self._window = window
+        self._histogram: Optional[list[int]] = None
+        self._recent: Optional[deque[float]] = None
+        self._sorted: Optional[list[float]] = None
+
+    @property
+    def histogram(self) -> list[int]:
+        return self._histogram or [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, seconds: float) -> None:
+        ms = seconds * 1000.0
+        self.count += 1
+        self.total += ms
+        self.last = ms
+        if self._recent is None:
+            self._recent = deque(maxlen=self._window)
+            self._histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        histogram = self._histogram
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if ms <= bound:
+                histogram[i] += 1
+                break
+        else:
+            histogram[-1] += 1
+        self._recent.append(ms)
+        self._sorted = None
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the q-th percentile (0-100) in ms over the recent window."""
+        if not self._recent:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self._recent)
+        data = self._sorted
+        # Nearest-rank percentile
+        idx = min(len(data) - 1, max(0, math.ceil(q / 100.0 * len(data)) - 1))
+        return round(data[idx], 1)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return round(self.total / self.count, 1) if self.count else None
+
+    def histogram_dict(self) -> dict[str, int]:
+        labels = [f"le_{b}ms" for b in LATENCY_BUCKETS_MS] + ["inf"]
+        return dict(zip(labels, self.histogram))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "last_ms": None if self.last is None else round(self.last, 1),
+            "mean_ms": self.mean,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "histogram": self.histogram_dict(),
+        }
+
+# Adaptive timeouts: this many times the recent p99, within [floor, ceiling]
+ADAPTIVE_TIMEOUT_MULTIPLIER = 4.0
+ADAPTIVE_TIMEOUT_FLOOR = 2.0
+# Until then the ceiling (the configured request timeout) applies
+ADAPTIVE_TIMEOUT_MIN_SAMPLES = 16
+
+
+class AdaptiveTimeout:
+    """Request timeout derived from the hub's recent latency.
+
+    A request that times out is recorded as taking the timeout it hit, so a
+    hub that slows down pushes its own timeout back up towards the ceiling
+    instead of failing at the old, tighter value.
+    """
+
+    __slots__ = ("ceiling", "floor", "multiplier", "min_samples", "window")
+
+    def __init__(
+        self,
+        ceiling: float,
+        floor: float = ADAPTIVE_TIMEOUT_FLOOR,
+        multiplier: float = ADAPTIVE_TIMEOUT_MULTIPLIER,
+        min_samples: int = ADAPTIVE_TIMEOUT_MIN_SAMPLES,
+    ) -> None:
+        self.ceiling = ceiling
+        self.floor = min(floor, ceiling)
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self.window = LatencyWindow(window=64)
+
+    def add(self, seconds: float) -> None:
+        self.window.add(seconds)
+
+    @property
+    def value(self) -> float:
+        """Timeout in seconds for the next request."""
+        if self.window.count < self.min_samples:
+            return self.ceiling
+        p99 = self.window.percentile(99) or 0.0
+        return min(self.ceiling, max(self.floor, p99 / 1000.0 * self.multiplier))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "timeout_s": round(self.value, 2),
+            "ceiling_s": self.ceiling,
+            "samples": self.window.count,
+            "p99_ms": self.window.percentile(99),
+        }
+
+
+class RequestMetrics:
+    """Per-hub counters collected by PoolSyncApi on every request."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.latency = LatencyWindow()
+        self.endpoints: dict[str, LatencyWindow] = {}
+        self.bytes_total = 0
+        self.last_bytes: Optional[int] = None
+        self.parse_total = 0.0
+        self.last_parse_ms: Optional[float] = None
+        self.errors: dict[str, int] = dict.fromkeys(ERROR_KINDS, 0)
+        self.last_error: Optional[str] = None
+        self.updates = LatencyWindow(window=64)
+        self.update_failures = 0
+        # Failed ticks since the last good one, and when that was (unix time)
+        self.consecutive_failures = 0
+        self.last_success: Optional[float] = None
+        # Fetches that took longer than the poll interval
+        self.overruns = 0
+        # Refreshes requested while a fetch was running, served by one follow-up
+        self.coalesced = 0
+        # (unix time, duration ms, ok, error) of recent coordinator ticks
+        self.ticks: deque[tuple[float, float, bool, Optional[str]]] = deque(maxlen=32)
+
+    def record_response(
+        self, endpoint: str, latency: float, nbytes: int, parse: float
+    ) -> None:
+        """Record a request that produced a response (any HTTP status)."""
+        self.requests += 1
+        self.latency.add(latency)
+        window = self.endpoints.get(endpoint)
+        if window is None:
+            window = self.endpoints[endpoint] = LatencyWindow(window=64)
+        window.add(latency)
+        self.bytes_total += nbytes
+        self.last_bytes = nbytes
+        self.parse_total += parse
+        self.last_parse_ms = round(parse * 1000.0, 3)
+
+    def record_error(self, kind: str, detail: Optional[str] = None) -> None:
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+        self.last_error = f"{kind}: {detail}" if detail else kind
+
+    def record_update(
+        self, duration: float, ok: bool, error: Optional[str] = None
+    ) -> None:
+        """Record one coordinator tick (fetch + parse)."""
+        now = time.time()
+        self.updates.add(duration)
+        if ok:
+            self.consecutive_failures = 0
+            self.last_success = now
+        else:
+            self.update_failures += 1
+            self.consecutive_failures += 1
+        self.ticks.append((now, round(duration * 1000.0, 1), ok, error))
+
+    def tick_history(self) -> list[dict[str, Any]]:
+        return [
+            {"at": at, "duration_ms": ms, "ok": ok, "error": error}
+            for at, ms, ok, error in self.ticks
+        ]
+
+    @property
+    def data_age(self) -> Optional[float]:
+        """Seconds since the last good tick."""
+        if self.last_success is None:
+            return None
+        return round(time.time() - self.last_success, 1)
+
+    @property
+    def poll_rate(self) -> Optional[float]:
+        """Fetches per minute over the recent ticks."""
+        if len(self.ticks) < 2:
+            return None
+        span = self.ticks[-1][0] - self.ticks[0][0]
+        return round((len(self.ticks) - 1) / span * 60.0, 2) if span > 0 else None
+
+    @property
+    def mean_bytes(self) -> Optional[int]:
+        return round(self.bytes_total / self.requests) if self.requests else None
+
+    @property
+    def mean_parse_ms(self) -> Optional[float]:
+        if not self.requests:
+            return None
+        return round(self.parse_total / self.requests * 1000.0, 3)
+
+    @property
+    def error_total(self) -> int:
+        return sum(self.errors.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "latency": self.latency.as_dict(),
+            "endpoints": {k: v.as_dict() for k, v in self.endpoints.items()},
+            "bytes_total": self.bytes_total,
+            "last_bytes": self.last_bytes,
+            "mean_bytes": self.mean_bytes,
+            "last_parse_ms": self.last_parse_ms,
+            "mean_parse_ms": self.mean_parse_ms,
+            "errors": dict(self.errors),
+            "last_error": self.last_error,
+            "updates": self.updates.as_dict(),
+            "update_failures": self.update_failures,
+            "consecutive_failures": self.consecutive_failures,
+            "data_age_s": self.data_age,
+            "overruns": self.overruns,
+            "coalesced": self.coalesced,
+            "poll_rate_per_min": self.poll_rate,
+        }
+
+
+class PayloadRing:
+    """Last N raw responses, zlib-compressed to keep the footprint small."""
+
+    __slots__ = ("_entries",)
+
+    def __init__(self, size: int = 10) -> None:
+        self._entries: deque[tuple[float, str, int, bytes]] = deque(maxlen=size)
+
+    def add(self, endpoint: str, status: int, text: str) -> None:
+        self._entries.append(
+            (time.time(), endpoint, status, zlib.compress(text.encode(), 1))
+        )
+
+    @property
+    def compressed_bytes(self) -> int:
+        return sum(len(blob) for *_, blob in self._entries)
+
+    def entries(self) -> list[dict[str, Any]]:
+        """Decompress the buffer, oldest first; JSON bodies are parsed."""
+        out: list[dict[str, Any]] = []
+        for at, endpoint, status, blob in self._entries:
+            text = zlib.decompress(blob).decode(errors="replace")
+            try:
+                body: Any = json.loads(text)
+            except ValueError:
+                body = text
+            out.append({"at": at, "endpoint": endpoint, "status": status, "body": body})
+        return out
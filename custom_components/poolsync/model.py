@@ -0,0 +1,374 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from .const import DEVICE_TYPE_PLATFORMS, HUB_PLATFORMS, PLATFORMS
+from .flags import EMPTY_HEATPUMP_FLAGS, Fault, HeatPumpFlags, active_faults
+from .util import _g
+
+
+# ---------- Unit conversions (applied once while parsing) ----------
+def _mv_to_v(mv: Any) -> Optional[float]:
+    try:
+        return round(float(mv) / 1000.0, 3)
+    except Exception:
+        return None
+
+
+def _ma_to_a(ma: Any) -> Optional[float]:
+    try:
+        return round(float(ma) / 1000.0, 3)
+    except Exception:
+        return None
+
+
+def _dict(value: Any) -> dict:
+    return value if isinstance(value, dict) else {}
+
+
+def _tuple(value: Any) -> tuple:
+    return tuple(value) if isinstance(value, list) else ()
+
+
+# ---------- PoolSync hub ----------
+@dataclass(slots=True)
+class HubStatus:
+    online: Any = None
+    flags: Any = None
+    date_time: Any = None
+    board_temp: Any = None
+    rssi: Any = None
+
+    @classmethod
+    def from_dict(cls, d: dict) -> HubStatus:
+        return cls(
+            online=d.get("online"),
+            flags=d.get("flags"),
+            date_time=d.get("dateTime"),
+            board_temp=d.get("boardTemp"),
+            rssi=d.get("rssi"),
+        )
+
+
+@dataclass(slots=True)
+class HubStats:
+    up_time_secs: Any = None
+    wifi_disconnects: Any = None
+    aws_disconnects: Any = None
+    min_rssi: Any = None
+    max_rssi: Any = None
+    min_board_temp: Any = None
+    max_board_temp: Any = None
+    system_restarts: Any = None
+    num_device_msg_no_resp: Any = None
+
+    @classmethod
+    def from_dict(cls, d: dict) -> HubStats:
+        return cls(
+            up_time_secs=d.get("upTimeSecs"),
+            wifi_disconnects=d.get("wifiDisconnects"),
+            aws_disconnects=d.get("awsDisconnects"),
+            min_rssi=d.get("minRssi"),
+            max_rssi=d.get("maxRssi"),
+            min_board_temp=d.get("minBoardTemp"),
+            max_board_temp=d.get("maxBoardTemp"),
+            system_restarts=d.get("systemRestarts"),
+            num_device_msg_no_resp=d.get("numDeviceMsgNoResp"),
+        )
+
+
+@dataclass(slots=True)
+class HubSystem:
+    mac_addr: Any = None
+    bssid: Any = None
+    fw_version: Any = None
+    hw_version: Any = None
+
+    @classmethod
+    def from_dict(cls, d: dict) -> HubSystem:
+        return cls(
+            mac_addr=d.get("macAddr"),
+            bssid=d.get("bssid"),
+            fw_version=d.get("fwVersion"),
+            hw_version=d.get("hwVersion"),
+        )
+
+
+# ---------- ChlorSync ----------
+@dataclass(slots=True)
+class ChlorSyncStatus:
+    water_temp: Any = None
+    flow_rate: Any = None
+    salt_ppm: Any = None
+    boost_remaining: Any = None
+    cell_raw_salt_adc: Any = None
+    cell_rail_voltage: Optional[float] = None  # V
+    fwd_current: Optional[float] = None  # A
+    rev_current: Optional[float] = None  # A
+    out_voltage: Optional[float] = None  # V
+
+    @classmethod
+    def from_dict(cls, d: dict) -> ChlorSyncStatus:
+        return cls(
+            water_temp=d.get("waterTemp"),
+            flow_rate=d.get("flowRate"),
+            salt_ppm=d.get("saltPPM"),
+            boost_remaining=d.get("boostRemaining"),
+            cell_raw_salt_adc=d.get("cellRawSaltADC"),
+            cell_rail_voltage=_mv_to_v(d.get("cellRailVoltage")),
+            fwd_current=_ma_to_a(d.get("fwdCurrent")),
+            rev_current=_ma_to_a(d.get("revCurrent")),
+            out_voltage=_mv_to_v(d.get("outVoltage")),
+        )
+
+
+@dataclass(slots=True)
+class ChlorSyncConfig:
+    chlor_output: Any = None
+    boost_mode: Any = None
+    pool_cover_ctrl: Any = None
+    gallons: Any = None
+    polarity_change_time: Any = None
+    user_salt_calib: Any = None
+
+    @classmethod
+    def from_dict(cls, d: dict) -> ChlorSyncConfig:
+        return cls(
+            chlor_output=d.get("chlorOutput"),
+            boost_mode=d.get("boostMode"),
+            pool_cover_ctrl=d.get("poolCoverCtrl"),
+            gallons=d.get("gallons"),
+            polarity_change_time=d.get("polarityChangeTime"),
+            user_salt_calib=d.get("userSaltCalib"),
+        )
+
+
+@dataclass(slots=True)
+class ChlorSyncSystem:
+    drv_fw_version: Any = None
+    cell_fw_version: Any = None
+    cell_hw_version: Any = None
+    cell_calib: Any = None
+    num_blades: Any = None
+    cell_serial_num: Any = None
+
+    @classmethod
+    def from_dict(cls, d: dict) -> ChlorSyncSystem:
+        return cls(
+            drv_fw_version=d.get("drvFwVersion"),
+            cell_fw_version=d.get("cellFwVersion"),
+            cell_hw_version=d.get("cellHwVersion"),
+            cell_calib=d.get("cellCalib"),
+            num_blades=d.get("numBlades"),
+            cell_serial_num=d.get("cellSerialNum"),
+        )
+
+
+@dataclass(slots=True)
+class ChlorSyncDevice:
+    index: int = 0
+    name: Any = None
+    online: Any = None
+    faults: tuple = ()
+    active_faults: tuple[Fault, ...] = ()
+    stats: tuple = ()
+    status: ChlorSyncStatus = field(default_factory=ChlorSyncStatus)
+    config: ChlorSyncConfig = field(default_factory=ChlorSyncConfig)
+    system: ChlorSyncSystem = field(default_factory=ChlorSyncSystem)
+
+    @classmethod
+    def from_dict(cls, index: int, d: dict) -> ChlorSyncDevice:
+        node = _dict(d.get("nodeAttr"))
+        faults = _tuple(d.get("faults"))
+        return cls(
+            index=index,
+            name=node.get("name"),
+            online=node.get("online"),
+            faults=faults,
+            active_faults=active_faults(faults),
+            stats=_tuple(d.get("stats")),
+            status=ChlorSyncStatus.from_dict(_dict(d.get("status"))),
+            config=ChlorSyncConfig.from_dict(_dict(d.get("config"))),
+            system=ChlorSyncSystem.from_dict(_dict(d.get("system"))),
+        )
+
+    def stat(self, i: int) -> Any:
+        return self.stats[i] if i < len(self.stats) else None
+
+
+# ---------- Heat pump ----------
+@dataclass(slots=True)
+class HeatPumpStatus:
+    water_temp: Any = None
+    air_temp: Any = None
+    ctrl_flags: Any = None
+    state_flags: Any = None
+
+    @classmethod
+    def from_dict(cls, d: dict) -> HeatPumpStatus:
+        return cls(
+            water_temp=d.get("waterTemp"),
+            air_temp=d.get("airTemp"),
+            ctrl_flags=d.get("ctrlFlags"),
+            state_flags=d.get("stateFlags"),
+        )
+
+
+@dataclass(slots=True)
+class HeatPumpConfig:
+    mode: Any = None
+    setpoint: Any = None
+
+    @classmethod
+    def from_dict(cls, d: dict) -> HeatPumpConfig:
+        return cls(mode=d.get("mode"), setpoint=d.get("setpoint"))
+
+
+@dataclass(slots=True)
+class HeatPumpDevice:
+    index: int = 0
+    name: Any = None
+    online: Any = None
+    faults: tuple = ()
+    status: HeatPumpStatus = field(default_factory=HeatPumpStatus)
+    config: HeatPumpConfig = field(default_factory=HeatPumpConfig)
+    # ctrlFlags/stateFlags/faults, decoded once per snapshot
+    flags: HeatPumpFlags = EMPTY_HEATPUMP_FLAGS
+
+    @classmethod
+    def from_dict(cls, index: int, d: dict) -> HeatPumpDevice:
+        node = _dict(d.get("nodeAttr"))
+        faults = _tuple(d.get("faults"))
+        status = HeatPumpStatus.from_dict(_dict(d.get("status")))
+        return cls(
+            index=index,
+            name=node.get("name"),
+            online=node.get("online"),
+            faults=faults,
+            status=status,
+            config=HeatPumpConfig.from_dict(_dict(d.get("config"))),
+            flags=HeatPumpFlags.decode(status.ctrl_flags, status.state_flags, faults),
+        )
+
+
+# ---------- Whole response ----------
+@dataclass(slots=True)
+class PoolSyncSnapshot:
+    """Typed view of one ``poolSync&all`` response, built once per poll.
+
+    ``chlor`` is always device 0 and ``heatpump`` the first device reported as
+    ``heatPump`` in ``deviceType``; both are empty objects when the device is
+    missing so entities never have to test for ``None`` along the path.
+    """
+
+    name: Any = None
+    status: HubStatus = field(default_factory=HubStatus)
+    stats: HubStats = field(default_factory=HubStats)
+    system: HubSystem = field(default_factory=HubSystem)
+    device_types: dict[int, str] = field(default_factory=dict)
+    chlor: ChlorSyncDevice = field(default_factory=ChlorSyncDevice)
+    heatpump: HeatPumpDevice = field(default_factory=HeatPumpDevice)
+    heatpump_index: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> PoolSyncSnapshot:
+        hub = _dict(data.get("poolSync"))
+        devices = _dict(data.get("devices"))
+
+        device_types: dict[int, str] = {}
+        for idx, dev_type in _dict(data.get("deviceType")).items():
+            try:
+                device_types[int(idx)] = dev_type
+            except (TypeError, ValueError):
+                continue
+
+        heatpump_index = next(
+            (idx for idx, dev_type in device_types.items() if dev_type == "heatPump"),
+            None,
+        )
+        heatpump = (
+            HeatPumpDevice.from_dict(
+                heatpump_index, _dict(devices.get(str(heatpump_index)))
+            )
+            if heatpump_index is not None
+            else HeatPumpDevice()
+        )
+
+        return cls(
+            name=_g(hub, "config", "name"),
+            status=HubStatus.from_dict(_dict(hub.get("status"))),
+            stats=HubStats.from_dict(_dict(hub.get("stats"))),
+            system=HubSystem.from_dict(_dict(hub.get("system"))),
+            device_types=device_types,
+            chlor=ChlorSyncDevice.from_dict(0, _dict(devices.get("0"))),
+            heatpump=heatpump,
+            heatpump_index=heatpump_index,
+        )
+
+
+EMPTY_SNAPSHOT = PoolSyncSnapshot()
+
+
+@dataclass(slots=True, frozen=True)
+class HubTopology:
+    """What a hub has attached: enough to create its entities without polling.
+
+    Cached per config entry so setup can register entities before the hub
+    has answered.
+    """
+
+    mac: Optional[str] = None
+    fw_version: Any = None
+    device_types: tuple[tuple[int, str], ...] = ()
+    heatpump_index: Optional[int] = None
+
+    @classmethod
+    def from_snapshot(cls, snapshot: PoolSyncSnapshot) -> HubTopology:
+        return cls(
+            mac=snapshot.system.mac_addr,
+            fw_version=snapshot.system.fw_version,
+            device_types=tuple(sorted(snapshot.device_types.items())),
+            heatpump_index=snapshot.heatpump_index,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> HubTopology:
+        device_types: list[tuple[int, str]] = []
+        for idx, dev_type in _dict(data.get("device_types")).items():
+            try:
+                device_types.append((int(idx), str(dev_type)))
+            except (TypeError, ValueError):
+                continue
+        heatpump_index = data.get("heatpump_index")
+        return cls(
+            mac=data.get("mac"),
+            fw_version=data.get("fw_version"),
+            device_types=tuple(sorted(device_types)),
+            heatpump_index=heatpump_index if isinstance(heatpump_index, int) else None,
+        )
+
+    @property
+    def types(self) -> frozenset[str]:
+        return frozenset(dev_type for _, dev_type in self.device_types)
+
+    @property
+    def platforms(self) -> list[str]:
+        """Platforms with entities for these devices, in ``PLATFORMS`` order.
+
+        All of them while the devices aren't known yet.
+        """
+        if not self.device_types:
+            return list(PLATFORMS)
+        needed = set(HUB_PLATFORMS)
+        for dev_type in self.types:
+            needed.update(DEVICE_TYPE_PLATFORMS.get(dev_type, ()))
+        return [platform for platform in PLATFORMS if platform in needed]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "mac": self.mac,
+            "fw_version": self.fw_version,
+            "device_types": {str(idx): t for idx, t in self.device_types},
+            "heatpump_index": self.heatpump_index,
+        }
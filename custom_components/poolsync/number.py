@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-from homeassistant.components.number import NumberEntity, NumberMode
+from typing import Any, Optional
+
+from homeassistant.components.number import NumberEntity, NumberMode, RestoreNumber
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import PERCENTAGE, UnitOfTemperature
 
 from .const import DOMAIN
 from .coordinator import PoolSyncCoordinator
-from .util import _g
+from .entity import PoolSyncRestoreEntity
+from .model import EMPTY_SNAPSHOT
 
 
 async def async_setup_entry(
@@ -20,15 +22,8 @@ async def async_setup_entry(
         PoolSyncChlorOutputNumber(coordinator, entry, device_index=0),
     ]
 
-    data = coordinator.data or {}
-    device_types = _g(data, "deviceType", default={}) or {}
-    heatpump_idx = next(
-        (idx for idx, dev in device_types.items() if dev == "heatPump"),
-        None,
-    )
-
-    if heatpump_idx is not None:
-        hp_idx = int(heatpump_idx)
+    hp_idx = coordinator.heatpump_index
+    if hp_idx is not None:
         entities.extend(
             [
                 PoolSyncHeatSetpointNumber(coordinator, entry, device_index=hp_idx),
@@ -36,12 +31,28 @@ async def async_setup_entry(
             ]
         )
 
-    async_add_entities(entities, update_before_add=True)
+    async_add_entities(entities)
+
 
+class PoolSyncRestoreNumber(PoolSyncRestoreEntity, RestoreNumber):
+    """Number that serves its restored value until the first snapshot."""
 
-class PoolSyncChlorOutputNumber(CoordinatorEntity[PoolSyncCoordinator], NumberEntity):
+    _restored_value: Optional[float] = None
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if self.stale and (last := await self.async_get_last_number_data()):
+            self._restored_value = last.native_value
+
+    @property
+    def extra_state_attributes(self) -> Optional[dict[str, Any]]:
+        return self.restored_attributes() if self.stale else None
+
+
+class PoolSyncChlorOutputNumber(PoolSyncRestoreNumber):
     """Number for ChlorSync output percentage (0-100%)."""
 
+    _attr_name = "Chlor Output"
     _attr_min_value = 0
     _attr_max_value = 100
     _attr_step = 1
@@ -53,21 +64,17 @@ class PoolSyncChlorOutputNumber(CoordinatorEntity[PoolSyncCoordinator], NumberEn
     ) -> None:
         super().__init__(coordinator)
         self._device_index = device_index
-        mac = coordinator.api.mac_address or entry.data.get("mac") or "poolsync"
+        mac = coordinator.hub_id(entry)
         self._attr_unique_id = f"{mac}_chlor_output_{device_index}"
-        self._attr_name = "Chlor Output"
 
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, mac)},
-            "manufacturer": "AquaCal",
-            "name": "PoolSync",
-            "model": "PoolSync",
-        }
+        self._attr_device_info = coordinator.device_info(entry)
 
     @property
     def native_value(self) -> float | None:
-        data = self.coordinator.data or {}
-        val = _g(data, "devices", str(self._device_index), "config", "chlorOutput")
+        if self.stale:
+            return self._restored_value
+        data = self.coordinator.data or EMPTY_SNAPSHOT
+        val = data.chlor.config.chlor_output
         try:
             return float(val)
         except Exception:
@@ -76,13 +83,18 @@ class PoolSyncChlorOutputNumber(CoordinatorEntity[PoolSyncCoordinator], NumberEn
     async def async_set_native_value(self, value: float) -> None:
         # Clamp/round to int 0..100 for API
         pct = max(0, min(100, int(round(value))))
-        await self.coordinator.api.set_chlor_output(self._device_index, pct)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_write_device(
+            self._device_index,
+            self.coordinator.api.set_chlor_output(
+                self._device_index, pct, verify=self.coordinator.verify_writes
+            ),
+        )
 
 
-class PoolSyncHeatSetpointNumber(CoordinatorEntity[PoolSyncCoordinator], NumberEntity):
+class PoolSyncHeatSetpointNumber(PoolSyncRestoreNumber):
     """Number for heat pump temperature setpoint."""
 
+    _attr_name = "Heat Pump Setpoint"
     _attr_mode = NumberMode.SLIDER
 
     def __init__(
@@ -90,9 +102,8 @@ class PoolSyncHeatSetpointNumber(CoordinatorEntity[PoolSyncCoordinator], NumberE
     ) -> None:
         super().__init__(coordinator)
         self._device_index = device_index
-        mac = coordinator.api.mac_address or entry.data.get("mac") or "poolsync"
+        mac = coordinator.hub_id(entry)
         self._attr_unique_id = f"{mac}_heat_setpoint_{device_index}"
-        self._attr_name = "Heat Pump Setpoint"
 
         unit = coordinator.hass.config.units.temperature_unit
         if unit == UnitOfTemperature.FAHRENHEIT:
@@ -107,30 +118,32 @@ class PoolSyncHeatSetpointNumber(CoordinatorEntity[PoolSyncCoordinator], NumberE
             self._attr_max_value = 40
             self._attr_step = 0.5
 
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, mac)},
-            "manufacturer": "AquaCal",
-            "name": "PoolSync",
-            "model": "PoolSync",
-        }
+        self._attr_device_info = coordinator.device_info(entry)
 
     @property
     def native_value(self) -> float | None:
-        data = self.coordinator.data or {}
-        val = _g(data, "devices", str(self._device_index), "config", "setpoint")
+        if self.stale:
+            return self._restored_value
+        data = self.coordinator.data or EMPTY_SNAPSHOT
+        val = data.heatpump.config.setpoint
         try:
             return float(val)
         except Exception:
             return None
 
     async def async_set_native_value(self, value: float) -> None:
-        await self.coordinator.api.set_heatpump_setpoint(self._device_index, value)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_write_device(
+            self._device_index,
+            self.coordinator.api.set_heatpump_setpoint(
+                self._device_index, value, verify=self.coordinator.verify_writes
+            ),
+        )
 
 
-class PoolSyncHeatModeNumber(CoordinatorEntity[PoolSyncCoordinator], NumberEntity):
+class PoolSyncHeatModeNumber(PoolSyncRestoreNumber):
     """Number for heat pump mode selection."""
 
+    _attr_name = "Heat Pump Mode"
     _attr_min_value = 0
     _attr_max_value = 2
     _attr_step = 1
@@ -141,21 +154,17 @@ class PoolSyncHeatModeNumber(CoordinatorEntity[PoolSyncCoordinator], NumberEntit
     ) -> None:
         super().__init__(coordinator)
         self._device_index = device_index
-        mac = coordinator.api.mac_address or entry.data.get("mac") or "poolsync"
+        mac = coordinator.hub_id(entry)
         self._attr_unique_id = f"{mac}_heat_mode_{device_index}"
-        self._attr_name = "Heat Pump Mode"
 
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, mac)},
-            "manufacturer": "AquaCal",
-            "name": "PoolSync",
-            "model": "PoolSync",
-        }
+        self._attr_device_info = coordinator.device_info(entry)
 
     @property
     def native_value(self) -> float | None:
-        data = self.coordinator.data or {}
-        val = _g(data, "devices", str(self._device_index), "config", "mode")
+        if self.stale:
+            return self._restored_value
+        data = self.coordinator.data or EMPTY_SNAPSHOT
+        val = data.heatpump.config.mode
         try:
             return float(val)
         except Exception:
@@ -163,6 +172,10 @@ class PoolSyncHeatModeNumber(CoordinatorEntity[PoolSyncCoordinator], NumberEntit
 
     async def async_set_native_value(self, value: float) -> None:
         mode = int(value)
-        await self.coordinator.api.set_heatpump_mode(self._device_index, mode)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_write_device(
+            self._device_index,
+            self.coordinator.api.set_heatpump_mode(
+                self._device_index, mode, verify=self.coordinator.verify_writes
+            ),
+        )
 
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Optional
+
+from .metrics import LatencyWindow
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds to profile right after startup, e.g. POOLSYNC_PROFILE=120
+PROFILE_ENV = "POOLSYNC_PROFILE"
+DEFAULT_PROFILE_SECONDS = 60
+MAX_PROFILE_SECONDS = 600
+SAMPLE_INTERVAL = 0.005
+MAX_STACK_DEPTH = 64
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_window", "_started")
+
+    def __init__(self, window: LatencyWindow) -> None:
+        self._window = window
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc: Any) -> None:
+        self._window.add(time.perf_counter() - self._started)
+
+
+class PoolSyncProfiler:
+    """Opt-in, time-boxed profiler for the integration's hot paths.
+
+    While active, ``span()`` times named sections (coordinator ticks, JSON
+    parsing, entity fan-out) and a background thread samples the event loop
+    thread's stack so the report shows how much loop time PoolSync code takes.
+    While inactive, ``span()`` returns a shared no-op context manager.
+    """
+
+    def __init__(self) -> None:
+        self.active = False
+        self._spans: dict[str, LatencyWindow] = {}
+        self._leaf: Counter[tuple[str, str]] = Counter()
+        self._cumulative: Counter[tuple[str, str]] = Counter()
+        self._samples = 0
+        self._ours = 0
+        self._started = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def span(self, name: str) -> Any:
+        if not self.active:
+            return _NULL_SPAN
+        window = self._spans.get(name)
+        if window is None:
+            window = self._spans[name] = LatencyWindow(window=1024)
+        return _Span(window)
+
+    def start(self) -> bool:
+        """Start profiling; must be called from the event loop thread."""
+        if self.active:
+            return False
+        self._spans = {}
+        self._leaf = Counter()
+        self._cumulative = Counter()
+        self._samples = 0
+        self._ours = 0
+        self._started = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._sample,
+            args=(threading.get_ident(),),
+            name="poolsync-profiler",
+            daemon=True,
+        )
+        self._thread.start()
+        self.active = True
+        return True
+
+    def stop(self) -> str:
+        """Stop profiling and return the text report."""
+        self.active = False
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        return self.report()
+
+    def _sample(self, thread_id: int) -> None:
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                continue
+            seen: set[tuple[str, str]] = set()
+            ours = False
+            leaf: Optional[tuple[str, str]] = None
+            depth = 0
+            while frame is not None and depth < MAX_STACK_DEPTH:
+                code = frame.f_code
+                key = (code.co_filename, code.co_name)
+                if leaf is None:
+                    leaf = key
+                if key not in seen:
+                    seen.add(key)
+                    self._cumulative[key] += 1
+                if code.co_filename.startswith(_PACKAGE_DIR):
+                    ours = True
+                frame = frame.f_back
+                depth += 1
+            if leaf is not None:
+                self._leaf[leaf] += 1
+            self._samples += 1
+            if ours:
+                self._ours += 1
+
+    def report(self, top: int = 25) -> str:
+        elapsed = time.monotonic() - self._started
+        lines = [
+            f"PoolSync profile ({datetime.now().isoformat(timespec='seconds')})",
+            f"window: {elapsed:.1f}s, loop samples: {self._samples} "
+            f"every {SAMPLE_INTERVAL * 1000:.0f}ms",
+        ]
+        if self._samples:
+            lines.append(
+                f"samples inside PoolSync code: {self._ours} "
+                f"({100.0 * self._ours / self._samples:.1f}%)"
+            )
+
+        lines += ["", "Timing spans (ms):"]
+        lines.append(f"  {'span':<28}{'count':>8}{'mean':>10}{'p95':>10}{'max':>10}")
+        for name, window in sorted(self._spans.items()):
+            lines.append(
+                f"  {name:<28}{window.count:>8}{window.mean or 0:>10.2f}"
+                f"{window.percentile(95) or 0:>10.2f}{window.percentile(100) or 0:>10.2f}"
+            )
+
+        def _table(title: str, counter: Counter[tuple[str, str]]) -> None:
+            lines.extend(["", title])
+            for (filename, func), count in counter.most_common(top):
+                pct = 100.0 * count / self._samples if self._samples else 0.0
+                lines.append(f"  {pct:6.1f}%  {func}  ({filename})")
+
+        _table("Top functions on the loop thread (self):", self._leaf)
+        _table("Top functions on the loop thread (cumulative):", self._cumulative)
+        return "\n".join(lines) + "\n"
+
+
+PROFILER = PoolSyncProfiler()
+
+
+def profile_seconds_from_env() -> int:
+    try:
+        seconds = int(os.environ.get(PROFILE_ENV, "0"))
+    except ValueError:
+        return 0
+    return max(0, min(seconds, MAX_PROFILE_SECONDS))
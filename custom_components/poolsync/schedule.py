@@ -0,0 +1,387 @@
+"""Per-hub schedule for the chlorinator and heat pump, kept in the entry options.
+
+A schedule is a list of rules::
+
+    - at: "07:00"
+      days: [mon, tue, wed, thu, fri]
+      chlor_output: 60
+      heatpump_mode: 1
+      heatpump_setpoint: 28
+    - at: "22:00"
+      chlor_output: 30
+      boost: false
+
+A field keeps the value of the last rule that set it until another rule sets
+it, so the targets for any moment follow from the rules alone. Targets are
+only written at transitions: the engine sleeps until the next one (one timer
+per hub) and applies the fields of the rules due then, so a manual change
+lasts until the next rule for that field, across restarts and reloads too.
+The last transition applied is stored per entry; after a restart, only
+transitions missed while Home Assistant was down are caught up on. Only
+fields that differ from the latest snapshot are written, in one PATCH per
+device.
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+import hashlib
+import logging
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import value_matches
+from .coordinator import PoolSyncCoordinator
+from .model import PoolSyncSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+DAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+ALL_DAYS = frozenset(range(7))
+
+# Seconds before the last applied transition is written to the store
+SAVE_DELAY = 5.0
+
+DEVICE_CHLOR = "chlor"
+DEVICE_HEATPUMP = "heatpump"
+
+
+def _int_in(low: int, high: int) -> Callable[[Any], int]:
+    def _parse(value: Any) -> int:
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value != int(value):
+            raise ValueError(f"{value!r} is not a whole number")
+        if not low <= value <= high:
+            raise ValueError(f"{value} is not between {low} and {high}")
+        return int(value)
+
+    return _parse
+
+
+def _setpoint(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{value!r} is not a temperature")
+    # Celsius or Fahrenheit, as the hub is configured
+    if not 5 <= value <= 104:
+        raise ValueError(f"{value} is not between 5 and 104")
+    return float(value)
+
+
+def _bool(value: Any) -> bool:
+    if not isinstance(value, bool):
+        raise ValueError(f"{value!r} is not true/false")
+    return value
+
+
+# Boost runs for 24 h once started; it's only sent at its own transitions,
+# never caught up on after a restart (that would start a boost late)
+MOMENTARY_FIELDS = frozenset({"boost"})
+
+# field -> (device, config key, parser)
+FIELDS: dict[str, tuple[str, str, Callable[[Any], Any]]] = {
+    "chlor_output": (DEVICE_CHLOR, "chlorOutput", _int_in(0, 100)),
+    "boost": (DEVICE_CHLOR, "boostMode", _bool),
+    "heatpump_mode": (DEVICE_HEATPUMP, "mode", _int_in(0, 2)),
+    "heatpump_setpoint": (DEVICE_HEATPUMP, "setpoint", _setpoint),
+}
+
+
+def _parse_time(value: Any) -> time:
+    try:
+        return time(*(int(part) for part in value.strip().split(":")))
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError(f"at: {value!r} is not HH:MM") from None
+
+
+def _parse_days(value: Any) -> frozenset[int]:
+    if value is None:
+        return ALL_DAYS
+    if isinstance(value, str):
+        value = [value]
+    days: set[int] = set()
+    for day in value:
+        if isinstance(day, str) and day.strip().lower()[:3] in DAY_NAMES:
+            days.add(DAY_NAMES.index(day.strip().lower()[:3]))
+        elif isinstance(day, int) and not isinstance(day, bool) and 0 <= day <= 6:
+            days.add(day)
+        else:
+            raise ValueError(f"days: {day!r} is not a weekday")
+    if not days:
+        raise ValueError("days: empty")
+    return frozenset(days)
+
+
+@dataclass(frozen=True, slots=True)
+class ScheduleRule:
+    at: time
+    # 0 = Monday
+    days: frozenset[int]
+    # (field, value) in FIELDS order
+    targets: tuple[tuple[str, Any], ...]
+
+    @classmethod
+    def parse(cls, raw: Any) -> ScheduleRule:
+        if not isinstance(raw, dict):
+            raise ValueError(f"{raw!r} is not a rule")
+        unknown = set(raw) - {"at", "days", *FIELDS}
+        if unknown:
+            raise ValueError(f"unknown keys {sorted(unknown)}")
+        targets = []
+        for field, (_, _, parse) in FIELDS.items():
+            if field in raw:
+                try:
+                    targets.append((field, parse(raw[field])))
+                except ValueError as err:
+                    raise ValueError(f"{field}: {err}") from None
+        if not targets:
+            raise ValueError(f"rule at {raw.get('at')!r} sets nothing")
+        return cls(_parse_time(raw.get("at")), _parse_days(raw.get("days")), tuple(targets))
+
+
+class Schedule:
+    """The rules of one hub, answering "what now" and "what next"."""
+
+    __slots__ = ("rules",)
+
+    def __init__(self, rules: Iterable[ScheduleRule] = ()) -> None:
+        self.rules = tuple(sorted(rules, key=lambda r: r.at))
+
+    @classmethod
+    def parse(cls, raw: Any) -> Schedule:
+        """Rules from the entry options; raises ValueError naming the bad rule."""
+        if raw in (None, ""):
+            return cls()
+        if not isinstance(raw, list):
+            raise ValueError("the schedule must be a list of rules")
+        rules = []
+        for number, item in enumerate(raw, 1):
+            try:
+                rules.append(ScheduleRule.parse(item))
+            except ValueError as err:
+                raise ValueError(f"rule {number}: {err}") from None
+        return cls(rules)
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    @property
+    def fingerprint(self) -> str:
+        """Stable across restarts; changes whenever the rules do."""
+        canonical = repr(
+            [(rule.at.isoformat(), sorted(rule.days), rule.targets) for rule in self.rules]
+        )
+        return hashlib.sha1(canonical.encode()).hexdigest()[:12]
+
+    def _occurrences(
+        self, now: datetime, backwards: bool
+    ) -> Iterator[tuple[datetime, ScheduleRule]]:
+        # A week and a day covers every rule at least once
+        rules = self.rules[::-1] if backwards else self.rules
+        for offset in range(8):
+            day = now.date() + timedelta(days=-offset if backwards else offset)
+            for rule in rules:
+                if day.weekday() not in rule.days:
+                    continue
+                when = datetime.combine(day, rule.at, tzinfo=now.tzinfo)
+                if (when <= now) if backwards else (when > now):
+                    yield when, rule
+
+    def missed_targets(self, since: datetime, now: datetime) -> dict[str, Any]:
+        """Fields set by transitions after ``since`` up to ``now``, less boost.
+
+        The latest transition wins for each field, as if none had been missed.
+        """
+        targets: dict[str, Any] = {}
+        for when, rule in self._occurrences(now, backwards=True):
+            if when <= since:
+                break
+            for field, value in rule.targets:
+                if field not in MOMENTARY_FIELDS:
+                    targets.setdefault(field, value)
+        return targets
+
+    def last_transition(self, now: datetime) -> Optional[datetime]:
+        return next((when for when, _ in self._occurrences(now, backwards=True)), None)
+
+    def targets_due(self, when: datetime) -> dict[str, Any]:
+        """Fields set by the rules that fire exactly at ``when``."""
+        targets: dict[str, Any] = {}
+        for rule in self.rules:
+            if rule.at == when.time() and when.weekday() in rule.days:
+                targets.update(rule.targets)
+        return targets
+
+    def next_transition(self, now: datetime) -> Optional[datetime]:
+        return next((when for when, _ in self._occurrences(now, backwards=False)), None)
+
+
+def pending_writes(
+    targets: dict[str, Any], snapshot: PoolSyncSnapshot
+) -> dict[int, dict[str, Any]]:
+    """Device index -> config fields whose target differs from the snapshot."""
+    current = {
+        "chlor_output": snapshot.chlor.config.chlor_output,
+        # Boost is on while minutes remain, like the switch shows it
+        "boost": _boosting(snapshot.chlor.status.boost_remaining),
+        "heatpump_mode": snapshot.heatpump.config.mode,
+        "heatpump_setpoint": snapshot.heatpump.config.setpoint,
+    }
+    devices = {DEVICE_CHLOR: snapshot.chlor.index, DEVICE_HEATPUMP: snapshot.heatpump_index}
+    writes: dict[int, dict[str, Any]] = {}
+    for field, value in targets.items():
+        device, key, _ = FIELDS[field]
+        index = devices[device]
+        if index is None or value_matches(current[field], value):
+            continue
+        writes.setdefault(index, {})[key] = value
+    return writes
+
+
+def _boosting(remaining: Any) -> bool:
+    try:
+        return int(remaining or 0) > 0
+    except (TypeError, ValueError):
+        return False
+
+
+class PoolSyncScheduler:
+    """Runs one hub's schedule: a single timer, and writes only on change."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: PoolSyncCoordinator,
+        schedule: Schedule,
+        store: Optional[Store] = None,
+    ) -> None:
+        self.hass = hass
+        self.coordinator = coordinator
+        self.schedule = schedule
+        # Last transition applied, so restarts and reloads don't re-apply it
+        self._store = store
+        self.last_applied: Optional[datetime] = None
+        self.next_run: Optional[datetime] = None
+        self.writes = 0
+        self.skipped = 0
+        self._lock = asyncio.Lock()
+        self._unsub_timer: Optional[Callable[[], None]] = None
+        self._unsub_first: Optional[Callable[[], None]] = None
+        self._missed: dict[str, Any] = {}
+
+    async def async_start(self) -> None:
+        """Catch up on transitions missed while stopped, then wait for the next one.
+
+        A first start, or one with changed rules, writes nothing: the rules
+        take over at their next transition, and whatever is set by hand stays.
+        """
+        if not self.schedule:
+            return
+        now = dt_util.now()
+        since = await self._async_load_last_applied()
+        last = self.schedule.last_transition(now)
+        self._missed = (
+            self.schedule.missed_targets(since, now) if since is not None else {}
+        )
+        if self._missed:
+            if self.coordinator.data is None:
+                # Set up from the cached topology: apply once the first poll lands
+                self._unsub_first = self.coordinator.async_add_listener(
+                    self._async_first_snapshot
+                )
+            else:
+                self.hass.async_create_task(self.async_apply(self._missed))
+        if last is not None and last != since:
+            self._async_save_last_applied(last)
+        self._async_schedule_next(now)
+
+    async def _async_load_last_applied(self) -> Optional[datetime]:
+        if self._store is None:
+            return self.last_applied
+        data = await self._store.async_load()
+        if not isinstance(data, dict) or data.get("rules") != self.schedule.fingerprint:
+            return None
+        try:
+            return datetime.fromisoformat(data["applied"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @callback
+    def _async_save_last_applied(self, when: datetime) -> None:
+        self.last_applied = when
+        if self._store is not None:
+            self._store.async_delay_save(
+                lambda: {"rules": self.schedule.fingerprint, "applied": when.isoformat()},
+                SAVE_DELAY,
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        for unsub in (self._unsub_timer, self._unsub_first):
+            if unsub is not None:
+                unsub()
+        self._unsub_timer = self._unsub_first = None
+        self.next_run = None
+
+    @callback
+    def _async_first_snapshot(self) -> None:
+        if self.coordinator.data is None or self._unsub_first is None:
+            return
+        self._unsub_first()
+        self._unsub_first = None
+        self.hass.async_create_task(self.async_apply(self._missed))
+
+    @callback
+    def _async_schedule_next(self, now: datetime) -> None:
+        self.next_run = self.schedule.next_transition(now)
+        if self.next_run is not None:
+            self._unsub_timer = async_track_point_in_time(
+                self.hass, self._async_transition, self.next_run
+            )
+
+    async def _async_transition(self, now: datetime) -> None:
+        self._unsub_timer = None
+        # The timer fires at or just after the transition
+        when = self.next_run or now
+        await self.async_apply(self.schedule.targets_due(when))
+        self._async_save_last_applied(when)
+        self._async_schedule_next(max(now, when))
+
+    async def async_apply(self, targets: dict[str, Any]) -> None:
+        """Write the targets the hub doesn't already have."""
+        async with self._lock:
+            snapshot = self.coordinator.data
+            if snapshot is None:
+                return
+            writes = pending_writes(targets, snapshot)
+            if not writes:
+                self.skipped += 1
+                return
+            api = self.coordinator.api
+            for index, config in writes.items():
+                try:
+                    await self.coordinator.async_write_device(
+                        index,
+                        api.set_device_config(
+                            index, config, verify=self.coordinator.verify_writes
+                        ),
+                    )
+                except HomeAssistantError as err:
+                    _LOGGER.warning(
+                        "PoolSync schedule could not set %s on device %s: %s", config, index, err
+                    )
+                else:
+                    self.writes += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "rules": len(self.schedule.rules),
+            "last_applied": self.last_applied.isoformat() if self.last_applied else None,
+            "next_run": self.next_run.isoformat() if self.next_run else None,
+            "writes": self.writes,
+            "skipped": self.skipped,
+        }
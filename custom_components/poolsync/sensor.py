@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from typing import Any, Callable, Optional
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorEntity,
     SensorEntityDescription,
 )
@@ -11,11 +12,14 @@ from homeassistant.const import (
     UnitOfTemperature,
     UnitOfElectricPotential,
     UnitOfElectricCurrent,
+    UnitOfInformation,
+    UnitOfPower,
     UnitOfTime,
     SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
     PERCENTAGE,
+    EntityCategory,
 )
-from homeassistant.components.sensor.const import SensorDeviceClass
+from homeassistant.components.sensor.const import SensorDeviceClass, SensorStateClass
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -23,93 +27,77 @@ from homeassistant.config_entries import ConfigEntry
 
 from .coordinator import PoolSyncCoordinator
 from .const import DOMAIN
-from .util import _g
+from .entity import PoolSyncRestoreEntity
+from .fleet import DATA_FLEET, FLEET_DEVICE_INFO, FleetAggregator
+from .metrics import ERROR_HTTP_STATUS, ERROR_TIMEOUT, RequestMetrics
+from .model import EMPTY_SNAPSHOT, PoolSyncSnapshot
 
 
 @dataclass(frozen=True)
 class PoolSyncSensorDesc(SensorEntityDescription):
     """Extend SensorEntityDescription with a value extractor."""
-    value_fn: Callable[[dict[str, Any]], Any] | None = None
-    attr_fn: Callable[[dict[str, Any]], dict[str, Any]] | None = None
-
-
-def _dev0(data: dict) -> dict:
-    return _g(data, "devices", "0", default={}) or {}
-
-
-# ---------- Value helpers / unit conversions ----------
-def _mv_to_v(mv: Any) -> Optional[float]:
-    try:
-        return round(float(mv) / 1000.0, 3)
-    except Exception:
-        return None
-
-
-def _ma_to_a(ma: Any) -> Optional[float]:
-    try:
-        return round(float(ma) / 1000.0, 3)
-    except Exception:
-        return None
+    value_fn: Callable[[PoolSyncSnapshot], Any] | None = None
+    attr_fn: Callable[[PoolSyncSnapshot], dict[str, Any]] | None = None
 
 
 # ---------- Sensor map ----------
-SENSORS: list[PoolSyncSensorDesc] = [
+SENSORS: tuple[PoolSyncSensorDesc, ...] = (
     # --- PoolSync hub stats/system ---
     PoolSyncSensorDesc(
         key="board_temp_c",
         name="PoolSync Board Temperature",
         device_class=SensorDeviceClass.TEMPERATURE,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        value_fn=lambda d: _g(d, "poolSync", "status", "boardTemp"),
+        value_fn=lambda s: s.status.board_temp,
     ),
     PoolSyncSensorDesc(
         key="rssi_dbm",
         name="PoolSync RSSI",
         device_class=SensorDeviceClass.SIGNAL_STRENGTH,
         native_unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
-        value_fn=lambda d: _g(d, "poolSync", "status", "rssi"),
+        value_fn=lambda s: s.status.rssi,
     ),
     PoolSyncSensorDesc(
         key="uptime_secs",
         name="PoolSync Uptime",
         device_class=SensorDeviceClass.DURATION,
         native_unit_of_measurement=UnitOfTime.SECONDS,
-        value_fn=lambda d: _g(d, "poolSync", "stats", "upTimeSecs"),
+        value_fn=lambda s: s.stats.up_time_secs,
     ),
     PoolSyncSensorDesc(
         key="device_info",
         name="PoolSync System Details",
-        value_fn=lambda d: _g(d, "poolSync", "config", "name"),
-        attr_fn=lambda d: {
-            "macAddr": _g(d, "poolSync", "system", "macAddr"),
-            "bssid": _g(d, "poolSync", "system", "bssid"),
-            "fwVersion": _g(d, "poolSync", "system", "fwVersion"),
-            "hwVersion": _g(d, "poolSync", "system", "hwVersion"),
+        value_fn=lambda s: s.name,
+        attr_fn=lambda s: {
+            "macAddr": s.system.mac_addr,
+            "bssid": s.system.bssid,
+            "fwVersion": s.system.fw_version,
+            "hwVersion": s.system.hw_version,
         },
     ),
     PoolSyncSensorDesc(
         key="status_info",
         name="PoolSync Status",
-        value_fn=lambda d: "online" if _g(d, "poolSync", "status", "online") else "offline",
-        attr_fn=lambda d: {
-            "online": _g(d, "poolSync", "status", "online"),
-            "flags": _g(d, "poolSync", "status", "flags"),
-            "dateTime": _g(d, "poolSync", "status", "dateTime"),
+        value_fn=lambda s: "online" if s.status.online else "offline",
+        attr_fn=lambda s: {
+            "online": s.status.online,
+            "flags": s.status.flags,
+            "dateTime": s.status.date_time,
         },
     ),
     PoolSyncSensorDesc(
         key="diagnostics",
         name="PoolSync Diagnostics",
-        value_fn=lambda d: "diagnostics",
-        attr_fn=lambda d: {
-            "wifiDisconnects": _g(d, "poolSync", "stats", "wifiDisconnects"),
-            "awsDisconnects": _g(d, "poolSync", "stats", "awsDisconnects"),
-            "minRssi": _g(d, "poolSync", "stats", "minRssi"),
-            "maxRssi": _g(d, "poolSync", "stats", "maxRssi"),
-            "minBoardTemp": _g(d, "poolSync", "stats", "minBoardTemp"),
-            "maxBoardTemp": _g(d, "poolSync", "stats", "maxBoardTemp"),
-            "systemRestarts": _g(d, "poolSync", "stats", "systemRestarts"),
-            "numDeviceMsgNoResp": _g(d, "poolSync", "stats", "numDeviceMsgNoResp"),
+        value_fn=lambda s: "diagnostics",
+        attr_fn=lambda s: {
+            "wifiDisconnects": s.stats.wifi_disconnects,
+            "awsDisconnects": s.stats.aws_disconnects,
+            "minRssi": s.stats.min_rssi,
+            "maxRssi": s.stats.max_rssi,
+            "minBoardTemp": s.stats.min_board_temp,
+            "maxBoardTemp": s.stats.max_board_temp,
+            "systemRestarts": s.stats.system_restarts,
+            "numDeviceMsgNoResp": s.stats.num_device_msg_no_resp,
         },
     ),
 
@@ -119,119 +107,321 @@ SENSORS: list[PoolSyncSensorDesc] = [
         name="Pool Water Temperature",
         device_class=SensorDeviceClass.TEMPERATURE,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        value_fn=lambda d: _g(_dev0(d), "status", "waterTemp"),
+        value_fn=lambda s: s.chlor.status.water_temp,
     ),
     PoolSyncSensorDesc(
         key="flow_rate_gpm",
         name="Salt Cell Flow Rate",
         native_unit_of_measurement="gal/min",
-        value_fn=lambda d: _g(_dev0(d), "status", "flowRate"),
+        value_fn=lambda s: s.chlor.status.flow_rate,
     ),
     PoolSyncSensorDesc(
         key="salt_ppm",
         name="Salt PPM",
         native_unit_of_measurement="ppm",
-        value_fn=lambda d: _g(_dev0(d), "status", "saltPPM"),
+        value_fn=lambda s: s.chlor.status.salt_ppm,
     ),
     PoolSyncSensorDesc(
         key="chlor_output_pct",
         name="Chlor Output",
         native_unit_of_measurement=PERCENTAGE,
-        value_fn=lambda d: _g(_dev0(d), "config", "chlorOutput"),
+        value_fn=lambda s: s.chlor.config.chlor_output,
     ),
     PoolSyncSensorDesc(
         key="boost_remaining_min",
         name="Chlor Boost Remaining",
         device_class=SensorDeviceClass.DURATION,
         native_unit_of_measurement=UnitOfTime.MINUTES,
-        value_fn=lambda d: _g(_dev0(d), "status", "boostRemaining"),
+        value_fn=lambda s: s.chlor.status.boost_remaining,
     ),
     PoolSyncSensorDesc(
         key="raw_salt_adc",
         name="Cell Raw Salt ADC",
-        value_fn=lambda d: _g(_dev0(d), "status", "cellRawSaltADC"),
+        value_fn=lambda s: s.chlor.status.cell_raw_salt_adc,
     ),
     PoolSyncSensorDesc(
         key="cell_rail_voltage_v",
         name="Cell Rail Voltage",
         device_class=SensorDeviceClass.VOLTAGE,
         native_unit_of_measurement=UnitOfElectricPotential.VOLT,
-        value_fn=lambda d: _mv_to_v(_g(_dev0(d), "status", "cellRailVoltage")),
+        value_fn=lambda s: s.chlor.status.cell_rail_voltage,
     ),
     PoolSyncSensorDesc(
         key="fwd_current_a",
         name="Cell Forward Current",
         device_class=SensorDeviceClass.CURRENT,
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
-        value_fn=lambda d: _ma_to_a(_g(_dev0(d), "status", "fwdCurrent")),
+        value_fn=lambda s: s.chlor.status.fwd_current,
     ),
     PoolSyncSensorDesc(
         key="rev_current_a",
         name="Cell Reverse Current",
         device_class=SensorDeviceClass.CURRENT,
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
-        value_fn=lambda d: _ma_to_a(_g(_dev0(d), "status", "revCurrent")),
+        value_fn=lambda s: s.chlor.status.rev_current,
     ),
     PoolSyncSensorDesc(
         key="out_voltage_v",
         name="Cell Output Voltage",
         device_class=SensorDeviceClass.VOLTAGE,
         native_unit_of_measurement=UnitOfElectricPotential.VOLT,
-        value_fn=lambda d: _mv_to_v(_g(_dev0(d), "status", "outVoltage")),
+        value_fn=lambda s: s.chlor.status.out_voltage,
     ),
     PoolSyncSensorDesc(
         key="device_config",
         name="ChlorSync Config",
-        value_fn=lambda d: _g(_dev0(d), "nodeAttr", "name") or "ChlorSync",
-        attr_fn=lambda d: {
-            "poolCoverCtrl": _g(_dev0(d), "config", "poolCoverCtrl"),
-            "gallons": _g(_dev0(d), "config", "gallons"),
-            "polarityChangeTime": _g(_dev0(d), "config", "polarityChangeTime"),
-            "userSaltCalib": _g(_dev0(d), "config", "userSaltCalib"),
+        value_fn=lambda s: s.chlor.name or "ChlorSync",
+        attr_fn=lambda s: {
+            "poolCoverCtrl": s.chlor.config.pool_cover_ctrl,
+            "gallons": s.chlor.config.gallons,
+            "polarityChangeTime": s.chlor.config.polarity_change_time,
+            "userSaltCalib": s.chlor.config.user_salt_calib,
         },
     ),
     PoolSyncSensorDesc(
         key="cell_system",
         name="Cell System",
-        value_fn=lambda d: _g(_dev0(d), "nodeAttr", "name") or "ChlorSync",
-        attr_fn=lambda d: {
-            "drvFwVersion": _g(_dev0(d), "system", "drvFwVersion"),
-            "cellFwVersion": _g(_dev0(d), "system", "cellFwVersion"),
-            "cellHwVersion": _g(_dev0(d), "system", "cellHwVersion"),
-            "cellCalib": _g(_dev0(d), "system", "cellCalib"),
-            "numBlades": _g(_dev0(d), "system", "numBlades"),
-            "cellSerialNum": _g(_dev0(d), "system", "cellSerialNum"),
+        value_fn=lambda s: s.chlor.name or "ChlorSync",
+        attr_fn=lambda s: {
+            "drvFwVersion": s.chlor.system.drv_fw_version,
+            "cellFwVersion": s.chlor.system.cell_fw_version,
+            "cellHwVersion": s.chlor.system.cell_hw_version,
+            "cellCalib": s.chlor.system.cell_calib,
+            "numBlades": s.chlor.system.num_blades,
+            "cellSerialNum": s.chlor.system.cell_serial_num,
         },
     ),
     PoolSyncSensorDesc(
         key="cell_faults",
         name="Cell Faults",
-        value_fn=lambda d: (_g(_dev0(d), "faults") or [0])[0],
+        value_fn=lambda s: (s.chlor.faults or (0,))[0],
+        attr_fn=lambda s: {"faults": [fault.as_dict() for fault in s.chlor.active_faults]},
     ),
     PoolSyncSensorDesc(
         key="device_stats",
         name="ChlorSync Stats",
-        value_fn=lambda d: "stats",
-        attr_fn=lambda d: {
-            "stat0": _g(_dev0(d), "stats", 0),
-            "stat1": _g(_dev0(d), "stats", 1),
-            "stat2": _g(_dev0(d), "stats", 2),
-            "stat3": _g(_dev0(d), "stats", 3),
-            "stat4": _g(_dev0(d), "stats", 4),
-            "stat5": _g(_dev0(d), "stats", 5),
-            "stat6": _g(_dev0(d), "stats", 6),
-            "stat7": _g(_dev0(d), "stats", 7),
-            "stat8": _g(_dev0(d), "stats", 8),
-            "stat9": _g(_dev0(d), "stats", 9),
+        value_fn=lambda s: "stats",
+        attr_fn=lambda s: {f"stat{i}": s.chlor.stat(i) for i in range(10)},
+    ),
+)
+
+
+HEATPUMP_SENSORS: tuple[PoolSyncSensorDesc, ...] = (
+    PoolSyncSensorDesc(
+        key="hp_water_temp_c",
+        name="Heat Pump Water Temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        value_fn=lambda s: s.heatpump.status.water_temp,
+    ),
+    PoolSyncSensorDesc(
+        key="hp_air_temp_c",
+        name="Heat Pump Air Temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        value_fn=lambda s: s.heatpump.status.air_temp,
+    ),
+    PoolSyncSensorDesc(
+        key="hp_mode",
+        name="Heat Pump Mode",
+        value_fn=lambda s: s.heatpump.config.mode,
+    ),
+    PoolSyncSensorDesc(
+        key="hp_setpoint_temp_c",
+        name="Heat Pump SetPoint Temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        value_fn=lambda s: s.heatpump.config.setpoint,
+    ),
+)
+
+
+@dataclass(frozen=True)
+class PoolSyncMetricSensorDesc(SensorEntityDescription):
+    """Diagnostic sensor fed from the API's request metrics."""
+    metric_fn: Callable[[RequestMetrics], Any] | None = None
+    attr_fn: Callable[[RequestMetrics], dict[str, Any]] | None = None
+    # Also written on failed polls that leave the hub's other entities alone
+    update_on_failure: bool = False
+
+
+# ---------- Request instrumentation (per hub) ----------
+METRIC_SENSORS: tuple[PoolSyncMetricSensorDesc, ...] = (
+    PoolSyncMetricSensorDesc(
+        key="request_latency_p50",
+        name="Request Latency p50",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        metric_fn=lambda m: m.latency.percentile(50),
+    ),
+    PoolSyncMetricSensorDesc(
+        key="request_latency_p95",
+        name="Request Latency p95",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        metric_fn=lambda m: m.latency.percentile(95),
+        attr_fn=lambda m: {
+            "requests": m.requests,
+            "mean_ms": m.latency.mean,
+            "histogram": m.latency.histogram_dict(),
+        },
+    ),
+    PoolSyncMetricSensorDesc(
+        key="request_latency_p99",
+        name="Request Latency p99",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        metric_fn=lambda m: m.latency.percentile(99),
+    ),
+    PoolSyncMetricSensorDesc(
+        key="response_bytes",
+        name="Response Size",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        entity_registry_enabled_default=False,
+        metric_fn=lambda m: m.last_bytes,
+        attr_fn=lambda m: {"mean_bytes": m.mean_bytes, "bytes_total": m.bytes_total},
+    ),
+    PoolSyncMetricSensorDesc(
+        key="response_parse_time",
+        name="Response Parse Time",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_registry_enabled_default=False,
+        metric_fn=lambda m: m.last_parse_ms,
+        attr_fn=lambda m: {"mean_ms": m.mean_parse_ms},
+    ),
+    PoolSyncMetricSensorDesc(
+        key="request_timeouts",
+        name="Request Timeouts",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        metric_fn=lambda m: m.errors[ERROR_TIMEOUT],
+        update_on_failure=True,
+    ),
+    PoolSyncMetricSensorDesc(
+        key="request_http_errors",
+        name="Request HTTP Errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        metric_fn=lambda m: m.errors[ERROR_HTTP_STATUS],
+        update_on_failure=True,
+    ),
+    PoolSyncMetricSensorDesc(
+        key="request_errors",
+        name="Request Errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        metric_fn=lambda m: m.error_total,
+        attr_fn=lambda m: {
+            **m.errors,
+            "last_error": m.last_error,
+        },
+        update_on_failure=True,
+    ),
+    PoolSyncMetricSensorDesc(
+        key="update_duration",
+        name="Update Duration",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        metric_fn=lambda m: None if m.updates.last is None else round(m.updates.last, 1),
+        attr_fn=lambda m: {
+            "p95_ms": m.updates.percentile(95),
+            "updates": m.updates.count,
+            "failures": m.update_failures,
         },
+        update_on_failure=True,
+    ),
+    PoolSyncMetricSensorDesc(
+        key="data_age",
+        name="Data Age",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        metric_fn=lambda m: m.data_age,
+        attr_fn=lambda m: {"consecutive_failures": m.consecutive_failures},
+        update_on_failure=True,
     ),
-]
+    PoolSyncMetricSensorDesc(
+        key="update_overruns",
+        name="Update Overruns",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        metric_fn=lambda m: m.overruns,
+        attr_fn=lambda m: {"coalesced_refreshes": m.coalesced},
+    ),
+    PoolSyncMetricSensorDesc(
+        key="poll_rate",
+        name="Poll Rate",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="polls/min",
+        entity_registry_enabled_default=False,
+        metric_fn=lambda m: m.poll_rate,
+    ),
+)
 
 
-class PoolSyncSensor(CoordinatorEntity[PoolSyncCoordinator], SensorEntity):
+@dataclass(frozen=True)
+class PoolSyncFleetSensorDesc(SensorEntityDescription):
+    """Roll-up across every hub, see ``fleet.py``."""
+    value_fn: Callable[[FleetAggregator], Any] | None = None
+
+
+# ---------- Fleet roll-ups (one set for all hubs) ----------
+FLEET_SENSORS: tuple[PoolSyncFleetSensorDesc, ...] = (
+    PoolSyncFleetSensorDesc(
+        key="hubs_online",
+        name="Hubs Online",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda f: f.online,
+    ),
+    PoolSyncFleetSensorDesc(
+        key="hubs_in_fault",
+        name="Hubs In Fault",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda f: f.in_fault,
+    ),
+    PoolSyncFleetSensorDesc(
+        key="salt_ppm_min",
+        name="Salt Level Min",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="ppm",
+        value_fn=lambda f: f.salt_min,
+    ),
+    PoolSyncFleetSensorDesc(
+        key="salt_ppm_max",
+        name="Salt Level Max",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="ppm",
+        value_fn=lambda f: f.salt_max,
+    ),
+    PoolSyncFleetSensorDesc(
+        key="water_temp_avg",
+        name="Water Temperature Average",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        value_fn=lambda f: f.water_temp_avg,
+    ),
+    PoolSyncFleetSensorDesc(
+        key="cell_power_total",
+        name="Cell Power Total",
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        value_fn=lambda f: f.cell_power_total,
+    ),
+)
+
+
+class PoolSyncSensor(PoolSyncRestoreEntity, RestoreSensor):
     """Generic PoolSync sensor wired to the coordinator."""
 
     entity_description: PoolSyncSensorDesc
+    _attr_has_entity_name = True
+    _restored_value: Any = None
 
     def __init__(
         self,
@@ -242,24 +432,21 @@ class PoolSyncSensor(CoordinatorEntity[PoolSyncCoordinator], SensorEntity):
         super().__init__(coordinator)
         self.entity_description = description
 
-        mac = coordinator.api.mac_address or entry.data.get("mac") or "poolsync"
+        mac = coordinator.hub_id(entry)
         self._attr_unique_id = f"{mac}_{description.key}"
-        self._attr_has_entity_name = True
-        self._attr_name = description.name
-        self._attr_native_value = None
-
         # Device info groups all sensors under the PoolSync device
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, mac)},
-            "manufacturer": "AquaCal",
-            "name": "PoolSync",
-            "sw_version": str(_g(self.coordinator.data or {}, "poolSync", "system", "fwVersion")),
-            "model": "PoolSync",
-        }
+        self._attr_device_info = coordinator.device_info(entry)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if self.stale and (last := await self.async_get_last_sensor_data()):
+            self._restored_value = last.native_value
 
     @property
     def native_value(self) -> Any:
-        data = self.coordinator.data or {}
+        if self.stale:
+            return self._restored_value
+        data = self.coordinator.data or EMPTY_SNAPSHOT
         if self.entity_description.value_fn:
             try:
                 return self.entity_description.value_fn(data)
@@ -269,7 +456,9 @@ class PoolSyncSensor(CoordinatorEntity[PoolSyncCoordinator], SensorEntity):
 
     @property
     def extra_state_attributes(self) -> Optional[dict[str, Any]]:
-        data = self.coordinator.data or {}
+        if self.stale:
+            return self.restored_attributes()
+        data = self.coordinator.data or EMPTY_SNAPSHOT
         if self.entity_description.attr_fn:
             try:
                 return self.entity_description.attr_fn(data)
@@ -278,54 +467,135 @@ class PoolSyncSensor(CoordinatorEntity[PoolSyncCoordinator], SensorEntity):
         return None
 
 
+class PoolSyncStatisticsSensor(PoolSyncSensor):
+    """Sensor whose counter attributes are kept out of the recorder.
+
+    The counters are imported hourly as long-term statistics instead, see
+    ``statistics.py``.
+    """
+
+    _unrecorded_attributes = frozenset(
+        {
+            "wifiDisconnects",
+            "awsDisconnects",
+            "minRssi",
+            "maxRssi",
+            "minBoardTemp",
+            "maxBoardTemp",
+            "systemRestarts",
+            "numDeviceMsgNoResp",
+            *(f"stat{i}" for i in range(10)),
+        }
+    )
+
+
+STATISTICS_SENSOR_KEYS = {"diagnostics", "device_stats"}
+
+
+class PoolSyncMetricSensor(CoordinatorEntity[PoolSyncCoordinator], SensorEntity):
+    """Diagnostic request/coordinator metric for one hub."""
+
+    entity_description: PoolSyncMetricSensorDesc
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_has_entity_name = True
+    _unrecorded_attributes = frozenset({"histogram"})
+
+    def __init__(
+        self,
+        coordinator: PoolSyncCoordinator,
+        entry: ConfigEntry,
+        description: PoolSyncMetricSensorDesc,
+    ) -> None:
+        super().__init__(coordinator)
+        self.entity_description = description
+
+        mac = coordinator.hub_id(entry)
+        self._attr_unique_id = f"{mac}_{description.key}"
+        self._attr_device_info = coordinator.device_info(entry)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if self.entity_description.update_on_failure:
+            self.async_on_remove(
+                self.coordinator.async_add_failure_listener(self.async_write_ha_state)
+            )
+
+    @property
+    def available(self) -> bool:
+        # Metrics matter most while the hub is failing
+        return True
+
+    @property
+    def native_value(self) -> Any:
+        if self.entity_description.metric_fn is None:
+            return None
+        return self.entity_description.metric_fn(self.coordinator.api.metrics)
+
+    @property
+    def extra_state_attributes(self) -> Optional[dict[str, Any]]:
+        if self.entity_description.attr_fn is None:
+            return None
+        return self.entity_description.attr_fn(self.coordinator.api.metrics)
+
+
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     coordinator: PoolSyncCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
 
-    entities: list[PoolSyncSensor] = [
-        PoolSyncSensor(coordinator, entry, desc) for desc in SENSORS
+    entities: list[SensorEntity] = [
+        (
+            PoolSyncStatisticsSensor
+            if desc.key in STATISTICS_SENSOR_KEYS
+            else PoolSyncSensor
+        )(coordinator, entry, desc)
+        for desc in SENSORS
     ]
 
-    data = coordinator.data or {}
-    device_types = _g(data, "deviceType", default={}) or {}
-    heatpump_idx = next(
-        (idx for idx, dev in device_types.items() if dev == "heatPump"),
-        None,
+    entities.extend(
+        PoolSyncMetricSensor(coordinator, entry, desc) for desc in METRIC_SENSORS
     )
 
-    if heatpump_idx is not None:
-        hp_idx = str(heatpump_idx)
-        hp_sensors = [
-            PoolSyncSensorDesc(
-                key="hp_water_temp_c",
-                name="Heat Pump Water Temperature",
-                device_class=SensorDeviceClass.TEMPERATURE,
-                native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-                value_fn=lambda d, i=hp_idx: _g(d, "devices", i, "status", "waterTemp"),
-            ),
-            PoolSyncSensorDesc(
-                key="hp_air_temp_c",
-                name="Heat Pump Air Temperature",
-                device_class=SensorDeviceClass.TEMPERATURE,
-                native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-                value_fn=lambda d, i=hp_idx: _g(d, "devices", i, "status", "airTemp"),
-            ),
-            PoolSyncSensorDesc(
-                key="hp_mode",
-                name="Heat Pump Mode",
-                value_fn=lambda d, i=hp_idx: _g(d, "devices", i, "config", "mode"),
-            ),
-            PoolSyncSensorDesc(
-                key="hp_setpoint_temp_c",
-                name="Heat Pump SetPoint Temperature",
-                device_class=SensorDeviceClass.TEMPERATURE,
-                native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-                value_fn=lambda d, i=hp_idx: _g(d, "devices", i, "config", "setpoint"),
-            ),
-        ]
-        for desc in hp_sensors:
+    if coordinator.heatpump_index is not None:
+        for desc in HEATPUMP_SENSORS:
             entities.append(PoolSyncSensor(coordinator, entry, desc))
 
-    async_add_entities(entities, update_before_add=True)
+    async_add_entities(entities)
+
+    fleet: FleetAggregator | None = hass.data.get(DATA_FLEET)
+    if fleet is not None:
+        fleet.async_claim(
+            hass,
+            entry.entry_id,
+            lambda: async_add_entities(
+                [PoolSyncFleetSensor(fleet, desc) for desc in FLEET_SENSORS]
+            ),
+        )
+
 
+class PoolSyncFleetSensor(SensorEntity):
+    """Roll-up across hubs on the "PoolSync Fleet" device."""
+
+    entity_description: PoolSyncFleetSensorDesc
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(self, fleet: FleetAggregator, description: PoolSyncFleetSensorDesc) -> None:
+        self.fleet = fleet
+        self.entity_description = description
+        self._attr_unique_id = f"{DOMAIN}_fleet_{description.key}"
+        self._attr_device_info = FLEET_DEVICE_INFO
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self.fleet.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> Any:
+        return self.entity_description.value_fn(self.fleet)
+
+    @property
+    def extra_state_attributes(self) -> Optional[dict[str, Any]]:
+        return {"hubs": self.fleet.hubs}
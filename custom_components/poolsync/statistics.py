@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+from typing import Any, Callable, Optional
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import SIGNAL_STRENGTH_DECIBELS_MILLIWATT, UnitOfTemperature
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+from .model import PoolSyncSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PoolSyncStatisticDesc:
+    """Describe one value imported into long-term statistics.
+
+    Counters are imported as ``state``/``sum`` rows (the sum keeps growing
+    across device restarts), gauges as hourly ``mean``/``min``/``max`` rows.
+    """
+
+    key: str
+    name: str
+    value_fn: Callable[[PoolSyncSnapshot], Any]
+    counter: bool = True
+    unit: Optional[str] = None
+
+
+def _stat(i: int) -> PoolSyncStatisticDesc:
+    return PoolSyncStatisticDesc(
+        key=f"chlorsync_stat{i}",
+        name=f"ChlorSync Stat {i}",
+        value_fn=lambda s: s.chlor.stat(i),
+    )
+
+
+STATISTICS: list[PoolSyncStatisticDesc] = [
+    # --- PoolSync hub counters ---
+    PoolSyncStatisticDesc(
+        key="wifi_disconnects",
+        name="Wi-Fi Disconnects",
+        value_fn=lambda s: s.stats.wifi_disconnects,
+    ),
+    PoolSyncStatisticDesc(
+        key="aws_disconnects",
+        name="AWS Disconnects",
+        value_fn=lambda s: s.stats.aws_disconnects,
+    ),
+    PoolSyncStatisticDesc(
+        key="system_restarts",
+        name="System Restarts",
+        value_fn=lambda s: s.stats.system_restarts,
+    ),
+    PoolSyncStatisticDesc(
+        key="device_msg_no_resp",
+        name="Device Messages Without Response",
+        value_fn=lambda s: s.stats.num_device_msg_no_resp,
+    ),
+
+    # --- PoolSync hub gauges ---
+    PoolSyncStatisticDesc(
+        key="min_rssi",
+        name="Minimum RSSI",
+        value_fn=lambda s: s.stats.min_rssi,
+        counter=False,
+        unit=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    ),
+    PoolSyncStatisticDesc(
+        key="max_rssi",
+        name="Maximum RSSI",
+        value_fn=lambda s: s.stats.max_rssi,
+        counter=False,
+        unit=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    ),
+    PoolSyncStatisticDesc(
+        key="min_board_temp",
+        name="Minimum Board Temperature",
+        value_fn=lambda s: s.stats.min_board_temp,
+        counter=False,
+        unit=UnitOfTemperature.CELSIUS,
+    ),
+    PoolSyncStatisticDesc(
+        key="max_board_temp",
+        name="Maximum Board Temperature",
+        value_fn=lambda s: s.stats.max_board_temp,
+        counter=False,
+        unit=UnitOfTemperature.CELSIUS,
+    ),
+
+    # --- Device 0: ChlorSync stats array ---
+    *(_stat(i) for i in range(10)),
+]
+
+
+def _as_float(value: Any) -> Optional[float]:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _increase(previous: float, value: float) -> float:
+    """How far a counter moved; after a device reset it counts from zero."""
+    return value - previous if value >= previous else value
+
+
+class _HourBucket:
+    """Values seen for one statistic during one hour."""
+
+    __slots__ = ("start", "first", "last", "increase", "total", "count", "min", "max")
+
+    def __init__(self, start: datetime) -> None:
+        self.start = start
+        self.first = 0.0
+        self.last = 0.0
+        # Counter growth from ``first`` to ``last``, across resets in between
+        self.increase = 0.0
+        self.total = 0.0
+        self.count = 0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def add(self, value: float) -> None:
+        if self.count:
+            self.increase += _increase(self.last, value)
+        else:
+            self.first = value
+        self.last = value
+        self.total += value
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+
+class PoolSyncStatistics:
+    """Accumulate hub counters per hour and import them as external statistics.
+
+    Every poll only updates in-memory hourly buckets. When the hour rolls over,
+    one row per statistic is handed to the recorder, so the database grows by a
+    fixed number of rows per hour regardless of the poll interval. The hour in
+    progress is handed over early by ``async_flush`` when the entry unloads.
+    """
+
+    def __init__(self, hass: HomeAssistant, hub_id: str, title: str) -> None:
+        self.hass = hass
+        self._prefix = f"{DOMAIN}:{slugify(hub_id)}"
+        self._title = title
+        self._buckets: dict[str, _HourBucket] = {}
+        # statistic_id -> (state, sum) of the last imported counter row
+        self._last: dict[str, tuple[Optional[float], float]] = {}
+
+    def statistic_id(self, desc: PoolSyncStatisticDesc) -> str:
+        return f"{self._prefix}_{desc.key}"
+
+    @callback
+    def async_record(self, data: Optional[PoolSyncSnapshot]) -> None:
+        """Add one poll's values to the current hour; import finished hours."""
+        if data is None:
+            return
+
+        hour = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+        rolled: list[tuple[PoolSyncStatisticDesc, _HourBucket]] = []
+
+        for desc in STATISTICS:
+            value = _as_float(desc.value_fn(data))
+            if value is None:
+                continue
+            statistic_id = self.statistic_id(desc)
+            bucket = self._buckets.get(statistic_id)
+            if bucket is None or bucket.start != hour:
+                if bucket is not None:
+                    rolled.append((desc, bucket))
+                bucket = self._buckets[statistic_id] = _HourBucket(hour)
+            bucket.add(value)
+
+        if rolled:
+            self.hass.async_create_task(self._async_import(rolled))
+
+    @callback
+    def async_flush(self) -> None:
+        """Import the hour in progress, e.g. before the entry unloads.
+
+        A later row for the same hour replaces this one, and its counter sum
+        continues from it, so flushing early loses nothing.
+        """
+        by_id = {self.statistic_id(desc): desc for desc in STATISTICS}
+        pending = [
+            (by_id[statistic_id], bucket)
+            for statistic_id, bucket in self._buckets.items()
+        ]
+        self._buckets.clear()
+        if pending:
+            self.hass.async_create_task(self._async_import(pending))
+
+    async def _async_import(
+        self, rolled: list[tuple[PoolSyncStatisticDesc, _HourBucket]]
+    ) -> None:
+        for desc, bucket in rolled:
+            statistic_id = self.statistic_id(desc)
+            if desc.counter:
+                row = await self._async_counter_row(statistic_id, bucket)
+            else:
+                row = StatisticData(
+                    start=bucket.start,
+                    mean=bucket.total / bucket.count,
+                    min=bucket.min,
+                    max=bucket.max,
+                )
+
+            metadata = StatisticMetaData(
+                has_mean=not desc.counter,
+                has_sum=desc.counter,
+                name=f"{self._title} {desc.name}",
+                source=DOMAIN,
+                statistic_id=statistic_id,
+                unit_of_measurement=desc.unit,
+            )
+            async_add_external_statistics(self.hass, metadata, [row])
+
+        _LOGGER.debug(
+            "Imported %d hourly statistics for %s", len(rolled), self._prefix
+        )
+
+    async def _async_counter_row(
+        self, statistic_id: str, bucket: _HourBucket
+    ) -> StatisticData:
+        if statistic_id not in self._last:
+            self._last[statistic_id] = await self._async_load_last(statistic_id)
+
+        prev_state, prev_sum = self._last[statistic_id]
+        # Growth since the last imported row: up to this hour's first sample
+        # (nothing to compare with on the very first row), then within the hour
+        delta = bucket.increase
+        if prev_state is not None:
+            delta += _increase(prev_state, bucket.first)
+
+        total = prev_sum + delta
+        self._last[statistic_id] = (bucket.last, total)
+        return StatisticData(start=bucket.start, state=bucket.last, sum=total)
+
+    async def _async_load_last(
+        self, statistic_id: str
+    ) -> tuple[Optional[float], float]:
+        """Continue the running sum from the last row already in the database."""
+        try:
+            last = await get_instance(self.hass).async_add_executor_job(
+                get_last_statistics, self.hass, 1, statistic_id, False, {"state", "sum"}
+            )
+        except Exception as err:
+            _LOGGER.debug("Could not load last statistics for %s: %s", statistic_id, err)
+            return None, 0.0
+
+        rows = last.get(statistic_id) or []
+        if not rows:
+            return None, 0.0
+        return _as_float(rows[0].get("state")), _as_float(rows[0].get("sum")) or 0.0
@@ -1,15 +1,16 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Optional
 
 from homeassistant.components.switch import SwitchEntity
+from homeassistant.const import STATE_ON
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.config_entries import ConfigEntry
 
 from .const import DOMAIN
 from .coordinator import PoolSyncCoordinator
-from .util import _g
+from .entity import PoolSyncRestoreEntity
+from .model import EMPTY_SNAPSHOT
 
 
 async def async_setup_entry(
@@ -21,51 +22,54 @@ async def async_setup_entry(
     entities: list[SwitchEntity] = [
         PoolSyncBoostSwitch(coordinator, entry, device_index=0),
     ]
-    async_add_entities(entities, update_before_add=True)
+    async_add_entities(entities)
 
 
-class PoolSyncBoostSwitch(CoordinatorEntity[PoolSyncCoordinator], SwitchEntity):
+class PoolSyncBoostSwitch(PoolSyncRestoreEntity, SwitchEntity):
     """24h Salt Boost toggle for ChlorSync."""
 
+    _attr_name = "Salt Boost (24h)"
+    _attr_icon = "mdi:rocket-launch"
+
     def __init__(
         self, coordinator: PoolSyncCoordinator, entry: ConfigEntry, device_index: int = 0
     ) -> None:
         super().__init__(coordinator)
         self._device_index = device_index
-        mac = coordinator.api.mac_address or entry.data.get("mac") or "poolsync"
+        mac = coordinator.hub_id(entry)
         self._attr_unique_id = f"{mac}_boost_{device_index}"
-        self._attr_name = "Salt Boost (24h)"
-        self._attr_icon = "mdi:rocket-launch"
 
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, mac)},
-            "manufacturer": "AquaCal",
-            "name": "PoolSync",
-            "model": "PoolSync",
-        }
+        self._attr_device_info = coordinator.device_info(entry)
 
     @property
     def is_on(self) -> bool:
-        data = self.coordinator.data or {}
+        if self.stale:
+            return self._restored.state == STATE_ON
+        data = self.coordinator.data or EMPTY_SNAPSHOT
         # No explicit boolean in sample JSON; infer from boostRemaining minutes > 0
-        remaining = _g(
-            data,
-            "devices",
-            str(self._device_index),
-            "status",
-            "boostRemaining",
-            default=0,
-        )
+        remaining = data.chlor.status.boost_remaining
         try:
-            return int(remaining) > 0
+            return int(remaining or 0) > 0
         except Exception:
             return False
 
+    @property
+    def extra_state_attributes(self) -> Optional[dict[str, Any]]:
+        return self.restored_attributes() if self.stale else None
+
     async def async_turn_on(self, **kwargs: Any) -> None:
-        await self.coordinator.api.set_boost_mode(self._device_index, True)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_write_device(
+            self._device_index,
+            self.coordinator.api.set_boost_mode(
+                self._device_index, True, verify=self.coordinator.verify_writes
+            ),
+        )
 
     async def async_turn_off(self, **kwargs: Any) -> None:
-        await self.coordinator.api.set_boost_mode(self._device_index, False)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_write_device(
+            self._device_index,
+            self.coordinator.api.set_boost_mode(
+                self._device_index, False, verify=self.coordinator.verify_writes
+            ),
+        )
 
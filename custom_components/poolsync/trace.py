@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Iterator
+
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+
+
+class TraceWriter:
+    """Append timestamped responses to a gzip'd JSONL file with size rotation.
+
+    Each flush appends one gzip member; ``gzip`` readers treat concatenated
+    members as one stream, so the file stays readable while it grows. When it
+    exceeds ``max_bytes`` it is rotated to ``<path>.1`` .. ``<path>.<backups>``.
+    Blocking: call from an executor.
+    """
+
+    def __init__(
+        self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, backups: int = DEFAULT_BACKUPS
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+
+    def write(self, records: list[tuple[float, dict[str, Any]]]) -> None:
+        lines = "".join(
+            json.dumps({"t": at, "data": data}, separators=(",", ":")) + "\n"
+            for at, data in records
+        )
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with gzip.open(self.path, "at", encoding="utf-8") as fh:
+                fh.write(lines)
+            if os.path.getsize(self.path) >= self.max_bytes:
+                self._rotate()
+
+    def _rotate(self) -> None:
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+class SnapshotTraceRecorder:
+    """Record every ``poolSync&all`` response without blocking the event loop.
+
+    Responses are queued in memory and written by an executor job; only one
+    write is in flight at a time and anything queued meanwhile goes out in the
+    next batch.
+    """
+
+    def __init__(self, hass: HomeAssistant, writer: TraceWriter) -> None:
+        self.hass = hass
+        self.writer = writer
+        self._pending: list[tuple[float, dict[str, Any]]] = []
+        self._writing = False
+        self._task: asyncio.Task[None] | None = None
+
+    @callback
+    def record(self, data: dict[str, Any]) -> None:
+        self._pending.append((time.time(), data))
+        if not self._writing:
+            self._writing = True
+            self._task = self.hass.async_create_background_task(
+                self._async_drain(), "poolsync_trace_write"
+            )
+
+    async def _async_drain(self) -> None:
+        try:
+            while self._pending:
+                batch, self._pending = self._pending, []
+                try:
+                    await self.hass.async_add_executor_job(self.writer.write, batch)
+                except OSError as err:
+                    _LOGGER.warning("Could not write PoolSync trace %s: %s", self.writer.path, err)
+        finally:
+            self._writing = False
+
+    async def async_close(self) -> None:
+        """Wait for the write in flight, then write whatever is still queued."""
+        if self._task is not None and not self._task.done():
+            await self._task
+        self._task = None
+        if self._pending:
+            await self._async_drain()
+
+
+def iter_trace(path: str) -> Iterator[tuple[float, dict[str, Any]]]:
+    """Yield (timestamp, response) pairs from a recording, oldest first."""
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            yield record["t"], record["data"]
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import Any
+import re
+import time
+from typing import Any, Iterable
 
 
 def _g(d: dict, *path, default=None):
@@ -22,3 +24,126 @@ def _g(d: dict, *path, default=None):
             continue
         return default
     return cur
+
+
+REDACTED = "<redacted>"
+# Credentials the device hands out (push-link password) or expects back
+# (token + lowercase 'user' header); matched case-insensitively.
+REDACT_KEYS = frozenset({"password", "pass", "token", "authorization", "user", "user_id"})
+
+
+def redact(data: Any, keys: frozenset[str] = REDACT_KEYS) -> Any:
+    """Return a copy of dicts/lists with credential values replaced."""
+    if isinstance(data, dict):
+        return {
+            k: (REDACTED if str(k).lower() in keys and v else redact(v, keys))
+            for k, v in data.items()
+        }
+    if isinstance(data, list):
+        return [redact(v, keys) for v in data]
+    return data
+
+
+# key/value pair in a body that didn't parse: JSON (possibly cut short),
+# a query string or a "Header: value" line
+_TEXT_PAIR = re.compile(
+    r"""(?P<key>["']?(?P<name>[A-Za-z_]+)["']?\s*[:=]\s*)"""
+    r"""(?P<value>"[^"]*"?|'[^']*'?|[^\s,;&}\]]+)"""
+)
+
+
+def redact_text(
+    text: str, keys: frozenset[str] = REDACT_KEYS, secrets: Iterable[str | None] = ()
+) -> str:
+    """Mask credential values in text that couldn't be parsed as JSON.
+
+    ``secrets`` are values masked wherever they appear, for bodies too
+    mangled to find their keys in.
+    """
+
+    def _mask(match: re.Match) -> str:
+        if match["name"].lower() not in keys:
+            return match[0]
+        value = match["value"]
+        opened = value[0] if value[0] in "\"'" else ""
+        closed = opened if len(value) > 1 and value.endswith(opened) else ""
+        return f"{match['key']}{opened}{REDACTED}{closed}"
+
+    if keys:
+        text = _TEXT_PAIR.sub(_mask, text)
+    for secret in secrets:
+        if secret:
+            text = text.replace(secret, REDACTED)
+    return text
+
+
+class LazyRedact:
+    """Log argument that redacts (and truncates) only when a record is emitted.
+
+    ``_LOGGER.debug("body=%s", LazyRedact(data))`` costs one small allocation
+    when debug logging is off; the copy and ``str()`` happen in the handler.
+    Strings go through ``redact_text``; pass ``keys=frozenset()`` to log as is.
+    """
+
+    __slots__ = ("_data", "_limit", "_keys", "_secrets")
+
+    def __init__(
+        self,
+        data: Any,
+        limit: int | None = None,
+        *,
+        keys: frozenset[str] = REDACT_KEYS,
+        secrets: Iterable[str | None] = (),
+    ) -> None:
+        self._data = data
+        self._limit = limit
+        self._keys = keys
+        self._secrets = secrets
+
+    def __str__(self) -> str:
+        if isinstance(self._data, str):
+            text = redact_text(self._data, self._keys, self._secrets)
+        else:
+            text = str(redact(self._data, self._keys)) if self._keys else str(self._data)
+        if self._limit is not None and len(text) > self._limit:
+            return f"{text[: self._limit]}…"
+        return text
+
+    __repr__ = __str__
+
+
+class RequestLogSampler:
+    """Decides which request log records one hub emits.
+
+    Every ``every``-th success is logged; failures are always logged, except
+    that the same failure repeating within ``error_interval`` seconds is
+    counted instead and the count reported with the next record for it.
+    """
+
+    __slots__ = ("every", "error_interval", "_successes", "_errors")
+
+    def __init__(self, every: int = 20, error_interval: float = 60.0) -> None:
+        self.every = max(1, int(every))
+        self.error_interval = error_interval
+        self._successes = 0
+        # failure key -> (monotonic time last logged, suppressed since)
+        self._errors: dict[str, list] = {}
+
+    def success(self) -> bool:
+        self._successes += 1
+        return (self._successes - 1) % self.every == 0
+
+    def failure(self, key: str, now: float | None = None) -> int | None:
+        """Return how many repeats were suppressed if this one should be
+        logged, or None to drop it."""
+        now = time.monotonic() if now is None else now
+        state = self._errors.get(key)
+        if state is None:
+            self._errors[key] = [now, 0]
+            return 0
+        if now - state[0] < self.error_interval:
+            state[1] += 1
+            return None
+        suppressed = state[1]
+        state[0], state[1] = now, 0
+        return suppressed
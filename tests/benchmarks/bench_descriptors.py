@@ -0,0 +1,33 @@
+"""Every sensor descriptor's ``value_fn``/``attr_fn`` against one snapshot."""
+import pytest
+
+from custom_components.poolsync.binary_sensor import HEATPUMP_BINARY_SENSORS
+from custom_components.poolsync.metrics import RequestMetrics
+from custom_components.poolsync.model import PoolSyncSnapshot
+from custom_components.poolsync.sensor import HEATPUMP_SENSORS, METRIC_SENSORS, SENSORS
+
+SNAPSHOT_DESCS = [*SENSORS, *HEATPUMP_SENSORS, *HEATPUMP_BINARY_SENSORS]
+
+
+@pytest.fixture
+def snapshot(payload):
+    return PoolSyncSnapshot.from_dict(payload)
+
+
+@pytest.mark.parametrize("desc", SNAPSHOT_DESCS, ids=lambda d: d.key)
+def test_descriptor(bench, snapshot, desc):
+    bench.run(f"{desc.key}.value_fn", lambda: desc.value_fn(snapshot), number=20000)
+    attr_fn = getattr(desc, "attr_fn", None)
+    if attr_fn is not None:
+        bench.run(f"{desc.key}.attr_fn", lambda: attr_fn(snapshot), number=20000)
+
+
+@pytest.mark.parametrize("desc", METRIC_SENSORS, ids=lambda d: d.key)
+def test_metric_descriptor(bench, desc):
+    metrics = RequestMetrics()
+    for i in range(300):
+        metrics.record_response("GET poolSync", (i % 50) / 1000.0, 4000, 0.0002)
+        metrics.record_update(0.05, ok=True)
+    bench.run(f"{desc.key}.metric_fn", lambda: desc.metric_fn(metrics), number=5000)
+    if desc.attr_fn is not None:
+        bench.run(f"{desc.key}.attr_fn", lambda: desc.attr_fn(metrics), number=5000)
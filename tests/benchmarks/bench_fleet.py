@@ -0,0 +1,20 @@
+"""Fleet roll-up update cost against the number of hubs."""
+from custom_components.poolsync.fleet import FleetAggregator, HubSummary
+
+
+def test_fleet_update(bench):
+    for hubs in (10, 100, 1000):
+        fleet = FleetAggregator()
+        for i in range(hubs):
+            fleet.update(f"hub{i}", HubSummary(online=True, salt_ppm=3000 + i, water_temp=27))
+        readings = [
+            HubSummary(online=True, salt_ppm=2900 + step, water_temp=27, cell_power=step)
+            for step in range(2)
+        ]
+        state = {"step": 0}
+
+        def _update():
+            state["step"] ^= 1
+            fleet.update("hub0", readings[state["step"]])
+
+        bench.run(f"update_{hubs}_hubs", _update, number=20000)
@@ -0,0 +1,40 @@
+"""Cost of request logging per response, with debug off, sampled and unsampled."""
+import json
+import logging
+
+from custom_components.poolsync import api as api_module
+from custom_components.poolsync.api import PoolSyncApi
+
+
+def test_request_logging(bench, payload):
+    text = json.dumps(payload)
+    api = PoolSyncApi(hass=None, base_url="http://hub.local", session=object())
+    logger = logging.getLogger(api_module.__name__)
+    handler = logging.NullHandler()
+    # Format every emitted record, as a real handler would
+    handler.handle = lambda record: bool(record.getMessage())
+    logger.addHandler(handler)
+    level, propagate = logger.level, logger.propagate
+    logger.propagate = False
+
+    def log_one():
+        if api_module._LOGGER.isEnabledFor(logging.DEBUG):
+            api._log_response("GET poolSync", 200, 0.05, text, payload)
+
+    try:
+        logger.setLevel(logging.INFO)
+        bench.run("debug_off", log_one, number=20000)
+        logger.setLevel(logging.DEBUG)
+        api.log_sampler.every = api_module.LOG_SAMPLE_EVERY
+        bench.run("debug_sampled", log_one, number=20000)
+        api.log_sampler.every = 1
+        bench.run("debug_every_request", log_one, number=2000)
+        bench.run(
+            "debug_repeated_failure",
+            lambda: api._log_failure("GET poolSync", "timeout", "timeout after 15.0s"),
+            number=20000,
+        )
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(level)
+        logger.propagate = propagate
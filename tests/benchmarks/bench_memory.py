@@ -0,0 +1,72 @@
+"""Memory held per hub (API, coordinator, snapshot, entities) for 1/50/200 hubs."""
+import functools
+import gc
+import json
+import tracemalloc
+
+import pytest
+
+from harness import FakeConfigEntry, FakeHass, async_setup_hub
+
+
+class _FixtureApi:
+    """Answers every request with the fixture, under the hub's MAC."""
+
+    text = ""
+    mac = ""
+
+    async def _request_json(self, method, path, params=None, headers=None,
+                            json_body=None, timeout_total=None):
+        data = json.loads(self.text)
+        data["poolSync"]["system"]["macAddr"] = self.mac
+        return 200, self.text, data
+
+
+@functools.cache
+def _fixture_api_class() -> type:
+    from custom_components.poolsync.api import PoolSyncApi
+
+    return type("FixtureApi", (_FixtureApi, PoolSyncApi), {})
+
+
+def _fixture_api(hass, base_url: str, text: str, mac: str):
+    api = _fixture_api_class()(hass, base_url=base_url, session=object())
+    api.text, api.mac = text, mac
+    return api
+
+
+@pytest.mark.parametrize("hubs", [1, 50, 200])
+def test_memory_per_hub(bench, run_async, payload_text, hubs):
+    async def scenario():
+        hass = FakeHass()
+        # Import everything and warm the caches before measuring
+        await async_setup_hub(
+            hass,
+            FakeConfigEntry("warmup", {"base_url": "http://warmup"}),
+            _fixture_api(hass, "http://warmup", payload_text, "00:00:00:00:00:00"),
+        )
+        hass = FakeHass()
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        entities = 0
+        for i in range(hubs):
+            url = f"http://10.0.{i // 250}.{i % 250 + 1}"
+            _, hub_entities = await async_setup_hub(
+                hass,
+                FakeConfigEntry(f"hub{i}", {"base_url": url}),
+                _fixture_api(hass, url, payload_text, f"AA:BB:CC:00:{i // 256:02X}:{i % 256:02X}"),
+            )
+            entities += len(hub_entities)
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        held = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        bench.record(
+            f"hubs_{hubs}",
+            entities=entities,
+            bytes_per_hub=held // hubs,
+            bytes_per_entity=held // entities,
+        )
+
+    run_async(scenario())
@@ -0,0 +1,66 @@
+"""Push-link pairing: time from start to token against the simulator."""
+import time
+
+import aiohttp
+
+from custom_components.poolsync.api import PoolSyncApi, async_pushlink_many
+from simulator import PoolSyncSimulator, SimulatorConfig
+
+
+def test_pushlink_time_to_token(bench, run_async):
+    press_after = 0.5
+
+    async def scenario(name: str, config: SimulatorConfig) -> None:
+        async with PoolSyncSimulator(config) as sim, aiohttp.ClientSession() as session:
+            api = PoolSyncApi(hass=None, base_url=sim.base_url, session=session)
+            started = time.perf_counter()
+            ok, _, token, _, err = await api.async_pushlink_exchange(None, timeout=30)
+            elapsed = time.perf_counter() - started
+            assert ok, err
+            bench.record(
+                name,
+                time_to_token_ms=elapsed * 1000.0,
+                after_press_ms=(elapsed - press_after) * 1000.0,
+                polls=sim.requests.get("GET pushLink", 0),
+                dropped=sim.dropped,
+            )
+
+    for latency in (0.0, 0.05, 0.2):
+        config = SimulatorConfig(press_after=press_after, latency=latency, jitter=latency)
+        run_async(scenario(f"latency_{int(latency * 1000)}ms", config))
+
+    # Seed 0 drops the first status poll: it costs one poll timeout, not the window
+    lossy = SimulatorConfig(press_after=press_after, drop_rate=0.3, seed=0)
+    run_async(scenario("lossy", lossy))
+
+
+def test_pushlink_bulk(bench, run_async):
+    """20 hubs paired together: should take about one pairing, not twenty."""
+    press_after = 0.5
+    hubs = 20
+
+    async def scenario() -> None:
+        sims = [
+            PoolSyncSimulator(SimulatorConfig(press_after=press_after, latency=0.05, jitter=0.05))
+            for _ in range(hubs)
+        ]
+        for sim in sims:
+            await sim.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                started = time.perf_counter()
+                results = await async_pushlink_many(
+                    None, [sim.base_url for sim in sims], session=session, timeout=30
+                )
+                elapsed = time.perf_counter() - started
+        finally:
+            for sim in sims:
+                await sim.stop()
+        assert all(r.ok for r in results)
+        bench.record(
+            f"bulk_{hubs}",
+            time_to_all_tokens_ms=elapsed * 1000.0,
+            polls=sum(sim.requests.get("GET pushLink", 0) for sim in sims),
+        )
+
+    run_async(scenario())
@@ -0,0 +1,58 @@
+"""``_request_json`` round trips against the simulator, small and large bodies."""
+import copy
+import json
+
+import aiohttp
+
+from custom_components.poolsync.api import PoolSyncApi
+from simulator import PoolSyncSimulator, SimulatorConfig
+
+
+def large_payload(payload: dict, devices: int = 16, stats: int = 256) -> dict:
+    big = copy.deepcopy(payload)
+    template = big["devices"]["0"]
+    for i in range(devices):
+        dev = copy.deepcopy(template)
+        dev["stats"] = list(range(stats))
+        big["devices"][str(i)] = dev
+        big["deviceType"][str(i)] = "chlorSync"
+    return big
+
+
+async def _bench_requests(bench, sim: PoolSyncSimulator, label: str) -> None:
+    async with sim, aiohttp.ClientSession() as session:
+        creds = sim.auth_headers()
+        api = PoolSyncApi(
+            hass=None,
+            base_url=sim.base_url,
+            token=creds["token"],
+            user_id=creds["user_id"],
+            session=session,
+        )
+
+        async def poll():
+            await api._request_json("GET", "/api/poolsync", params={"cmd": "poolSync", "all": ""})
+
+        async def status():
+            await api._request_json("GET", "/api/poolsync", params={"cmd": "pushLink", "status": ""})
+
+        await bench.arun(f"{label}.poolsync_all", poll, number=200)
+        await bench.arun(f"{label}.pushlink_status", status, number=200)
+        bench.record(
+            f"{label}.payload",
+            bytes=len(json.dumps(sim.state)),
+            parse_ms=api.metrics.mean_parse_ms,
+        )
+
+
+def test_request_small(bench, run_async):
+    sim = PoolSyncSimulator(SimulatorConfig(require_auth=True, max_connections=64))
+    run_async(_bench_requests(bench, sim, "small"))
+
+
+def test_request_large(bench, run_async, payload):
+    sim = PoolSyncSimulator(
+        SimulatorConfig(require_auth=True, max_connections=64),
+        payload=large_payload(payload),
+    )
+    run_async(_bench_requests(bench, sim, "large"))
@@ -0,0 +1,131 @@
+"""Integration setup time (first refresh + platforms) for 1/10/100 hubs."""
+import asyncio
+import importlib
+import sys
+import time
+
+import aiohttp
+import pytest
+
+from harness import FakeConfigEntry, FakeHass
+from simulator import PoolSyncSimulator, SimulatorConfig
+
+
+@pytest.mark.parametrize("hubs", [1, 10, 100])
+def test_setup_hubs(bench, run_async, setup_hub, hubs):
+    async def scenario():
+        config = SimulatorConfig(require_auth=False, latency=0.01, max_connections=1000)
+        async with PoolSyncSimulator(config) as sim, aiohttp.ClientSession() as session:
+            hass = FakeHass()
+            entries = [
+                FakeConfigEntry(f"hub{i}", {"base_url": sim.base_url}) for i in range(hubs)
+            ]
+            started, cpu = time.perf_counter(), time.process_time()
+            results = await asyncio.gather(
+                *(setup_hub(hass, entry, session) for entry in entries)
+            )
+            bench.record(
+                f"hubs_{hubs}",
+                wall_ms=(time.perf_counter() - started) * 1000.0,
+                cpu_ms=(time.process_time() - cpu) * 1000.0,
+                entities=sum(len(r) for r in results),
+            )
+
+    run_async(scenario())
+
+
+@pytest.mark.parametrize("cached", [False, True], ids=["blocking", "cached"])
+@pytest.mark.parametrize("hubs", [10, 50])
+def test_setup_with_offline_hubs(bench, run_async, setup_hub, hubs, cached):
+    """Every fifth hub never answers. Without a cached topology setup waits for
+    each hub's first poll; with one, entities register immediately and the
+    first poll (short timeout) runs in the background."""
+    from custom_components.poolsync.model import HubTopology
+    from homeassistant.helpers.storage import Store
+
+    request_timeout = 10.0
+
+    async def scenario():
+        online_cfg = SimulatorConfig(require_auth=False, latency=0.01, max_connections=1000)
+        offline_cfg = SimulatorConfig(require_auth=False, drop_rate=1.0, max_connections=1000)
+        async with PoolSyncSimulator(online_cfg) as online, PoolSyncSimulator(offline_cfg) as offline:
+            async with aiohttp.ClientSession() as session:
+                hass = FakeHass()
+                entries, stores = [], []
+                for i in range(hubs):
+                    sim = offline if i % 5 == 0 else online
+                    entries.append(FakeConfigEntry(f"hub{i}", {"base_url": sim.base_url}))
+                    store = Store(hass, 1, f"poolsync.hub{i}.topology")
+                    if cached:
+                        store.data = HubTopology(mac=f"AA:BB:CC:00:00:{i:02X}", heatpump_index=1).as_dict()
+                    stores.append(store)
+
+                started, cpu = time.perf_counter(), time.process_time()
+                results = await asyncio.gather(
+                    *(
+                        setup_hub(hass, entry, session, store=store, request_timeout=request_timeout)
+                        for entry, store in zip(entries, stores)
+                    )
+                )
+                setup_ms = (time.perf_counter() - started) * 1000.0
+                # Until the background first polls have finished (or timed out)
+                await asyncio.gather(*(t for e in entries for t in list(e.background_tasks)))
+                bench.record(
+                    f"hubs_{hubs}_{'cached' if cached else 'blocking'}",
+                    setup_ms=setup_ms,
+                    settled_ms=(time.perf_counter() - started) * 1000.0,
+                    cpu_ms=(time.process_time() - cpu) * 1000.0,
+                    entities=sum(len(r) for r in results),
+                )
+
+    run_async(scenario())
+
+
+def _import_ms(platforms) -> float:
+    """Import the platform modules fresh; shared modules stay imported, as
+    ``__init__`` has already loaded them when platforms are forwarded."""
+    for name in platforms:
+        sys.modules.pop(f"custom_components.poolsync.{name}", None)
+    started = time.perf_counter()
+    for name in platforms:
+        importlib.import_module(f"custom_components.poolsync.{name}")
+    return (time.perf_counter() - started) * 1000.0
+
+
+@pytest.mark.parametrize("heatpump", [False, True], ids=["chlor_only", "heatpump"])
+@pytest.mark.parametrize("forwarded", ["all", "topology"])
+def test_setup_per_hub_platforms(bench, run_async, setup_hub, heatpump, forwarded):
+    """Before (every platform) and after (only what the topology needs), per hub."""
+    from custom_components.poolsync.const import PLATFORMS
+    from custom_components.poolsync.model import HubTopology
+
+    hubs = 20
+
+    async def scenario():
+        config = SimulatorConfig(require_auth=False, heatpump=heatpump, max_connections=100)
+        async with PoolSyncSimulator(config) as sim, aiohttp.ClientSession() as session:
+            hass = FakeHass()
+            platforms = PLATFORMS if forwarded == "all" else None
+            # Warm up sockets and caches outside the measurement
+            await setup_hub(hass, FakeConfigEntry("warmup", {"base_url": sim.base_url}), session)
+
+            wall = cpu = 0.0
+            entities = 0
+            for i in range(hubs):
+                entry = FakeConfigEntry(f"hub{i}", {"base_url": sim.base_url})
+                started, cpu0 = time.perf_counter(), time.process_time()
+                entities += len(await setup_hub(hass, entry, session, platforms=platforms))
+                wall += time.perf_counter() - started
+                cpu += time.process_time() - cpu0
+            topology = hass.data["poolsync"]["hub0"]["coordinator"].topology
+            loaded = PLATFORMS if platforms else (topology or HubTopology()).platforms
+            bench.record(
+                f"{forwarded}_{'heatpump' if heatpump else 'chlor_only'}",
+                platforms=len(loaded),
+                import_ms=min(_import_ms(loaded) for _ in range(5)),
+                setup_ms_per_hub=wall * 1000.0 / hubs,
+                cpu_ms_per_hub=cpu * 1000.0 / hubs,
+                entities_per_hub=entities / hubs,
+            )
+
+    run_async(scenario())
@@ -0,0 +1,98 @@
+"""Snapshot model: memory footprint and per-tick CPU.
+
+Compares building the typed snapshot once per poll and reading every sensor
+from it against the previous approach of walking the raw dict with ``_g`` for
+each entity on every update.
+"""
+import gc
+import json
+import tracemalloc
+
+from custom_components.poolsync.binary_sensor import HEATPUMP_BINARY_SENSORS
+from custom_components.poolsync.model import PoolSyncSnapshot
+from custom_components.poolsync.sensor import HEATPUMP_SENSORS, SENSORS
+from custom_components.poolsync.util import _g
+
+# The dict paths each sensor used to walk on every state write
+LEGACY_PATHS = [
+    ("poolSync", "status", "boardTemp"),
+    ("poolSync", "status", "rssi"),
+    ("poolSync", "stats", "upTimeSecs"),
+    ("poolSync", "config", "name"),
+    ("poolSync", "system", "macAddr"),
+    ("poolSync", "system", "bssid"),
+    ("poolSync", "system", "fwVersion"),
+    ("poolSync", "system", "hwVersion"),
+    ("poolSync", "status", "online"),
+    ("poolSync", "status", "online"),
+    ("poolSync", "status", "flags"),
+    ("poolSync", "status", "dateTime"),
+    *(("poolSync", "stats", k) for k in (
+        "wifiDisconnects", "awsDisconnects", "minRssi", "maxRssi",
+        "minBoardTemp", "maxBoardTemp", "systemRestarts", "numDeviceMsgNoResp",
+    )),
+    *(("devices", "0", "status", k) for k in (
+        "waterTemp", "flowRate", "saltPPM", "boostRemaining", "cellRawSaltADC",
+        "cellRailVoltage", "fwdCurrent", "revCurrent", "outVoltage",
+    )),
+    *(("devices", "0", "config", k) for k in (
+        "chlorOutput", "poolCoverCtrl", "gallons", "polarityChangeTime", "userSaltCalib",
+    )),
+    *(("devices", "0", "system", k) for k in (
+        "drvFwVersion", "cellFwVersion", "cellHwVersion", "cellCalib",
+        "numBlades", "cellSerialNum",
+    )),
+    ("devices", "0", "nodeAttr", "name"),
+    ("devices", "0", "nodeAttr", "name"),
+    ("devices", "0", "faults"),
+    *(("devices", "0", "stats", i) for i in range(10)),
+    *(("devices", "1", "status", k) for k in ("waterTemp", "airTemp", "ctrlFlags", "stateFlags")),
+    *(("devices", "1", "config", k) for k in ("mode", "setpoint")),
+    ("devices", "1", "nodeAttr", "online"),
+    ("devices", "1", "faults"),
+]
+
+
+def _retained_bytes(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return after - before
+
+
+def _read_all(snap: PoolSyncSnapshot) -> None:
+    for desc in SENSORS:
+        desc.value_fn(snap)
+        if desc.attr_fn:
+            desc.attr_fn(snap)
+    for desc in HEATPUMP_SENSORS:
+        desc.value_fn(snap)
+    for desc in HEATPUMP_BINARY_SENSORS:
+        desc.value_fn(snap)
+
+
+def test_snapshot_memory(bench, payload_text, payload):
+    raw = _retained_bytes(lambda: json.loads(payload_text))
+    snap = _retained_bytes(lambda: PoolSyncSnapshot.from_dict(payload))
+    bench.record("memory", raw_dict_bytes=raw, snapshot_bytes=snap)
+    assert snap < raw
+
+
+def test_snapshot_tick_cpu(bench, payload):
+    def legacy_tick():
+        for path in LEGACY_PATHS:
+            _g(payload, *path)
+
+    def snapshot_tick():
+        _read_all(PoolSyncSnapshot.from_dict(payload))
+
+    snap = PoolSyncSnapshot.from_dict(payload)
+
+    bench.run("legacy_dict_walk", legacy_tick)
+    bench.run("snapshot_build", lambda: PoolSyncSnapshot.from_dict(payload))
+    bench.run("snapshot_read_all", lambda: _read_all(snap))
+    bench.run("snapshot_tick", snapshot_tick)
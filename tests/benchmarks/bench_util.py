@@ -0,0 +1,9 @@
+"""Path extraction with ``util._g``."""
+from custom_components.poolsync.util import _g
+
+
+def test_g_extraction(bench, payload):
+    bench.run("hub_field", lambda: _g(payload, "poolSync", "status", "rssi"), number=20000)
+    bench.run("device_field", lambda: _g(payload, "devices", "0", "status", "saltPPM"), number=20000)
+    bench.run("list_index", lambda: _g(payload, "devices", "0", "stats", 7), number=20000)
+    bench.run("missing", lambda: _g(payload, "devices", "9", "status", "saltPPM"), number=20000)
@@ -0,0 +1,64 @@
+"""Compare two benchmark result files written by the benchmark harness.
+
+    python tests/benchmarks/compare.py OLD.json NEW.json [--threshold 0.2]
+
+Prints every shared metric with its relative change and exits with status 1
+when a timing (``*_us``/``*_ms``) or size (``*bytes``) metric regressed by more
+than the threshold.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+
+LOWER_IS_BETTER = ("_us", "_ms", "bytes")
+
+
+def _index(path: str) -> tuple[dict, dict[tuple[str, str], dict]]:
+    doc = json.loads(Path(path).read_text())
+    return doc, {(r["group"], r["name"]): r for r in doc["results"]}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    old_doc, old = _index(args.old)
+    new_doc, new = _index(args.new)
+    print(
+        f"{old_doc.get('version')} ({old_doc.get('revision')}) -> "
+        f"{new_doc.get('version')} ({new_doc.get('revision')})"
+    )
+
+    regressions = 0
+    for key in sorted(old.keys() & new.keys()):
+        for metric, before in old[key].items():
+            after = new[key].get(metric)
+            if (
+                metric in ("group", "name", "number", "repeat")
+                or not isinstance(before, (int, float))
+                or not isinstance(after, (int, float))
+            ):
+                continue
+            change = (after - before) / before if before else 0.0
+            flag = ""
+            if metric.endswith(LOWER_IS_BETTER) and change > args.threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"{key[0]}.{key[1]}.{metric}: {before:.2f} -> {after:.2f} ({change:+.1%}){flag}")
+
+    for key in sorted(new.keys() - old.keys()):
+        print(f"{key[0]}.{key[1]}: new")
+    for key in sorted(old.keys() - new.keys()):
+        print(f"{key[0]}.{key[1]}: removed")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
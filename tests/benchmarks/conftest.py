@@ -0,0 +1,201 @@
+"""Benchmark harness.
+
+Benchmarks live in ``bench_*.py`` files and are only collected when this
+directory (or one of its files) is passed explicitly::
+
+    python -m pytest tests/benchmarks -s
+
+Every measurement is also written as JSON to ``$POOLSYNC_BENCH_OUT`` (default
+``.benchmarks/poolsync-<version>-<timestamp>.json``) so runs can be compared
+across versions with ``python tests/benchmarks/compare.py OLD.json NEW.json``.
+"""
+import asyncio
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+
+from harness import FakeConfigEntry, FakeHass, async_setup_hub
+
+BENCH_DIR = Path(__file__).resolve().parent
+FIXTURES_DIR = BENCH_DIR.parent / "fixtures"
+REPO_DIR = BENCH_DIR.parents[1]
+MANIFEST = REPO_DIR / "custom_components" / "poolsync" / "manifest.json"
+
+RESULTS: list[dict] = []
+
+
+def _requested(config) -> bool:
+    root = Path(config.invocation_params.dir)
+    for arg in config.invocation_params.args:
+        if arg.startswith("-"):
+            continue
+        path = (root / arg.split("::", 1)[0]).resolve()
+        if path == BENCH_DIR or BENCH_DIR in path.parents:
+            return True
+    return False
+
+
+def pytest_collect_file(file_path, parent):
+    if (
+        file_path.suffix == ".py"
+        and file_path.name.startswith("bench_")
+        and _requested(parent.config)
+        # Files named on the command line are collected by pytest itself
+        and not parent.session.isinitpath(file_path)
+    ):
+        return pytest.Module.from_parent(parent, path=file_path)
+    return None
+
+
+@pytest.fixture
+def payload_text() -> str:
+    return (FIXTURES_DIR / "poolsync_all.json").read_text()
+
+
+@pytest.fixture
+def payload(payload_text) -> dict:
+    return json.loads(payload_text)
+
+
+class Bench:
+    """Time a callable and print a one-line summary per measurement."""
+
+    def __init__(self, group: str) -> None:
+        self.group = group
+        self.results: list[dict] = []
+
+    def run(self, name: str, fn, *, number: int = 1000, repeat: int = 5) -> dict:
+        wall: list[float] = []
+        cpu: list[float] = []
+        for _ in range(repeat):
+            w0, c0 = time.perf_counter(), time.process_time()
+            for _ in range(number):
+                fn()
+            wall.append((time.perf_counter() - w0) / number)
+            cpu.append((time.process_time() - c0) / number)
+        return self.record(
+            name,
+            number=number,
+            repeat=repeat,
+            best_us=min(wall) * 1e6,
+            median_us=statistics.median(wall) * 1e6,
+            cpu_us=statistics.median(cpu) * 1e6,
+        )
+
+    async def arun(self, name: str, fn, *, number: int = 100, repeat: int = 3) -> dict:
+        """Like run() for a coroutine function, awaited on the running loop."""
+        wall: list[float] = []
+        cpu: list[float] = []
+        for _ in range(repeat):
+            w0, c0 = time.perf_counter(), time.process_time()
+            for _ in range(number):
+                await fn()
+            wall.append((time.perf_counter() - w0) / number)
+            cpu.append((time.process_time() - c0) / number)
+        return self.record(
+            name,
+            number=number,
+            repeat=repeat,
+            best_us=min(wall) * 1e6,
+            median_us=statistics.median(wall) * 1e6,
+            cpu_us=statistics.median(cpu) * 1e6,
+        )
+
+    def record(self, name: str, **values) -> dict:
+        result = {"group": self.group, "name": name, **values}
+        self.results.append(result)
+        RESULTS.append(result)
+        print(
+            f"\n[bench] {self.group}.{name}: "
+            + ", ".join(
+                f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}"
+                for k, v in values.items()
+            )
+        )
+        return result
+
+
+@pytest.fixture
+def bench(request) -> Bench:
+    return Bench(Path(str(request.node.fspath)).stem.removeprefix("bench_"))
+
+
+
+@pytest.fixture
+def run_async():
+    """Run a coroutine on a fresh event loop (no pytest-asyncio dependency)."""
+    return asyncio.run
+
+
+@pytest.fixture
+def setup_hub():
+    """Mirror ``async_setup_entry`` for one hub and return its entities."""
+    from custom_components.poolsync.api import PoolSyncApi
+
+    async def _setup(
+        hass: FakeHass,
+        entry: FakeConfigEntry,
+        session,
+        *,
+        store=None,
+        request_timeout=None,
+        platforms=None,
+    ) -> list:
+        api = PoolSyncApi(
+            hass=hass,
+            base_url=entry.data["base_url"],
+            token=entry.data.get("token"),
+            user_id=entry.data.get("user_id"),
+            session=session,
+            request_timeout=request_timeout,
+        )
+        _, entities = await async_setup_hub(hass, entry, api, store=store, platforms=platforms)
+        return entities
+
+    return _setup
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not RESULTS:
+        return
+    version = json.loads(MANIFEST.read_text()).get("version", "unknown")
+    stamp = datetime.now(timezone.utc)
+    out = os.environ.get("POOLSYNC_BENCH_OUT") or str(
+        REPO_DIR / ".benchmarks" / f"poolsync-{version}-{stamp:%Y%m%dT%H%M%S}.json"
+    )
+    Path(out).parent.mkdir(parents=True, exist_ok=True)
+    Path(out).write_text(
+        json.dumps(
+            {
+                "version": version,
+                "revision": _git_revision(),
+                "created": stamp.isoformat(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": RESULTS,
+            },
+            indent=2,
+        )
+        + "\n"
+    )
+    print(f"\n[bench] wrote {len(RESULTS)} results to {out}")
@@ -1,7 +1,9 @@
+import enum
 import os
 import sys
 import types
 from dataclasses import dataclass
+from datetime import datetime, timezone
 
 # Ensure repository root on path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -15,16 +17,6 @@ poolsync_pkg = types.ModuleType("custom_components.poolsync")
 poolsync_pkg.__path__ = [os.path.join(custom_components_pkg.__path__[0], "poolsync")]
 sys.modules["custom_components.poolsync"] = poolsync_pkg
 
-const_stub = types.ModuleType("custom_components.poolsync.const")
-const_stub.DOMAIN = "poolsync"
-sys.modules["custom_components.poolsync.const"] = const_stub
-
-coordinator_stub = types.ModuleType("custom_components.poolsync.coordinator")
-class PoolSyncCoordinator:
-    pass
-coordinator_stub.PoolSyncCoordinator = PoolSyncCoordinator
-sys.modules["custom_components.poolsync.coordinator"] = coordinator_stub
-
 # Stub homeassistant modules used by sensor
 ha = types.ModuleType("homeassistant")
 sys.modules.setdefault("homeassistant", ha)
@@ -38,15 +30,36 @@ sys.modules["homeassistant.components.sensor"] = sensor_mod
 sensor_const_mod = types.ModuleType("homeassistant.components.sensor.const")
 sys.modules["homeassistant.components.sensor.const"] = sensor_const_mod
 
+binary_sensor_mod = types.ModuleType("homeassistant.components.binary_sensor")
+sys.modules["homeassistant.components.binary_sensor"] = binary_sensor_mod
+
 button_mod = types.ModuleType("homeassistant.components.button")
 sys.modules["homeassistant.components.button"] = button_mod
 
+switch_mod = types.ModuleType("homeassistant.components.switch")
+sys.modules["homeassistant.components.switch"] = switch_mod
+
+number_mod = types.ModuleType("homeassistant.components.number")
+sys.modules["homeassistant.components.number"] = number_mod
+
+climate_mod = types.ModuleType("homeassistant.components.climate")
+sys.modules["homeassistant.components.climate"] = climate_mod
+
 helpers_mod = types.ModuleType("homeassistant.helpers")
 sys.modules["homeassistant.helpers"] = helpers_mod
 
 update_coordinator_mod = types.ModuleType("homeassistant.helpers.update_coordinator")
 sys.modules["homeassistant.helpers.update_coordinator"] = update_coordinator_mod
 
+aiohttp_client_mod = types.ModuleType("homeassistant.helpers.aiohttp_client")
+sys.modules["homeassistant.helpers.aiohttp_client"] = aiohttp_client_mod
+
+storage_mod = types.ModuleType("homeassistant.helpers.storage")
+sys.modules["homeassistant.helpers.storage"] = storage_mod
+
+restore_state_mod = types.ModuleType("homeassistant.helpers.restore_state")
+sys.modules["homeassistant.helpers.restore_state"] = restore_state_mod
+
 entity_platform_mod = types.ModuleType("homeassistant.helpers.entity_platform")
 sys.modules["homeassistant.helpers.entity_platform"] = entity_platform_mod
 
@@ -63,6 +76,36 @@ sys.modules["homeassistant.helpers.typing"] = typing_mod
 ha_const_mod = types.ModuleType("homeassistant.const")
 sys.modules["homeassistant.const"] = ha_const_mod
 
+exceptions_mod = types.ModuleType("homeassistant.exceptions")
+sys.modules["homeassistant.exceptions"] = exceptions_mod
+
+
+class HomeAssistantError(Exception):
+    pass
+
+
+exceptions_mod.HomeAssistantError = HomeAssistantError
+
+device_registry_mod = types.ModuleType("homeassistant.helpers.device_registry")
+sys.modules["homeassistant.helpers.device_registry"] = device_registry_mod
+helpers_mod.device_registry = device_registry_mod
+
+event_mod = types.ModuleType("homeassistant.helpers.event")
+sys.modules["homeassistant.helpers.event"] = event_mod
+
+recorder_mod = types.ModuleType("homeassistant.components.recorder")
+sys.modules["homeassistant.components.recorder"] = recorder_mod
+recorder_models_mod = types.ModuleType("homeassistant.components.recorder.models")
+sys.modules["homeassistant.components.recorder.models"] = recorder_models_mod
+recorder_statistics_mod = types.ModuleType("homeassistant.components.recorder.statistics")
+sys.modules["homeassistant.components.recorder.statistics"] = recorder_statistics_mod
+
+util_mod = types.ModuleType("homeassistant.util")
+sys.modules["homeassistant.util"] = util_mod
+dt_util_mod = types.ModuleType("homeassistant.util.dt")
+sys.modules["homeassistant.util.dt"] = dt_util_mod
+util_mod.dt = dt_util_mod
+
 class Dummy:
     pass
 
@@ -75,38 +118,234 @@ class SensorEntityDescription:
     name: str | None = None
     device_class: str | None = None
     native_unit_of_measurement: str | None = None
+    state_class: str | None = None
+    entity_category: str | None = None
+    entity_registry_enabled_default: bool = True
+
+# unique_id -> State, stands in for Home Assistant's restore cache
+RESTORE_CACHE: dict = {}
+
+class State:
+    def __init__(self, entity_id, state, attributes=None):
+        self.entity_id = entity_id
+        self.state = state
+        self.attributes = attributes or {}
+
+class RestoreEntity:
+    async def async_added_to_hass(self):
+        pass
+
+    async def async_get_last_state(self):
+        return RESTORE_CACHE.get(getattr(self, "_attr_unique_id", None))
+
+def _last_native_value(state):
+    try:
+        return float(state.state)
+    except ValueError:
+        return state.state
+
+class RestoreSensor(SensorEntity, RestoreEntity):
+    async def async_get_last_sensor_data(self):
+        state = await self.async_get_last_state()
+        if state is None:
+            return None
+        return types.SimpleNamespace(native_value=_last_native_value(state))
+
+class Store:
+    """In-memory stand-in for homeassistant.helpers.storage.Store."""
 
+    def __init__(self, hass, version, key, **kwargs):
+        self.key = key
+        self.data = None
+
+    async def async_load(self):
+        return self.data
+
+    async def async_save(self, data):
+        self.data = data
+
+    def async_delay_save(self, data_func, delay=0):
+        self.data = data_func()
+
+    async def async_remove(self):
+        self.data = None
+
+storage_mod.Store = Store
+restore_state_mod.RestoreEntity = RestoreEntity
+restore_state_mod.RESTORE_CACHE = RESTORE_CACHE
 sensor_mod.SensorEntity = SensorEntity
+sensor_mod.RestoreSensor = RestoreSensor
 sensor_mod.SensorEntityDescription = SensorEntityDescription
 
+class BinarySensorEntity:
+    pass
+
+@dataclass(frozen=True)
+class BinarySensorEntityDescription:
+    key: str = ""
+    name: str | None = None
+    device_class: str | None = None
+
+class BinarySensorDeviceClass:
+    CONNECTIVITY = "connectivity"
+    PROBLEM = "problem"
+
+binary_sensor_mod.BinarySensorEntity = BinarySensorEntity
+binary_sensor_mod.BinarySensorEntityDescription = BinarySensorEntityDescription
+binary_sensor_mod.BinarySensorDeviceClass = BinarySensorDeviceClass
+
 class ButtonEntity:
     pass
 
 button_mod.ButtonEntity = ButtonEntity
 
+class SwitchEntity:
+    pass
+
+switch_mod.SwitchEntity = SwitchEntity
+
+class NumberEntity:
+    pass
+
+class NumberMode:
+    AUTO = "auto"
+    BOX = "box"
+    SLIDER = "slider"
+
+class RestoreNumber(NumberEntity, RestoreEntity):
+    async def async_get_last_number_data(self):
+        state = await self.async_get_last_state()
+        if state is None:
+            return None
+        return types.SimpleNamespace(native_value=_last_native_value(state))
+
+number_mod.NumberEntity = NumberEntity
+number_mod.RestoreNumber = RestoreNumber
+number_mod.NumberMode = NumberMode
+
+class ClimateEntity:
+    pass
+
+class HVACMode(str, enum.Enum):
+    OFF = "off"
+    HEAT = "heat"
+    COOL = "cool"
+
+class ClimateEntityFeature:
+    TARGET_TEMPERATURE = 1
+
+climate_mod.ClimateEntity = ClimateEntity
+climate_mod.HVACMode = HVACMode
+climate_mod.ClimateEntityFeature = ClimateEntityFeature
+climate_mod.ATTR_CURRENT_TEMPERATURE = "current_temperature"
+
 class SensorDeviceClass:
     TEMPERATURE = "temperature"
     SIGNAL_STRENGTH = "signal_strength"
     DURATION = "duration"
     VOLTAGE = "voltage"
     CURRENT = "current"
+    DATA_SIZE = "data_size"
+    POWER = "power"
+
+class SensorStateClass:
+    MEASUREMENT = "measurement"
+    TOTAL_INCREASING = "total_increasing"
 
 sensor_const_mod.SensorDeviceClass = SensorDeviceClass
+sensor_const_mod.SensorStateClass = SensorStateClass
 class CoordinatorEntity:
     def __init__(self, coordinator=None):
         self.coordinator = coordinator
+        self.writes = 0
+
+    def async_on_remove(self, func):
+        pass
+
+    def async_write_ha_state(self):
+        self.writes += 1
+
+    @property
+    def available(self):
+        return self.coordinator.last_update_success
+
+    async def async_added_to_hass(self):
+        parent = getattr(super(), "async_added_to_hass", None)
+        if parent is not None:
+            await parent()
 
     @classmethod
     def __class_getitem__(cls, item):
         return cls
 
+class UpdateFailed(Exception):
+    pass
+
+class DataUpdateCoordinator:
+    """Just enough of HA's coordinator to drive refreshes and listeners."""
+
+    def __init__(self, hass, logger, *, name, update_interval=None, always_update=True, **kwargs):
+        self.hass = hass
+        self.logger = logger
+        self.name = name
+        self.update_interval = update_interval
+        self.always_update = always_update
+        self.data = None
+        self.last_update_success = True
+        self._listeners = {}
+
+    @classmethod
+    def __class_getitem__(cls, item):
+        return cls
+
+    def async_add_listener(self, update_callback, context=None):
+        key = object()
+        self._listeners[key] = update_callback
+        return lambda: self._listeners.pop(key, None)
+
+    def async_update_listeners(self):
+        for update_callback in list(self._listeners.values()):
+            update_callback()
+
+    async def async_refresh(self):
+        previous_data, previous_success = self.data, self.last_update_success
+        try:
+            self.data = await self._async_update_data()
+            self.last_update_success = True
+        except UpdateFailed:
+            self.last_update_success = False
+        if not self.last_update_success and not previous_success:
+            return
+        if (
+            not self.always_update
+            and previous_success == self.last_update_success
+            and previous_data == self.data
+        ):
+            return
+        self.async_update_listeners()
+
+    def async_set_updated_data(self, data):
+        self.data = data
+        self.last_update_success = True
+        self.async_update_listeners()
+
+    async def async_request_refresh(self):
+        await self.async_refresh()
+
 update_coordinator_mod.CoordinatorEntity = CoordinatorEntity
+update_coordinator_mod.DataUpdateCoordinator = DataUpdateCoordinator
+update_coordinator_mod.UpdateFailed = UpdateFailed
 entity_platform_mod.AddEntitiesCallback = Dummy
+# Tests pass their own aiohttp session to PoolSyncApi
+aiohttp_client_mod.async_get_clientsession = lambda hass: None
 core_mod.HomeAssistant = Dummy
+core_mod.callback = lambda func: func
+core_mod.State = State
 config_entries_mod.ConfigEntry = Dummy
 
 class UnitOfTemperature:
     CELSIUS = "°C"
+    FAHRENHEIT = "°F"
 
 class UnitOfElectricPotential:
     VOLT = "V"
@@ -115,12 +354,80 @@ class UnitOfElectricCurrent:
     AMPERE = "A"
 
 class UnitOfTime:
+    MILLISECONDS = "ms"
     SECONDS = "s"
     MINUTES = "min"
 
+class UnitOfPower:
+    WATT = "W"
+
+class UnitOfInformation:
+    BYTES = "B"
+
+class EntityCategory:
+    CONFIG = "config"
+    DIAGNOSTIC = "diagnostic"
+
 ha_const_mod.UnitOfTemperature = UnitOfTemperature
 ha_const_mod.UnitOfElectricPotential = UnitOfElectricPotential
 ha_const_mod.UnitOfElectricCurrent = UnitOfElectricCurrent
 ha_const_mod.UnitOfTime = UnitOfTime
+ha_const_mod.UnitOfInformation = UnitOfInformation
+ha_const_mod.UnitOfPower = UnitOfPower
+ha_const_mod.EntityCategory = EntityCategory
 ha_const_mod.SIGNAL_STRENGTH_DECIBELS_MILLIWATT = "dBm"
 ha_const_mod.PERCENTAGE = "%"
+ha_const_mod.STATE_ON = "on"
+ha_const_mod.STATE_OFF = "off"
+ha_const_mod.ATTR_TEMPERATURE = "temperature"
+
+# (point in time, action) of pending async_track_point_in_time timers
+TIMERS: list = []
+
+def async_track_point_in_time(hass, action, point_in_time):
+    timer = (point_in_time, action)
+    TIMERS.append(timer)
+    return lambda: TIMERS.remove(timer) if timer in TIMERS else None
+
+event_mod.async_track_point_in_time = async_track_point_in_time
+dt_util_mod.now = lambda: datetime.now().astimezone()
+event_mod.TIMERS = TIMERS
+
+# identifiers -> device id, stands in for Home Assistant's device registry
+DEVICES: dict = {}
+
+class DeviceRegistry:
+    def async_get_device(self, identifiers=None, connections=None):
+        for identifier in identifiers or ():
+            if identifier in DEVICES:
+                return types.SimpleNamespace(id=DEVICES[identifier])
+        return None
+
+device_registry_mod.async_get = lambda hass: DeviceRegistry()
+device_registry_mod.DEVICES = DEVICES
+
+# Rows handed to async_add_external_statistics, as (metadata, rows)
+IMPORTED_STATISTICS: list = []
+# statistic_id -> rows get_last_statistics returns, newest first
+LAST_STATISTICS: dict = {}
+
+class RecorderInstance:
+    async def async_add_executor_job(self, target, *args):
+        return target(*args)
+
+def get_last_statistics(hass, number_of_stats, statistic_id, convert_units, types):
+    if statistic_id not in LAST_STATISTICS:
+        return {}
+    return {statistic_id: LAST_STATISTICS[statistic_id][:number_of_stats]}
+
+recorder_mod.get_instance = lambda hass: RecorderInstance()
+recorder_models_mod.StatisticData = dict
+recorder_models_mod.StatisticMetaData = dict
+recorder_statistics_mod.async_add_external_statistics = (
+    lambda hass, metadata, rows: IMPORTED_STATISTICS.append((metadata, rows))
+)
+recorder_statistics_mod.get_last_statistics = get_last_statistics
+recorder_statistics_mod.IMPORTED_STATISTICS = IMPORTED_STATISTICS
+recorder_statistics_mod.LAST_STATISTICS = LAST_STATISTICS
+dt_util_mod.utcnow = lambda: datetime.now().astimezone().astimezone(timezone.utc)
+util_mod.slugify = lambda text: "".join(c if c.isalnum() else "_" for c in str(text).lower()).strip("_")
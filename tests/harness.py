@@ -0,0 +1,95 @@
+"""Just enough of Home Assistant to set up the integration outside of it.
+
+Shared by the benchmarks and the replay driver; expects the module stubs from
+``tests/conftest.py`` to be loaded.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import importlib
+from types import SimpleNamespace
+from typing import Any, Optional
+
+# What an entity contributes to its state object when it is written
+RENDERED_ATTRS = (
+    "available",
+    "native_value",
+    "is_on",
+    "current_temperature",
+    "target_temperature",
+    "hvac_mode",
+    "extra_state_attributes",
+)
+
+
+class FakeConfigEntry:
+    def __init__(self, entry_id: str, data: dict) -> None:
+        self.entry_id = entry_id
+        self.title = f"PoolSync ({entry_id})"
+        self.data = data
+        self.options: dict = {}
+        self.background_tasks: set[asyncio.Task] = set()
+
+    def async_create_background_task(self, hass: Any, target: Any, name: str) -> asyncio.Task:
+        task = asyncio.ensure_future(target)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+        return task
+
+
+class FakeHass:
+    """The attributes of ``hass`` the platforms touch during setup."""
+
+    def __init__(self) -> None:
+        self.data: dict = {}
+        self.config = SimpleNamespace(
+            units=SimpleNamespace(temperature_unit="°C"),
+            components=set(),
+        )
+
+
+def render(entity: Any) -> tuple:
+    """Evaluate an entity's state the way a state write would."""
+    return tuple(getattr(entity, attr, None) for attr in RENDERED_ATTRS)
+
+
+async def async_setup_hub(
+    hass: FakeHass,
+    entry: FakeConfigEntry,
+    api: Any,
+    *,
+    store: Any = None,
+    platforms: Optional[list[str]] = None,
+) -> tuple[Any, list]:
+    """Mirror ``async_setup_entry``: coordinator, first refresh, platforms.
+
+    With a ``store`` holding a cached topology the first refresh runs in the
+    background (``entry.background_tasks``), as it does in Home Assistant.
+    ``platforms`` defaults to the ones the hub's topology needs.
+    """
+    from custom_components.poolsync.const import DOMAIN
+    from custom_components.poolsync.coordinator import PoolSyncCoordinator
+    from custom_components.poolsync.model import HubTopology
+
+    coordinator = PoolSyncCoordinator(hass, api, timedelta(seconds=300), store=store)
+    if await coordinator.async_load_topology():
+        coordinator.async_refresh_in_background(entry)
+    else:
+        await coordinator.async_refresh()
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+        "api": api,
+        "coordinator": coordinator,
+    }
+
+    entities: list = []
+
+    def _add(new, update_before_add=False):
+        entities.extend(new)
+
+    if platforms is None:
+        platforms = (coordinator.topology or HubTopology()).platforms
+    for name in platforms:
+        platform = importlib.import_module(f"custom_components.poolsync.{name}")
+        await platform.async_setup_entry(hass, entry, _add)
+    return coordinator, entities
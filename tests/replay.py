@@ -0,0 +1,137 @@
+"""Feed a recorded trace through the coordinator and every platform.
+
+Traces are written by the ``record_trace`` option to
+``<config>/poolsync_traces/<hub>.jsonl.gz``. Replay them at accelerated speed
+(``--speed 0`` means as fast as possible) to compare polling, filtering and
+caching changes against real pools::
+
+    python tests/replay.py poolsync_traces/aa_bb_cc_00_11_22.jsonl.gz --speed 0
+
+The report counts state writes (every entity on every tick, as
+``CoordinatorEntity`` does) and state changes (writes whose rendered state or
+attributes differ from the previous one, i.e. what the recorder would store),
+plus CPU time and peak memory.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import asdict, dataclass
+import json
+import time
+import tracemalloc
+from typing import Any, Iterable, Iterator, Optional
+
+from harness import FakeConfigEntry, FakeHass, async_setup_hub, render
+
+
+@dataclass
+class ReplayReport:
+    ticks: int
+    entities: int
+    state_writes: int
+    state_changes: int
+    cpu_ms: float
+    cpu_per_tick_us: float
+    wall_ms: float
+    trace_seconds: float
+    peak_memory_kib: float
+
+
+def _replay_api(hass: FakeHass, records: Iterator[tuple[float, dict[str, Any]]]) -> Any:
+    from custom_components.poolsync.api import PoolSyncApi
+
+    class ReplayApi(PoolSyncApi):
+        """Answers every request with the next recorded response."""
+
+        async def _request_json(self, method, path, params=None, headers=None,
+                                json_body=None, timeout_total=None):
+            try:
+                _, data = next(records)
+            except StopIteration:
+                return 0, "end of trace", None
+            return 200, "", data
+
+    return ReplayApi(hass, base_url="replay://trace")
+
+
+async def async_replay(
+    records: Iterable[tuple[float, dict[str, Any]]], speed: float = 0.0
+) -> ReplayReport:
+    """Replay ``records`` (as yielded by ``trace.iter_trace``)."""
+    # Timestamps drive pacing; the API consumes the payloads in the same order
+    records = list(records)
+    payloads = iter(records)
+    hass = FakeHass()
+    entry = FakeConfigEntry("replay", {"base_url": "replay://trace"})
+
+    tracemalloc.start()
+    cpu, wall = time.process_time(), time.perf_counter()
+
+    coordinator, entities = await async_setup_hub(
+        hass, entry, _replay_api(hass, payloads)
+    )
+    last = [render(entity) for entity in entities]
+    writes = len(entities)
+    changes = len(entities)
+
+    def _on_update() -> None:
+        nonlocal writes, changes
+        for i, entity in enumerate(entities):
+            state = render(entity)
+            writes += 1
+            if state != last[i]:
+                changes += 1
+                last[i] = state
+
+    coordinator.async_add_listener(_on_update)
+
+    for previous, (at, _) in zip(records, records[1:]):
+        if speed > 0:
+            await asyncio.sleep(max(0.0, at - previous[0]) / speed)
+        await coordinator.async_refresh()
+
+    cpu_ms = (time.process_time() - cpu) * 1000.0
+    wall_ms = (time.perf_counter() - wall) * 1000.0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ticks = len(records)
+    return ReplayReport(
+        ticks=ticks,
+        entities=len(entities),
+        state_writes=writes,
+        state_changes=changes,
+        cpu_ms=round(cpu_ms, 1),
+        cpu_per_tick_us=round(cpu_ms * 1000.0 / ticks, 1) if ticks else 0.0,
+        wall_ms=round(wall_ms, 1),
+        trace_seconds=round(records[-1][0] - records[0][0], 1) if records else 0.0,
+        peak_memory_kib=round(peak / 1024.0, 1),
+    )
+
+
+def _main(argv: Optional[list[str]] = None) -> None:
+    import conftest  # noqa: F401  (Home Assistant stubs)
+    from custom_components.poolsync.trace import iter_trace
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("trace", nargs="+", help="recording(s), oldest first")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="playback speed factor; 0 = as fast as possible")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    def _records() -> Iterator[tuple[float, dict[str, Any]]]:
+        for path in args.trace:
+            yield from iter_trace(path)
+
+    report = asyncio.run(async_replay(_records(), speed=args.speed))
+    if args.json:
+        print(json.dumps(asdict(report), indent=2))
+        return
+    for key, value in asdict(report).items():
+        print(f"{key:<18}{value}")
+
+
+if __name__ == "__main__":
+    _main()
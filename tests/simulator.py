@@ -0,0 +1,332 @@
+"""Local emulation of a PoolSync hub's ``/api/poolsync`` endpoint.
+
+Used by tests and benchmarks, and runnable on its own to point a real Home
+Assistant at a fake hub::
+
+    python tests/simulator.py --port 8080 --latency 0.2 --jitter 0.1 --drop-rate 0.05
+
+Supported requests (same query strings as the firmware):
+
+* ``GET  ?cmd=poolSync&all``          full snapshot
+* ``GET  ?cmd=devices&device=<n>``    a single device
+* ``PATCH ?cmd=devices&device=<n>``   merge ``config`` fields (``boostMode`` only starts/stops
+                                      boost, it isn't reported back)
+* ``PUT  ?cmd=pushLink&start``        open the push-link window
+* ``GET  ?cmd=pushLink&status``       ``timeRemaining``, then ``macAddress``/``password``
+  once the LINK button has been pressed
+
+Fault injection: fixed latency plus jitter, dropped requests (never answered, or
+connection reset), a body trickled out over ``slow_body`` seconds, and a cap on
+concurrent in-flight requests beyond which connections are reset like the
+firmware's small socket pool.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+from dataclasses import dataclass
+import json
+from pathlib import Path
+import random
+import time
+from typing import Any, Optional
+import uuid
+
+from aiohttp import web
+
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "poolsync_all.json"
+
+
+@dataclass
+class SimulatorConfig:
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Fraction of requests that are dropped
+    drop_rate: float = 0.0
+    # "hang" never answers (client times out), "reset" closes the connection
+    drop_mode: str = "hang"
+    # Seconds over which the body is trickled out in chunks
+    slow_body: float = 0.0
+    max_connections: int = 4
+    # Device refreshes its readings from the ChlorSync/heat pump this often
+    refresh_period: float = 30.0
+    pushlink_window: int = 60
+    # Press the LINK button automatically this many seconds after start
+    press_after: Optional[float] = None
+    require_auth: bool = True
+    heatpump: bool = True
+    # Firmware that rejects GET cmd=devices (404), so writes can't be read back
+    device_reads: bool = True
+    seed: Optional[int] = None
+
+
+class PoolSyncSimulator:
+    """aiohttp server with a PoolSync-shaped, mutable state."""
+
+    def __init__(
+        self,
+        config: Optional[SimulatorConfig] = None,
+        payload: Optional[dict[str, Any]] = None,
+    ) -> None:
+        self.config = config or SimulatorConfig()
+        self.state: dict[str, Any] = copy.deepcopy(
+            payload if payload is not None else json.loads(FIXTURE.read_text())
+        )
+        if not self.config.heatpump:
+            self.state.get("deviceType", {}).pop("1", None)
+            self.state.get("devices", {}).pop("1", None)
+
+        self.mac: str = self.state["poolSync"]["system"]["macAddr"]
+        self.password = uuid.uuid4().hex
+        self.users: set[str] = set()
+
+        self.requests: dict[str, int] = {}
+        self.rejected = 0
+        self.dropped = 0
+        self.active = 0
+        self.max_active = 0
+
+        self._rand = random.Random(self.config.seed)
+        self._booted = time.monotonic()
+        self._last_refresh = -1
+        self._link_opened: Optional[float] = None
+        self._link_pressed = False
+        self._closing = asyncio.Event()
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    # -----------------------
+    # Lifecycle
+    # -----------------------
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_route("*", "/api/poolsync", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        sock = site._server.sockets[0]  # type: ignore[union-attr]
+        self.base_url = f"http://{host}:{sock.getsockname()[1]}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        self._closing.set()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> PoolSyncSimulator:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.stop()
+
+    # -----------------------
+    # Device behaviour
+    # -----------------------
+    def press_link_button(self) -> None:
+        self._link_pressed = True
+
+    def auth_headers(self) -> dict[str, str]:
+        """Credentials of a user that already completed push-link."""
+        user = str(uuid.uuid4())
+        self.users.add(user)
+        return {"token": self.password, "user_id": user}
+
+    def _refresh(self) -> None:
+        """Advance readings once per refresh period, like the real hub."""
+        now = time.monotonic()
+        period = self.config.refresh_period
+        tick = int((now - self._booted) / period) if period > 0 else 0
+        hub = self.state["poolSync"]
+        hub["stats"]["upTimeSecs"] = int(now - self._booted)
+        if tick == self._last_refresh:
+            return
+        self._last_refresh = tick
+
+        refreshed_at = time.time() - ((now - self._booted) - tick * period)
+        hub["status"]["dateTime"] = int(refreshed_at)
+        hub["status"]["rssi"] = -55 - self._rand.randint(0, 10)
+
+        chlor = self.state["devices"]["0"]
+        chlor["status"]["waterTemp"] = 27 + self._rand.choice((-1, 0, 0, 1))
+        chlor["status"]["saltPPM"] = 3200 + self._rand.randint(-50, 50)
+        chlor["status"]["fwdCurrent"] = 5000 + self._rand.randint(-300, 300)
+        remaining = chlor["status"].get("boostRemaining") or 0
+        if remaining > 0:
+            chlor["status"]["boostRemaining"] = max(0, remaining - 1)
+
+    def _pushlink_status(self, user: Optional[str]) -> dict[str, Any]:
+        if self._link_opened is None:
+            return {"timeRemaining": 0}
+        elapsed = time.monotonic() - self._link_opened
+        remaining = max(0, int(self.config.pushlink_window - elapsed))
+        if (
+            self.config.press_after is not None
+            and elapsed >= self.config.press_after
+        ):
+            self._link_pressed = True
+        if self._link_pressed and remaining > 0 and user:
+            self.users.add(user)
+            return {"macAddress": self.mac, "password": self.password}
+        return {"timeRemaining": remaining}
+
+    def _patch_device(self, index: str, body: dict[str, Any]) -> Optional[dict]:
+        device = self.state["devices"].get(index)
+        if device is None:
+            return None
+        config = device.setdefault("config", {})
+        for key, value in body.items():
+            if key == "boostMode":
+                device["status"]["boostRemaining"] = 1440 if value else 0
+                continue
+            config[key] = value
+        return device
+
+    # -----------------------
+    # HTTP
+    # -----------------------
+    def _authorized(self, request: web.Request) -> bool:
+        if not self.config.require_auth:
+            return True
+        return (
+            request.headers.get("Authorization") == self.password
+            and request.headers.get("user") in self.users
+        )
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if self.active > self.config.max_connections:
+                self.rejected += 1
+                return self._reset(request)
+
+            cmd = request.query.get("cmd", "")
+            key = f"{request.method} {cmd}"
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+            delay = self.config.latency + self._rand.uniform(0, self.config.jitter)
+            if delay:
+                await asyncio.sleep(delay)
+
+            if self.config.drop_rate and self._rand.random() < self.config.drop_rate:
+                self.dropped += 1
+                if self.config.drop_mode == "reset":
+                    return self._reset(request)
+                await self._closing.wait()
+                return self._reset(request)
+
+            status, body = await self._dispatch(request, cmd)
+            return await self._respond(request, status, body)
+        finally:
+            self.active -= 1
+
+    async def _dispatch(self, request: web.Request, cmd: str) -> tuple[int, Any]:
+        method = request.method
+        user = request.headers.get("user")
+
+        if cmd == "pushLink":
+            if method == "PUT" and "start" in request.query:
+                self._link_opened = time.monotonic()
+                self._link_pressed = False
+                return 200, {"timeRemaining": self.config.pushlink_window}
+            if method == "GET" and "status" in request.query:
+                return 200, self._pushlink_status(user)
+            return 400, {"error": "bad pushLink request"}
+
+        if not self._authorized(request):
+            return 401, {"error": "unauthorized"}
+
+        if cmd == "poolSync" and method == "GET":
+            self._refresh()
+            return 200, self.state
+
+        if cmd == "devices":
+            index = request.query.get("device", "0")
+            if method == "GET":
+                if not self.config.device_reads:
+                    return 404, {"error": "unknown cmd 'devices'"}
+                self._refresh()
+                device = self.state["devices"].get(index)
+                return (200, device) if device is not None else (404, {"error": "no device"})
+            if method == "PATCH":
+                try:
+                    body = await request.json()
+                except ValueError:
+                    return 400, {"error": "bad json"}
+                device = self._patch_device(index, body)
+                return (200, {"ok": True}) if device is not None else (404, {"error": "no device"})
+
+        return 404, {"error": f"unknown cmd {cmd!r}"}
+
+    async def _respond(self, request: web.Request, status: int, body: Any) -> web.StreamResponse:
+        data = json.dumps(body).encode()
+        if not self.config.slow_body:
+            return web.Response(status=status, body=data, content_type="application/json")
+
+        resp = web.StreamResponse(status=status)
+        resp.content_type = "application/json"
+        resp.content_length = len(data)
+        await resp.prepare(request)
+        chunks = 8
+        size = max(1, len(data) // chunks)
+        for i in range(0, len(data), size):
+            await resp.write(data[i : i + size])
+            await asyncio.sleep(self.config.slow_body / chunks)
+        await resp.write_eof()
+        return resp
+
+    @staticmethod
+    def _reset(request: web.Request) -> web.StreamResponse:
+        if request.transport is not None:
+            request.transport.close()
+        return web.Response(status=503)
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--drop-mode", choices=("hang", "reset"), default="hang")
+    parser.add_argument("--slow-body", type=float, default=0.0)
+    parser.add_argument("--max-connections", type=int, default=4)
+    parser.add_argument("--refresh-period", type=float, default=30.0)
+    parser.add_argument("--press-after", type=float, default=5.0)
+    parser.add_argument("--no-heatpump", action="store_true")
+    args = parser.parse_args()
+
+    config = SimulatorConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop_rate,
+        drop_mode=args.drop_mode,
+        slow_body=args.slow_body,
+        max_connections=args.max_connections,
+        refresh_period=args.refresh_period,
+        press_after=args.press_after,
+        heatpump=not args.no_heatpump,
+    )
+
+    async def _run() -> None:
+        sim = PoolSyncSimulator(config)
+        url = await sim.start(args.host, args.port)
+        print(f"PoolSync simulator listening on {url} (mac {sim.mac})")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await sim.stop()
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    _main()
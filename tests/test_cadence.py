@@ -0,0 +1,200 @@
+from datetime import timedelta
+import logging
+import random
+import time
+from types import SimpleNamespace
+
+from custom_components.poolsync.cadence import (
+    ALIGN_MARGIN,
+    CADENCE_ALIGNED,
+    CADENCE_LEARNING,
+    CADENCE_NO_PERIOD,
+    CADENCE_NO_STAMP,
+    LEARN_POLLS,
+    MIN_CHANGES,
+    PROBE_SHIFT,
+    CadenceEstimator,
+    parse_stamp,
+)
+from custom_components.poolsync.coordinator import PoolSyncCoordinator
+
+PERIOD = 30.0
+# Hub stamps are local time without a zone: two hours ahead of our clock
+ZONE = 7200.0
+
+
+def _stamp(now: float, phase: float = 3.0) -> float:
+    """Hub stamp of the last refresh before ``now``."""
+    refreshes = (now - phase) // PERIOD
+    return refreshes * PERIOD + phase + ZONE
+
+
+def test_parse_stamp():
+    assert parse_stamp(1717250700) == 1717250700.0
+    assert parse_stamp("1717250700") == 1717250700.0
+    assert parse_stamp("2024-06-01T14:05:00") == 1717250700.0
+    assert parse_stamp("2024-06-01T14:05:00+02:00") == 1717250700.0 - 7200
+    assert parse_stamp("yesterday") is None
+    assert parse_stamp(True) is None
+
+
+def test_polls_align_just_after_refresh():
+    rng = random.Random(0)
+    cadence = CadenceEstimator()
+    now = 1_000_000.0
+    assert cadence.next_delay(now, 300) is None
+
+    for _ in range(8):
+        now += 300 + rng.uniform(-20, 20)
+        cadence.observe(now + 0.05, _stamp(now))
+    assert cadence.period is not None and cadence.period % PERIOD < 0.5
+
+    # Follow the schedule: every poll lands shortly after a refresh
+    for _ in range(10):
+        delay = cadence.next_delay(now, 300)
+        assert 150 <= delay <= 330
+        now += delay
+        age = (now - 3.0) % PERIOD
+        assert ALIGN_MARGIN - 0.01 <= age <= ALIGN_MARGIN + 10
+        cadence.observe(now + 0.05, _stamp(now))
+    # The offset converges rather than drifting with our own polls
+    assert (now - 3.0) % PERIOD <= ALIGN_MARGIN + 10
+
+
+def test_reboot_forgets_cadence():
+    cadence = CadenceEstimator()
+    now = 0.0
+    for i in range(5):
+        now += 45
+        cadence.observe(now, _stamp(now), uptime=1000 + i * 45)
+    assert cadence.period is not None
+    cadence.observe(now + 45, _stamp(now + 45), uptime=10)
+    assert cadence.period is None
+    assert cadence.as_dict()["changes_seen"] == 0
+
+
+def test_coordinator_shifts_interval_only_when_enabled(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+
+    def _snapshot():
+        return SimpleNamespace(
+            status=SimpleNamespace(date_time=_stamp(clock[0])),
+            stats=SimpleNamespace(up_time_secs=None),
+        )
+
+    api = SimpleNamespace(metrics=None)
+    aligned = PoolSyncCoordinator(None, api, timedelta(seconds=300))
+    fixed = PoolSyncCoordinator(None, api, timedelta(seconds=300), align_polls=False)
+    intervals = []
+    for _ in range(6):
+        clock[0] += 310.0
+        intervals.append(aligned._next_interval(_snapshot()).total_seconds())
+        assert fixed._next_interval(_snapshot()).total_seconds() == 300
+    assert intervals[0] == 300
+    assert intervals[-1] != 300
+    # Lands after the refresh by the margin plus the smallest age seen so far
+    assert ALIGN_MARGIN <= (clock[0] + intervals[-1] - 3.0) % PERIOD <= ALIGN_MARGIN + 10
+    assert fixed.cadence is None
+
+
+def test_status_says_why_polls_are_not_aligned():
+    cadence = CadenceEstimator()
+    for i in range(LEARN_POLLS):
+        assert cadence.status == CADENCE_LEARNING
+        cadence.observe(i * 300.0, None)
+    assert cadence.status == CADENCE_NO_STAMP
+
+    # Stamps that never settle on a period
+    cadence = CadenceEstimator()
+    now = 0.0
+    for i in range(LEARN_POLLS):
+        now += 300
+        cadence.observe(now, now - 50 + 37 * (i % 3) + 11 * i * i)
+    assert cadence.period is None
+    assert cadence.as_dict()["status"] == CADENCE_NO_PERIOD
+
+
+def test_coordinator_logs_unalignable_hub_once(monkeypatch, caplog):
+    clock = [0.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    snapshot = SimpleNamespace(
+        status=SimpleNamespace(date_time=None), stats=SimpleNamespace(up_time_secs=None)
+    )
+    api = SimpleNamespace(metrics=None, base_url="http://hub")
+    coordinator = PoolSyncCoordinator(None, api, timedelta(seconds=300))
+    with caplog.at_level(logging.INFO):
+        for _ in range(LEARN_POLLS + 3):
+            clock[0] += 300
+            assert coordinator._next_interval(snapshot) == timedelta(seconds=300)
+    assert [r.getMessage() for r in caplog.records] == [
+        "PoolSync hub http://hub: no refresh period in status.dateTime (no_stamp); "
+        "polling every 300.0s without alignment"
+    ]
+
+
+def test_pushed_update_keeps_next_poll_aligned(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    coordinator = PoolSyncCoordinator(
+        None, SimpleNamespace(metrics=None), timedelta(seconds=300)
+    )
+    for _ in range(6):
+        clock[0] += 310.0
+        coordinator._next_interval(
+            SimpleNamespace(
+                status=SimpleNamespace(date_time=_stamp(clock[0])),
+                stats=SimpleNamespace(up_time_secs=None),
+            )
+        )
+    # A verified write lands 115 s later; the next poll still follows the hub
+    clock[0] += 115
+    coordinator.async_set_updated_data(None)
+    next_poll = clock[0] + coordinator.update_interval.total_seconds()
+    assert ALIGN_MARGIN <= (next_poll - 3.0) % PERIOD <= ALIGN_MARGIN + 10
+
+
+def _follow(coordinator, clock, rng, polls, stamp_fn):
+    """Poll as scheduled (give or take HA's jitter); the intervals used."""
+    intervals = []
+    interval = 300.0
+    for _ in range(polls):
+        clock[0] += interval + rng.uniform(-0.5, 0.5)
+        interval = coordinator._next_interval(
+            SimpleNamespace(
+                status=SimpleNamespace(date_time=stamp_fn(clock[0])),
+                stats=SimpleNamespace(up_time_secs=None),
+            )
+        ).total_seconds()
+        intervals.append(interval)
+    return intervals
+
+
+def test_wall_clock_stamp_is_not_a_period(monkeypatch, caplog):
+    rng = random.Random(1)
+    clock = [0.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    api = SimpleNamespace(metrics=None, base_url="http://hub")
+    coordinator = PoolSyncCoordinator(None, api, timedelta(seconds=300))
+    with caplog.at_level(logging.INFO):
+        # dateTime is the hub's clock at the moment it answers
+        intervals = _follow(
+            coordinator, clock, rng, 300, lambda now: now + ZONE + rng.uniform(0, 0.3)
+        )
+    assert set(intervals[:MIN_CHANGES]) == {300.0, 300.0 + PROBE_SHIFT}
+    assert set(intervals[MIN_CHANGES:]) == {300.0}
+    assert coordinator.cadence.status == CADENCE_NO_PERIOD
+    assert len(caplog.records) == 1
+
+
+def test_period_dividing_poll_interval_is_learned(monkeypatch):
+    # Refreshes every 30 s, polls every 300 s: each poll sees the stamp move 300 s
+    rng = random.Random(2)
+    clock = [0.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    coordinator = PoolSyncCoordinator(
+        None, SimpleNamespace(metrics=None), timedelta(seconds=300)
+    )
+    _follow(coordinator, clock, rng, LEARN_POLLS, _stamp)
+    assert coordinator.cadence.status == CADENCE_ALIGNED
+    assert coordinator.cadence.period % PERIOD < 0.5
@@ -0,0 +1,323 @@
+import asyncio
+from datetime import timedelta
+import time
+
+import aiohttp
+
+from custom_components.poolsync import api as api_mod
+from custom_components.poolsync import coordinator as coordinator_mod
+from custom_components.poolsync.api import PoolSyncApi, PoolSyncVerifyError
+from custom_components.poolsync.coordinator import PoolSyncCoordinator
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.storage import Store
+from simulator import PoolSyncSimulator, SimulatorConfig
+
+
+class FakeEntry:
+    entry_id = "hub0"
+
+    def __init__(self):
+        self.tasks = []
+
+    def async_create_background_task(self, hass, target, name):
+        task = asyncio.ensure_future(target)
+        self.tasks.append(task)
+        return task
+
+
+def _coordinator(session, base_url, store, timeout=10):
+    api = PoolSyncApi(hass=None, base_url=base_url, session=session, request_timeout=timeout)
+    return PoolSyncCoordinator(None, api, timedelta(seconds=300), store=store)
+
+
+def test_topology_is_learned_and_reloaded():
+    store = Store(None, 1, "poolsync.hub0.topology")
+
+    async def scenario():
+        async with PoolSyncSimulator(SimulatorConfig(require_auth=False)) as sim:
+            async with aiohttp.ClientSession() as session:
+                first = _coordinator(session, sim.base_url, store)
+                await first.async_refresh()
+                assert first.heatpump_index == 1
+
+                second = _coordinator(session, sim.base_url, store)
+                assert await second.async_load_topology()
+                return sim.mac, second
+
+    mac, second = asyncio.run(scenario())
+    assert second.heatpump_index == 1
+    assert second.api.mac_address == mac
+    assert second.data is None
+
+
+def test_background_first_refresh_uses_short_timeout(monkeypatch):
+    monkeypatch.setattr(coordinator_mod, "INITIAL_REFRESH_TIMEOUT", 0.2)
+    sim = PoolSyncSimulator(SimulatorConfig(require_auth=False, drop_rate=1.0))
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            coordinator = _coordinator(session, sim.base_url, None, timeout=10)
+            entry = FakeEntry()
+            started = time.monotonic()
+            coordinator.async_refresh_in_background(entry)
+            await asyncio.gather(*entry.tasks)
+            return coordinator, time.monotonic() - started
+
+    coordinator, elapsed = asyncio.run(scenario())
+    assert elapsed < 2
+    assert not coordinator.last_update_success
+    # Retry soon rather than after a full poll interval
+    assert coordinator.update_interval == coordinator_mod.STARTUP_RETRY_INTERVAL
+
+
+def test_concurrent_refreshes_share_one_follow_up_fetch():
+    sim = PoolSyncSimulator(SimulatorConfig(require_auth=False, latency=0.2))
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            coordinator = _coordinator(session, sim.base_url, None)
+            await coordinator.async_refresh()
+            updates = []
+            coordinator.async_add_listener(lambda: updates.append(coordinator.data))
+            # A tick plus four refresh requests arriving while it runs
+            await asyncio.gather(*(coordinator.async_refresh() for _ in range(5)))
+            return coordinator, updates
+
+    coordinator, updates = asyncio.run(scenario())
+    assert sim.requests["GET poolSync"] == 1 + 2
+    assert coordinator.api.metrics.coalesced == 4
+    # The hub did not change, so nothing is fanned out to the entities
+    assert updates == []
+
+
+def test_overrun_is_counted_and_backs_off():
+    sim = PoolSyncSimulator(SimulatorConfig(require_auth=False, latency=0.3))
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            api = PoolSyncApi(hass=None, base_url=sim.base_url, session=session)
+            coordinator = PoolSyncCoordinator(
+                None, api, timedelta(seconds=0.1), align_polls=False
+            )
+            await coordinator.async_refresh()
+            return coordinator
+
+    coordinator = asyncio.run(scenario())
+    metrics = coordinator.api.metrics
+    assert metrics.overruns == 1
+    assert coordinator.update_interval.total_seconds() >= 0.3
+    assert metrics.as_dict()["overruns"] == 1
+
+
+def test_failed_polls_serve_last_snapshot_until_limit():
+    sim = PoolSyncSimulator(SimulatorConfig(require_auth=False, drop_mode="reset"))
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            api = PoolSyncApi(hass=None, base_url=sim.base_url, session=session)
+            coordinator = PoolSyncCoordinator(
+                None, api, timedelta(seconds=30), align_polls=False, max_failed_polls=2
+            )
+            await coordinator.async_refresh()
+            snapshot = coordinator.data
+            updates, failures, intervals = [], [], []
+            coordinator.async_add_listener(lambda: updates.append(coordinator.last_update_success))
+            coordinator.async_add_failure_listener(lambda: failures.append(True))
+
+            sim.config.drop_rate = 1.0
+            for _ in range(3):
+                await coordinator.async_refresh()
+                assert coordinator.data is snapshot
+                assert coordinator.last_update_success and coordinator.stale
+                intervals.append(coordinator.update_interval.total_seconds())
+            # No entity updates (or unavailability) for the first failures
+            assert updates == []
+            # The second failure on the normal schedule reaches the limit
+            await coordinator.async_refresh()
+            assert not coordinator.last_update_success and not coordinator.stale
+            assert updates == [False]
+            assert coordinator.update_interval == timedelta(seconds=30)
+
+            sim.config.drop_rate = 0.0
+            await coordinator.async_refresh()
+            return coordinator, updates, failures, intervals
+
+    coordinator, updates, failures, intervals = asyncio.run(scenario())
+    assert updates == [False, True]
+    assert len(failures) == 4
+    # Transient errors are retried quickly, backing off; the retries at 10 s
+    # and 20 s don't count towards max_failed_polls
+    assert intervals == [10.0, 20.0, 30.0]
+    assert not coordinator.stale
+    assert coordinator.api.metrics.consecutive_failures == 0
+
+
+def test_short_outage_keeps_snapshot_through_quick_retries():
+    sim = PoolSyncSimulator(SimulatorConfig(require_auth=False, drop_mode="reset"))
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            api = PoolSyncApi(hass=None, base_url=sim.base_url, session=session)
+            # Default limits: 3 failed polls, 900 s of data age
+            coordinator = PoolSyncCoordinator(
+                None, api, timedelta(seconds=300), align_polls=False
+            )
+            await coordinator.async_refresh()
+            snapshot = coordinator.data
+            updates = []
+            coordinator.async_add_listener(lambda: updates.append(coordinator.last_update_success))
+
+            sim.config.drop_rate = 1.0
+            # 10 + 20 + 40 + 80 s of retries: a blip well under max_stale
+            for _ in range(5):
+                await coordinator.async_refresh()
+                assert coordinator.data is snapshot and coordinator.stale
+            sim.config.drop_rate = 0.0
+            await coordinator.async_refresh()
+            return coordinator, updates
+
+    coordinator, updates = asyncio.run(scenario())
+    assert updates == []
+    assert not coordinator.stale
+
+
+def test_stale_snapshot_is_dropped_after_max_age(monkeypatch):
+    sim = PoolSyncSimulator(SimulatorConfig(require_auth=False, drop_mode="reset"))
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            api = PoolSyncApi(hass=None, base_url=sim.base_url, session=session)
+            coordinator = PoolSyncCoordinator(
+                None, api, timedelta(seconds=300), align_polls=False,
+                max_failed_polls=10, max_stale=timedelta(seconds=600),
+            )
+            await coordinator.async_refresh()
+            api.metrics.last_success -= 601
+            sim.config.drop_rate = 1.0
+            await coordinator.async_refresh()
+            return coordinator
+
+    coordinator = asyncio.run(scenario())
+    assert not coordinator.last_update_success
+    assert coordinator.as_diagnostics()["stale"] is False
+
+
+def test_verified_write_updates_snapshot_without_polling():
+    sim = PoolSyncSimulator(SimulatorConfig(require_auth=False))
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            coordinator = _coordinator(session, sim.base_url, None)
+            await coordinator.async_refresh()
+            updates = []
+            coordinator.async_add_listener(lambda: updates.append(coordinator.data))
+            await coordinator.async_write_device(
+                0, coordinator.api.set_boost_mode(0, True, verify=True)
+            )
+            return coordinator, updates
+
+    coordinator, updates = asyncio.run(scenario())
+    assert sim.requests["GET poolSync"] == 1
+    assert len(updates) == 1
+    assert coordinator.data.chlor.config.boost_mode is None
+    assert coordinator.data.chlor.status.boost_remaining > 0
+
+
+def test_failed_write_reaches_the_service_call_as_ha_error(monkeypatch):
+    monkeypatch.setattr(api_mod, "VERIFY_DELAYS", (0.01,))
+    sim = PoolSyncSimulator(SimulatorConfig(require_auth=False))
+    # The hub acknowledges the PATCH but ignores it
+    monkeypatch.setattr(sim, "_patch_device", lambda index, body: sim.state["devices"][index])
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            coordinator = _coordinator(session, sim.base_url, None)
+            await coordinator.async_refresh()
+            try:
+                await coordinator.async_write_device(
+                    0, coordinator.api.set_chlor_output(0, 99, verify=True)
+                )
+            except HomeAssistantError as err:
+                return err
+            return None
+
+    err = asyncio.run(scenario())
+    assert isinstance(err.__cause__, PoolSyncVerifyError)
+    assert str(err).startswith("PoolSync hub did not apply the change: ")
+    # The entities were put back to what the hub reports
+    assert sim.requests["GET poolSync"] == 2
+
+
+def test_write_without_device_reads_falls_back_to_refresh():
+    sim = PoolSyncSimulator(SimulatorConfig(require_auth=False, device_reads=False))
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            coordinator = _coordinator(session, sim.base_url, None)
+            await coordinator.async_refresh()
+            for output in (70, 75):
+                await coordinator.async_write_device(
+                    0, coordinator.api.set_chlor_output(0, output, verify=True)
+                )
+                await coordinator.async_refresh()
+            return coordinator
+
+    coordinator = asyncio.run(scenario())
+    assert not coordinator.api.device_read_supported
+    assert coordinator.data.chlor.config.chlor_output == 75
+    # Asked once, then writes skip the read-back
+    assert sim.requests["GET devices"] == 1
+
+
+def test_topology_listener_hears_new_devices_only():
+    sim = PoolSyncSimulator(SimulatorConfig(require_auth=False, heatpump=False))
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            coordinator = _coordinator(session, sim.base_url, None)
+            seen = []
+            coordinator.async_add_topology_listener(lambda t: seen.append(t.types))
+            await coordinator.async_refresh()
+            await coordinator.async_refresh()
+            sim.state["deviceType"]["1"] = "heatPump"
+            await coordinator.async_refresh()
+            return seen
+
+    assert asyncio.run(scenario()) == [{"chlorSync"}, {"chlorSync", "heatPump"}]
+
+
+class DelayedStore(Store):
+    """Like Home Assistant's Store: delayed saves reach disk later."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.pending = None
+
+    def async_delay_save(self, data_func, delay=0):
+        self.pending = data_func
+
+
+def test_new_device_types_are_saved_before_listeners_hear():
+    store = DelayedStore(None, 1, "poolsync.hub0.topology")
+    store.data = {"mac": "AA", "device_types": {"0": "chlorSync"}}
+    sim = PoolSyncSimulator(SimulatorConfig(require_auth=False))
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            coordinator = _coordinator(session, sim.base_url, store)
+            assert await coordinator.async_load_topology()
+            saved = []
+            coordinator.async_add_topology_listener(
+                lambda t: saved.append(store.data["device_types"])
+            )
+            await coordinator.async_refresh()
+            # Reloaded entry: sets up from the store, and doesn't reload again
+            reloaded = _coordinator(session, sim.base_url, store)
+            await reloaded.async_load_topology()
+            reloaded.async_add_topology_listener(saved.append)
+            await reloaded.async_refresh()
+            return saved, reloaded
+
+    saved, reloaded = asyncio.run(scenario())
+    assert saved == [{"0": "chlorSync", "1": "heatPump"}]
+    assert reloaded.topology.types == {"chlorSync", "heatPump"}
@@ -1,3 +1,4 @@
+from custom_components.poolsync.model import PoolSyncSnapshot
 from custom_components.poolsync.sensor import SENSORS
 
 
@@ -11,6 +12,6 @@ def _device_stats_attr_fn():
 def test_device_stats_values():
     attr_fn = _device_stats_attr_fn()
     data = {"devices": {"0": {"stats": list(range(10))}}}
-    attrs = attr_fn(data)
+    attrs = attr_fn(PoolSyncSnapshot.from_dict(data))
     for i in range(10):
         assert attrs[f"stat{i}"] == i
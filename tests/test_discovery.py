@@ -0,0 +1,72 @@
+import asyncio
+import socket
+
+import aiohttp
+import pytest
+
+from custom_components.poolsync.discovery import (
+    async_discover_hubs,
+    expand_hosts,
+    host_of,
+)
+from simulator import PoolSyncSimulator, SimulatorConfig
+
+
+def _closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_expand_hosts():
+    urls = expand_hosts("192.168.1.0/30, 10.0.0.7 http://Pool.local:8080/ 10.0.0.7")
+    assert urls == [
+        "http://192.168.1.1",
+        "http://192.168.1.2",
+        "http://10.0.0.7",
+        "http://pool.local:8080",
+    ]
+    assert len(expand_hosts("192.168.1.0/24")) == 254
+    assert expand_hosts("10.0.0.9/32") == ["http://10.0.0.9"]
+    assert host_of("http://10.0.0.7/api") == "10.0.0.7"
+
+    with pytest.raises(ValueError):
+        expand_hosts("10.0.0.0/16")
+    with pytest.raises(ValueError):
+        expand_hosts("300.1.2.3/24")
+
+
+def test_discover_hubs_against_simulators():
+    open_hub = PoolSyncSimulator(SimulatorConfig(require_auth=False))
+    locked_hub = PoolSyncSimulator(SimulatorConfig())
+    configured = PoolSyncSimulator(SimulatorConfig(require_auth=False))
+    configured.state["poolSync"]["system"]["macAddr"] = "AA:BB:CC:99:99:99"
+    open_hub.state["poolSync"]["config"]["name"] = "Backyard"
+
+    async def scenario():
+        async with open_hub, locked_hub, configured, aiohttp.ClientSession() as session:
+            targets = [
+                open_hub.base_url,
+                locked_hub.base_url,
+                configured.base_url,
+                f"http://127.0.0.1:{_closed_port()}",
+            ]
+            return await async_discover_hubs(
+                session,
+                targets,
+                skip_macs=["aa:bb:cc:99:99:99"],
+            ), await async_discover_hubs(
+                session, targets, skip_hosts=[open_hub.base_url + "/"]
+            )
+
+    found, without_open = asyncio.run(scenario())
+
+    by_url = {hub.base_url: hub for hub in found}
+    assert set(by_url) == {open_hub.base_url, locked_hub.base_url}
+    assert by_url[open_hub.base_url].mac == open_hub.mac
+    assert by_url[open_hub.base_url].fw_version
+    assert by_url[open_hub.base_url].name == "Backyard"
+    # Credentials required: recognised by the push-link status, MAC unknown
+    assert by_url[locked_hub.base_url].mac is None
+    assert by_url[locked_hub.base_url].name is None
+    assert open_hub.base_url not in {hub.base_url for hub in without_open}
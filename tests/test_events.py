@@ -0,0 +1,103 @@
+import asyncio
+import copy
+from datetime import timedelta
+from types import SimpleNamespace
+
+import aiohttp
+
+from homeassistant.helpers.device_registry import DEVICES  # test stub
+
+from custom_components.poolsync.api import PoolSyncApi
+from custom_components.poolsync.const import DOMAIN
+from custom_components.poolsync.coordinator import PoolSyncCoordinator
+from custom_components.poolsync.events import TransitionDetector
+from custom_components.poolsync.model import PoolSyncSnapshot
+from harness import FakeConfigEntry
+from simulator import PoolSyncSimulator, SimulatorConfig
+from test_model import SAMPLE
+
+
+def _snapshot(**changes) -> PoolSyncSnapshot:
+    data = copy.deepcopy(SAMPLE)
+    chlor, heatpump = data["devices"]["0"], data["devices"]["1"]
+    chlor["status"]["boostRemaining"] = changes.get("boost", 0)
+    chlor["status"]["saltPPM"] = changes.get("salt", 3200)
+    chlor["faults"] = changes.get("chlor_faults", [0, 0])
+    heatpump["nodeAttr"]["online"] = changes.get("heatpump_online", False)
+    heatpump["status"]["stateFlags"] = changes.get("state_flags", 520)
+    heatpump["status"]["ctrlFlags"] = changes.get("ctrl_flags", 1)
+    return PoolSyncSnapshot.from_dict(data)
+
+
+def _fired(detector, **changes):
+    return [(e.event_type, e.data) for e in detector.update(_snapshot(**changes))]
+
+
+def test_transitions_between_snapshots():
+    detector = TransitionDetector(salt_low_ppm=2700)
+    # The first snapshot is the baseline, whatever it holds
+    assert _fired(detector, boost=10, salt=2500) == []
+    assert _fired(detector, boost=9, salt=2500) == []
+
+    assert _fired(
+        detector,
+        salt=3200,
+        chlor_faults=[2, 0],
+        heatpump_online=True,
+        state_flags=8,
+        ctrl_flags=0,
+    ) == [
+        ("poolsync_boost_finished", {}),
+        ("poolsync_came_online", {"device": "heatpump"}),
+        ("poolsync_fault_raised", {"device": "chlor", "index": 0, "value": 2}),
+        ("poolsync_compressor_started", {}),
+        ("poolsync_flow_lost", {}),
+    ]
+    assert _fired(detector, salt=2650) == [
+        ("poolsync_salt_low", {"salt_ppm": 2650.0, "threshold": 2700}),
+        ("poolsync_went_offline", {"device": "heatpump"}),
+        ("poolsync_fault_cleared", {"device": "chlor", "index": 0, "value": 2}),
+        ("poolsync_compressor_stopped", {}),
+        ("poolsync_flow_restored", {}),
+    ]
+    # Noise around the threshold doesn't fire again until salt recovers
+    assert _fired(detector, salt=2710) == []
+    assert _fired(detector, salt=2690) == []
+    assert _fired(detector, salt=2800) == []
+    assert [e for e, _ in _fired(detector, salt=2600)] == ["poolsync_salt_low"]
+
+    # Flow follows the binary sensor: any ctrlFlags >= 1, whatever its bits
+    assert _fired(detector, salt=2600, ctrl_flags=2) == []
+    assert _fired(detector, salt=2600, ctrl_flags=0) == [("poolsync_flow_lost", {})]
+
+
+def test_coordinator_fires_events_after_fanout():
+    sim = PoolSyncSimulator(SimulatorConfig(require_auth=False))
+    fired = []
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            hass = SimpleNamespace(
+                bus=SimpleNamespace(async_fire=lambda event, data: fired.append((event, data)))
+            )
+            api = PoolSyncApi(hass=None, base_url=sim.base_url, session=session)
+            coordinator = PoolSyncCoordinator(hass, api, timedelta(seconds=300))
+            coordinator.events = TransitionDetector()
+            await coordinator.async_refresh()
+            coordinator.device_info(FakeConfigEntry("hub0", {}))
+            DEVICES[(DOMAIN, sim.mac)] = "device-1"
+            try:
+                sim.state["devices"]["0"]["nodeAttr"]["online"] = False
+                await coordinator.async_refresh()
+                # Readings drift, but nothing changes meaning
+                await coordinator.async_refresh()
+            finally:
+                DEVICES.clear()
+
+    asyncio.run(scenario())
+    assert fired == [
+        (
+            "poolsync_went_offline",
+            {"device_id": "device-1", "mac": sim.mac, "device": "chlor"},
+        )
+    ]
@@ -0,0 +1,75 @@
+from custom_components.poolsync.binary_sensor import HEATPUMP_BINARY_SENSORS
+from custom_components.poolsync.flags import (
+    EMPTY_FLAGS,
+    STATE_FLAGS,
+    Fault,
+    HeatPumpFlags,
+    active_faults,
+)
+from custom_components.poolsync.model import EMPTY_SNAPSHOT, PoolSyncSnapshot
+
+from test_model import SAMPLE
+
+
+def test_flags_decode_named_bits():
+    heating = HeatPumpFlags.decode(1, 8, (0, 0))
+    assert "flow" in heating.ctrl
+    assert "fan" in heating.state and heating.compressor
+    assert heating.faults == ()
+
+    held = HeatPumpFlags.decode("1", 520, ())
+    assert held.state.names == ("fan",) and held.state.unknown_bits == (9,)
+    assert not held.compressor
+
+    idle = HeatPumpFlags.decode(0, 0, ())
+    assert not (idle.flow or idle.fan or idle.compressor)
+
+
+def test_seen_values_keep_their_meaning():
+    # ctrlFlags: any positive value is flow, whatever its bits
+    assert HeatPumpFlags.decode(2, 0, ()).flow
+    assert not HeatPumpFlags.decode(None, 0, ()).flow
+    # stateFlags 8 and 520 as before; a new value is read from its bits
+    assert [
+        (f.compressor, f.fan) for f in (HeatPumpFlags.decode(0, v, ()) for v in (8, 520))
+    ] == [(True, True), (False, True)]
+    new = HeatPumpFlags.decode(0, 8 | 4, ())
+    # An unexplained bit next to the fan's may hold the compressor, as in 520
+    assert new.fan and not new.compressor
+    assert not HeatPumpFlags.decode(0, 512, ()).fan
+
+
+def test_unknown_bits_are_kept():
+    odd = STATE_FLAGS.decode(8 | 2)
+    assert odd.unknown_bits == (1,)
+    assert odd.as_dict() == {"value": 10, "flags": ["fan"], "unknown_bits": [1]}
+    # Memoized: one object per distinct value
+    assert STATE_FLAGS.decode(10) is odd
+    assert STATE_FLAGS.decode(None) is EMPTY_FLAGS
+    assert STATE_FLAGS.decode("garbage") is EMPTY_FLAGS
+
+
+def test_any_non_zero_fault_word_is_a_fault():
+    assert active_faults((0, 4, -1, 0)) == (Fault(1, 4), Fault(2, -1))
+    assert active_faults((0, "E3", [1])) == (Fault(1, "E3"), Fault(2, [1]))
+    assert active_faults((0, 0.0)) == ()
+    assert Fault(1, 4).as_dict() == {"index": 1, "value": 4}
+
+
+def test_snapshot_carries_decoded_flags():
+    snap = PoolSyncSnapshot.from_dict(SAMPLE)
+    assert snap.heatpump.flags.state.names == ("fan",)
+    assert snap.heatpump.flags.faults == (Fault(1, 4),)
+    assert snap.chlor.active_faults == ()
+
+    values = {d.key: d.value_fn(snap) for d in HEATPUMP_BINARY_SENSORS}
+    assert values == {
+        "heatpump_online": False,
+        "heatpump_fault": True,
+        "heatpump_compressor": False,
+        "heatpump_flow": True,
+        "heatpump_fan": True,
+    }
+    fault = next(d for d in HEATPUMP_BINARY_SENSORS if d.key == "heatpump_fault")
+    assert fault.attr_fn(snap) == {"faults": [{"index": 1, "value": 4}]}
+    assert not any(d.value_fn(EMPTY_SNAPSHOT) for d in HEATPUMP_BINARY_SENSORS[1:])
@@ -0,0 +1,116 @@
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import aiohttp
+
+from custom_components.poolsync.api import PoolSyncApi
+from custom_components.poolsync.coordinator import PoolSyncCoordinator
+from custom_components.poolsync.fleet import FleetAggregator, HubSummary, async_track_hub
+from simulator import PoolSyncSimulator, SimulatorConfig
+
+
+def test_rollups_follow_updates_and_removals():
+    fleet = FleetAggregator()
+    fleet.update("a", HubSummary(online=True, salt_ppm=3200, water_temp=28, cell_power=120))
+    fleet.update("b", HubSummary(online=True, in_fault=True, salt_ppm=2600, water_temp=26))
+    fleet.update("c", HubSummary())
+    assert fleet.as_dict() == {
+        "hubs": 3,
+        "online": 2,
+        "in_fault": 1,
+        "salt_min": 2600,
+        "salt_max": 3200,
+        "water_temp_avg": 27.0,
+        "cell_power_total": 120.0,
+    }
+
+    assert not fleet.update("c", HubSummary())
+    # Replacing a hub's summary takes its old values out of the roll-ups
+    assert fleet.update("b", HubSummary(online=True, salt_ppm=3400, water_temp=30, cell_power=80))
+    assert (fleet.in_fault, fleet.salt_min, fleet.salt_max) == (0, 3200, 3400)
+    assert (fleet.water_temp_avg, fleet.cell_power_total) == (29.0, 200.0)
+
+    fleet.remove("a")
+    fleet.remove("missing")
+    assert fleet.as_dict() == {
+        "hubs": 2,
+        "online": 1,
+        "in_fault": 0,
+        "salt_min": 3400,
+        "salt_max": 3400,
+        "water_temp_avg": 30.0,
+        "cell_power_total": 80.0,
+    }
+    fleet.remove("b")
+    fleet.remove("c")
+    assert fleet.salt_min is None and fleet.water_temp_avg is None
+    assert fleet.cell_power_total is None
+
+
+def test_listeners_get_one_call_per_loop_pass():
+    fleet = FleetAggregator()
+    calls = []
+
+    async def scenario():
+        fleet.async_add_listener(lambda: calls.append(fleet.hubs))
+        for i in range(5):
+            fleet.update(f"hub{i}", HubSummary(online=True))
+        await asyncio.sleep(0)
+        fleet.update("hub0", HubSummary(online=True))
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert calls == [5]
+
+
+def test_tracked_hub_publishes_and_leaves():
+    sim = PoolSyncSimulator(SimulatorConfig(require_auth=False))
+    fleet = FleetAggregator()
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            api = PoolSyncApi(hass=None, base_url=sim.base_url, session=session)
+            coordinator = PoolSyncCoordinator(None, api, timedelta(seconds=300))
+            stop = async_track_hub(fleet, "hub0", coordinator)
+            assert fleet.online == 0
+            await coordinator.async_refresh()
+            summary = HubSummary.from_coordinator(coordinator)
+            assert fleet.online == 1
+            stop()
+            await coordinator.async_refresh()
+            return coordinator, summary
+
+    coordinator, summary = asyncio.run(scenario())
+    status = coordinator.data.chlor.status
+    assert summary.online
+    assert summary.salt_ppm == float(status.salt_ppm)
+    assert summary.cell_power == round(status.out_voltage * status.fwd_current, 2)
+    assert fleet.hubs == 0 and fleet.online == 0
+
+
+def test_fleet_entities_move_to_another_hub_on_unload():
+    entries = ["a", "b", "c"]
+    hass = SimpleNamespace(
+        config_entries=SimpleNamespace(async_entries=lambda domain: list(entries))
+    )
+    fleet = FleetAggregator()
+    added = []
+    for entry_id in entries:
+        fleet.async_claim(hass, entry_id, lambda entry_id=entry_id: added.append(entry_id))
+    assert fleet.owner == "a" and added == ["a"]
+
+    # A hub that isn't the owner leaves: nothing moves
+    fleet.async_release("b")
+    assert fleet.owner == "a" and added == ["a"]
+    # The owner reloads (an options change): the next loaded hub takes over,
+    # and the reloaded one only offers again
+    fleet.async_release("a")
+    assert fleet.owner == "c" and added == ["a", "c"]
+    fleet.async_claim(hass, "a", lambda: added.append("a"))
+    assert fleet.owner == "c" and added == ["a", "c"]
+
+    # A site down to one hub doesn't get them back
+    entries[:] = ["a"]
+    fleet.async_release("c")
+    assert fleet.owner is None and added == ["a", "c"]
@@ -0,0 +1,85 @@
+import json
+
+from custom_components.poolsync.metrics import (
+    AdaptiveTimeout,
+    ERROR_TIMEOUT,
+    LatencyWindow,
+    PayloadRing,
+    RequestMetrics,
+)
+
+
+def test_latency_window_percentiles_and_histogram():
+    window = LatencyWindow(window=100)
+    for ms in range(1, 101):
+        window.add(ms / 1000.0)
+    assert window.percentile(50) == 50.0
+    assert window.percentile(99) == 99.0
+    hist = window.histogram_dict()
+    assert hist["le_25ms"] == 25
+    assert hist["le_50ms"] == 25
+    assert hist["le_100ms"] == 50
+    assert hist["inf"] == 0
+
+
+def test_latency_window_is_bounded():
+    window = LatencyWindow(window=10)
+    for _ in range(50):
+        window.add(1.0)
+    window.add(0.001)
+    assert window.count == 51
+    assert window.percentile(0) == 1.0
+    assert window.percentile(100) == 1000.0
+
+
+def test_adaptive_timeout_follows_p99_within_bounds():
+    timeout = AdaptiveTimeout(ceiling=30.0, floor=2.0, multiplier=4.0, min_samples=4)
+    for _ in range(3):
+        timeout.add(0.1)
+    assert timeout.value == 30.0
+    timeout.add(0.1)
+    assert timeout.value == 2.0
+    timeout.add(1.5)
+    assert timeout.value == 6.0
+    timeout.add(20.0)
+    assert timeout.value == 30.0
+    assert timeout.as_dict()["samples"] == 6
+
+
+def test_request_metrics_counts_errors_and_bytes():
+    metrics = RequestMetrics()
+    metrics.record_response("GET poolSync", 0.120, 4000, 0.0005)
+    metrics.record_response("GET poolSync", 0.080, 2000, 0.0003)
+    metrics.record_error(ERROR_TIMEOUT, "GET poolSync")
+    metrics.record_update(0.2, ok=False)
+
+    assert metrics.requests == 2
+    assert metrics.mean_bytes == 3000
+    assert metrics.errors[ERROR_TIMEOUT] == 1
+    assert metrics.error_total == 1
+    assert metrics.update_failures == 1
+    assert metrics.consecutive_failures == 1 and metrics.data_age is None
+    metrics.record_update(0.1, ok=True)
+    assert metrics.consecutive_failures == 0 and metrics.data_age < 1
+    assert metrics.as_dict()["endpoints"]["GET poolSync"]["count"] == 2
+
+
+def test_payload_ring_is_bounded_and_round_trips():
+    ring = PayloadRing(size=3)
+    for i in range(5):
+        ring.add("GET poolSync", 200, json.dumps({"seq": i, "pad": "x" * 500}))
+    ring.add("GET poolSync", 500, "<html>oops</html>")
+
+    entries = ring.entries()
+    assert [e["body"]["seq"] for e in entries[:2]] == [3, 4]
+    assert entries[-1]["body"] == "<html>oops</html>"
+    assert ring.compressed_bytes < 3 * 500
+
+
+def test_poll_rate_from_recent_ticks():
+    metrics = RequestMetrics()
+    assert metrics.poll_rate is None
+    metrics.ticks.extend((1000.0 + 30 * i, 100.0, True, None) for i in range(5))
+
+    assert metrics.poll_rate == 2.0
+    assert metrics.as_dict()["poll_rate_per_min"] == 2.0
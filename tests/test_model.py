@@ -0,0 +1,72 @@
+from custom_components.poolsync.model import EMPTY_SNAPSHOT, HubTopology, PoolSyncSnapshot
+
+
+SAMPLE = {
+    "poolSync": {
+        "config": {"name": "Backyard"},
+        "status": {"online": True, "boardTemp": 41, "rssi": -61},
+        "stats": {"upTimeSecs": 1200, "wifiDisconnects": 3},
+        "system": {"macAddr": "AA:BB:CC:DD:EE:FF", "fwVersion": "1.2.3"},
+    },
+    "deviceType": {"0": "chlorSync", "1": "heatPump"},
+    "devices": {
+        "0": {
+            "nodeAttr": {"name": "ChlorSync", "online": True},
+            "status": {
+                "waterTemp": 27,
+                "saltPPM": 3200,
+                "cellRailVoltage": 24150,
+                "fwdCurrent": 5250,
+                "revCurrent": "bad",
+            },
+            "config": {"chlorOutput": 40},
+            "faults": [0, 0],
+            "stats": [1, 2, 3],
+        },
+        "1": {
+            "nodeAttr": {"online": False},
+            "status": {"waterTemp": 26, "ctrlFlags": 1, "stateFlags": 520},
+            "config": {"mode": 1, "setpoint": 29},
+            "faults": [0, 4],
+        },
+    },
+}
+
+
+def test_snapshot_parses_hub_and_devices():
+    snap = PoolSyncSnapshot.from_dict(SAMPLE)
+    assert snap.name == "Backyard"
+    assert snap.status.rssi == -61
+    assert snap.system.mac_addr == "AA:BB:CC:DD:EE:FF"
+    assert snap.chlor.status.salt_ppm == 3200
+    assert snap.chlor.config.chlor_output == 40
+    assert snap.chlor.stat(2) == 3
+    assert snap.chlor.stat(9) is None
+    assert snap.heatpump_index == 1
+    assert snap.heatpump.config.setpoint == 29
+    assert snap.heatpump.faults == (0, 4)
+
+
+def test_snapshot_converts_units_up_front():
+    snap = PoolSyncSnapshot.from_dict(SAMPLE)
+    assert snap.chlor.status.cell_rail_voltage == 24.15
+    assert snap.chlor.status.fwd_current == 5.25
+    assert snap.chlor.status.rev_current is None
+
+
+def test_snapshot_tolerates_missing_sections():
+    snap = PoolSyncSnapshot.from_dict({"devices": []})
+    assert snap.heatpump_index is None
+    assert snap.chlor.status.water_temp is None
+    assert snap.chlor.faults == ()
+    assert EMPTY_SNAPSHOT.heatpump.config.mode is None
+
+
+def test_topology_platforms_follow_device_types():
+    full = HubTopology.from_snapshot(PoolSyncSnapshot.from_dict(SAMPLE))
+    assert full.platforms == ["sensor", "switch", "number", "binary_sensor", "climate", "button"]
+    chlor_only = HubTopology(device_types=((0, "chlorSync"),))
+    assert chlor_only.platforms == ["sensor", "switch", "number", "button"]
+    assert HubTopology(device_types=((0, "unknownThing"),)).platforms == ["sensor", "button"]
+    # Not polled yet: everything
+    assert HubTopology().platforms == full.platforms
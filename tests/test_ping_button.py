@@ -1,9 +1,15 @@
 import asyncio
 
 from custom_components.poolsync.button import PoolSyncPingButton
+from custom_components.poolsync.coordinator import PoolSyncCoordinator
 
 
 class DummyCoordinator:
+    hub_id = PoolSyncCoordinator.hub_id
+    device_info = PoolSyncCoordinator.device_info
+    _device_info = None
+    topology = None
+
     def __init__(self):
         self.api = type("api", (), {"mac_address": "00:11"})()
         self.refresh_called = False
@@ -19,6 +25,6 @@ class DummyEntry:
 def test_ping_button_requests_refresh():
     coordinator = DummyCoordinator()
     entry = DummyEntry()
-    button = PoolSyncPingButton(coordinator, entry)
+    button = PoolSyncPingButton(coordinator.api, coordinator, entry)
     asyncio.run(button.async_press())
     assert coordinator.refresh_called
@@ -0,0 +1,113 @@
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+from homeassistant.core import State
+from homeassistant.helpers.restore_state import RESTORE_CACHE  # test stub
+
+from custom_components.poolsync.climate import PoolSyncHeatPumpClimate
+from custom_components.poolsync.coordinator import PoolSyncCoordinator
+from custom_components.poolsync.model import PoolSyncSnapshot
+from custom_components.poolsync.number import PoolSyncChlorOutputNumber
+from custom_components.poolsync.sensor import SENSORS, PoolSyncSensor
+from custom_components.poolsync.switch import PoolSyncBoostSwitch
+
+FIXTURE = Path(__file__).parent / "fixtures" / "poolsync_all.json"
+
+
+class DummyCoordinator:
+    hub_id = PoolSyncCoordinator.hub_id
+    device_info = PoolSyncCoordinator.device_info
+    _device_info = None
+
+    def __init__(self):
+        self.api = SimpleNamespace(mac_address="00:11")
+        self.hass = SimpleNamespace(
+            config=SimpleNamespace(units=SimpleNamespace(temperature_unit="°C"))
+        )
+        self.data = None
+        self.topology = None
+        self.last_update_success = True
+
+
+class DummyEntry:
+    data: dict = {}
+
+
+def _added(entity):
+    asyncio.run(entity.async_added_to_hass())
+    return entity
+
+
+def test_entities_serve_restored_state_until_first_snapshot():
+    coordinator = DummyCoordinator()
+    salt = next(d for d in SENSORS if d.key == "salt_ppm")
+    RESTORE_CACHE.update(
+        {
+            "00:11_salt_ppm": State("sensor.salt", "3150", {"friendly_name": "Salt"}),
+            "00:11_chlor_output_0": State("number.chlor", "40"),
+            "00:11_boost_0": State("switch.boost", "on"),
+            "00:11_heat_pump_1": State(
+                "climate.hp", "heat", {"current_temperature": 26.5, "temperature": 28}
+            ),
+        }
+    )
+    try:
+        sensor = _added(PoolSyncSensor(coordinator, DummyEntry(), salt))
+        number = _added(PoolSyncChlorOutputNumber(coordinator, DummyEntry()))
+        switch = _added(PoolSyncBoostSwitch(coordinator, DummyEntry()))
+        climate = _added(PoolSyncHeatPumpClimate(coordinator, DummyEntry(), device_index=1))
+    finally:
+        RESTORE_CACHE.clear()
+
+    assert sensor.native_value == 3150
+    assert sensor.extra_state_attributes == {"stale": True}
+    assert number.native_value == 40
+    assert switch.is_on is True
+    assert climate.hvac_mode == "heat"
+    assert climate.current_temperature == 26.5
+    assert climate.target_temperature == 28
+    assert climate.extra_state_attributes == {"stale": True}
+    # One device-info mapping per hub
+    assert sensor._attr_device_info is number._attr_device_info is climate._attr_device_info
+
+    coordinator.data = PoolSyncSnapshot.from_dict(json.loads(FIXTURE.read_text()))
+    assert not sensor.stale
+    assert sensor.native_value == coordinator.data.chlor.status.salt_ppm
+    assert number.extra_state_attributes is None
+    assert climate.extra_state_attributes is None
+
+
+def test_no_restore_when_snapshot_present():
+    coordinator = DummyCoordinator()
+    coordinator.data = PoolSyncSnapshot.from_dict(json.loads(FIXTURE.read_text()))
+    RESTORE_CACHE["00:11_boost_0"] = State("switch.boost", "on")
+    try:
+        switch = _added(PoolSyncBoostSwitch(coordinator, DummyEntry()))
+    finally:
+        RESTORE_CACHE.clear()
+    assert not switch.stale
+    assert switch.is_on == (coordinator.data.chlor.status.boost_remaining > 0)
+
+
+def test_restored_state_stays_available_when_first_refresh_fails():
+    coordinator = DummyCoordinator()
+    salt = next(d for d in SENSORS if d.key == "salt_ppm")
+    RESTORE_CACHE["00:11_salt_ppm"] = State("sensor.salt", "3150")
+    try:
+        sensor = _added(PoolSyncSensor(coordinator, DummyEntry(), salt))
+        unrestored = _added(PoolSyncChlorOutputNumber(coordinator, DummyEntry()))
+    finally:
+        RESTORE_CACHE.clear()
+
+    # The background first refresh timed out
+    coordinator.last_update_success = False
+    assert sensor.available and sensor.native_value == 3150
+    assert not unrestored.available
+
+    # Once real data has arrived, failures make it unavailable as usual
+    coordinator.data = PoolSyncSnapshot.from_dict(json.loads(FIXTURE.read_text()))
+    assert not sensor.available
+    coordinator.last_update_success = True
+    assert sensor.available
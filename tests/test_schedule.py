@@ -0,0 +1,143 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+
+from homeassistant.helpers.event import TIMERS  # test stub
+from homeassistant.helpers.storage import Store
+
+from custom_components.poolsync.api import PoolSyncApi
+from custom_components.poolsync.coordinator import PoolSyncCoordinator
+from custom_components.poolsync.model import PoolSyncSnapshot
+from custom_components.poolsync.schedule import PoolSyncScheduler, Schedule, pending_writes
+from simulator import PoolSyncSimulator, SimulatorConfig
+from test_model import SAMPLE
+
+TZ = timezone(timedelta(hours=-5))
+# A Monday
+MONDAY = datetime(2024, 6, 3, tzinfo=TZ)
+
+RULES = [
+    {"at": "07:00", "days": ["mon", "tue", "wed", "thu", "fri"], "chlor_output": 60},
+    {"at": "22:00", "chlor_output": 30, "heatpump_mode": 0},
+    {"at": "9:30", "days": ["sat"], "boost": True, "heatpump_setpoint": 28},
+]
+
+
+def test_parse_rejects_bad_rules():
+    for raw, message in (
+        ({"at": "07:00"}, "sets nothing"),
+        ({"at": "7am", "chlor_output": 10}, "HH:MM"),
+        ({"at": "07:00", "chlor_output": 101}, "chlor_output"),
+        ({"at": "07:00", "boost": "yes"}, "boost"),
+        ({"at": "07:00", "days": ["someday"], "boost": True}, "days"),
+        ({"at": "07:00", "salt": 3000}, "unknown keys"),
+    ):
+        with pytest.raises(ValueError, match=message):
+            Schedule.parse([RULES[0], raw])
+    assert not Schedule.parse(None)
+
+
+def test_targets_carry_over_midnight_and_skip_days():
+    schedule = Schedule.parse(RULES)
+
+    # Missed transitions are caught up on, latest first, except boost
+    assert schedule.last_transition(MONDAY.replace(hour=6)) == MONDAY - timedelta(hours=2)
+    sunday = MONDAY - timedelta(days=1)
+    assert schedule.missed_targets(sunday, MONDAY.replace(hour=7)) == {
+        "chlor_output": 60,
+        "heatpump_mode": 0,
+    }
+    assert schedule.missed_targets(MONDAY.replace(hour=7), MONDAY.replace(hour=8)) == {}
+    assert schedule.last_transition(MONDAY.replace(hour=8)) == MONDAY.replace(hour=7)
+
+    assert schedule.next_transition(MONDAY.replace(hour=7)) == MONDAY.replace(hour=22)
+    # Friday 22:00 -> Saturday 09:30 (no weekday rule at 07:00)
+    friday = MONDAY + timedelta(days=4, hours=22)
+    assert schedule.next_transition(friday) == MONDAY + timedelta(days=5, hours=9, minutes=30)
+    assert schedule.targets_due(MONDAY + timedelta(days=5, hours=9, minutes=30)) == {
+        "boost": True,
+        "heatpump_setpoint": 28.0,
+    }
+
+
+def test_pending_writes_only_include_changes():
+    snapshot = PoolSyncSnapshot.from_dict(SAMPLE)
+    targets = {
+        "chlor_output": snapshot.chlor.config.chlor_output,
+        "heatpump_mode": 2,
+        "heatpump_setpoint": 28.0,
+    }
+    writes = pending_writes(targets, snapshot)
+    assert list(writes) == [snapshot.heatpump_index]
+    assert writes[snapshot.heatpump_index]["mode"] == 2
+
+
+def test_scheduler_only_writes_at_transitions():
+    sim = PoolSyncSimulator(SimulatorConfig(require_auth=False))
+    # Every day at midnight, so a transition has always just passed
+    schedule = Schedule.parse(
+        [{"at": "00:00", "chlor_output": 55, "heatpump_setpoint": 30, "boost": True}]
+    )
+    store = Store(None, 1, "poolsync.hub0.schedule")
+
+    async def scenario():
+        tasks = []
+        hass = SimpleNamespace(async_create_task=lambda c: tasks.append(asyncio.ensure_future(c)))
+        async with sim, aiohttp.ClientSession() as session:
+            api = PoolSyncApi(hass=None, base_url=sim.base_url, session=session)
+            coordinator = PoolSyncCoordinator(None, api, timedelta(seconds=300))
+            coordinator.verify_writes = True
+            await coordinator.async_refresh()
+
+            # First start: nothing is written until the next transition
+            scheduler = PoolSyncScheduler(hass, coordinator, schedule, store)
+            await scheduler.async_start()
+            assert tasks == [] and "PATCH devices" not in sim.requests
+            assert [when for when, _ in TIMERS] == [scheduler.next_run]
+            applied = scheduler.last_applied
+            scheduler.async_stop()
+            assert TIMERS == []
+
+            # A restart that missed yesterday's transition catches up, less boost
+            store.data["applied"] = (applied - timedelta(days=1)).isoformat()
+            scheduler = PoolSyncScheduler(hass, coordinator, schedule, store)
+            await scheduler.async_start()
+            await asyncio.gather(*tasks)
+            caught_up = dict(sim.requests)
+            scheduler.async_stop()
+
+            # A manual change survives a reload
+            await api.set_chlor_output(0, 20)
+            await coordinator.async_refresh()
+            tasks.clear()
+            scheduler = PoolSyncScheduler(hass, coordinator, schedule, store)
+            await scheduler.async_start()
+            assert tasks == []
+
+            # ...until the next transition, which also starts the boost
+            _, action = TIMERS.pop()
+            await action(scheduler.next_run + timedelta(milliseconds=5))
+            scheduler.async_stop()
+            return coordinator, scheduler, caught_up
+
+    coordinator, scheduler, caught_up = asyncio.run(scenario())
+    assert caught_up["PATCH devices"] == 2
+    assert coordinator.data.chlor.config.chlor_output == 55
+    assert coordinator.data.heatpump.config.setpoint == 30
+    assert coordinator.data.chlor.status.boost_remaining > 0
+    assert scheduler.as_dict()["writes"] == 1
+    assert scheduler.last_applied == scheduler.schedule.last_transition(scheduler.last_applied)
+    assert store.data["applied"] == scheduler.last_applied.isoformat()
+    assert TIMERS == []
+
+
+def test_changed_rules_start_without_catching_up():
+    schedule = Schedule.parse([RULES[0]])
+    store = Store(None, 1, "poolsync.hub0.schedule")
+    store.data = {"rules": Schedule.parse([RULES[1]]).fingerprint, "applied": MONDAY.isoformat()}
+    scheduler = PoolSyncScheduler(None, SimpleNamespace(data=None), schedule, store)
+    assert asyncio.run(scheduler._async_load_last_applied()) is None
+    assert schedule.fingerprint == Schedule.parse([dict(RULES[0])]).fingerprint
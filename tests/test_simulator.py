@@ -0,0 +1,284 @@
+import asyncio
+import contextlib
+import logging
+import time
+
+import aiohttp
+
+from custom_components.poolsync import api as api_mod
+from custom_components.poolsync.api import (
+    PoolSyncApi,
+    PoolSyncVerifyError,
+    async_pushlink_many,
+    pushlink_interval,
+)
+from custom_components.poolsync.metrics import ERROR_TIMEOUT
+from simulator import PoolSyncSimulator, SimulatorConfig
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+async def _with_api(sim: PoolSyncSimulator, fn, **api_kwargs):
+    async with sim, aiohttp.ClientSession() as session:
+        creds = sim.auth_headers()
+        api = PoolSyncApi(
+            hass=None,
+            base_url=sim.base_url,
+            token=creds["token"],
+            user_id=creds["user_id"],
+            session=session,
+            **api_kwargs,
+        )
+        return await fn(api)
+
+
+def test_poll_and_patch_round_trip():
+    sim = PoolSyncSimulator(SimulatorConfig(seed=1))
+
+    async def scenario(api):
+        data = await api.get_poolsync_all()
+        assert api.mac_address == sim.mac
+        assert data["deviceType"]["1"] == "heatPump"
+
+        await api.set_chlor_output(0, 65)
+        await api.set_boost_mode(0, True)
+        data = await api.get_poolsync_all()
+        return data["devices"]["0"]
+
+    chlor = _run(_with_api(sim, scenario))
+    assert chlor["config"]["chlorOutput"] == 65
+    assert chlor["status"]["boostRemaining"] > 0
+    assert sim.requests["PATCH devices"] == 2
+
+
+def test_verified_write_reads_back_only_the_device():
+    sim = PoolSyncSimulator(SimulatorConfig(seed=1))
+
+    async def scenario(api):
+        return await api.set_heatpump_setpoint(1, 28.5, verify=True)
+
+    heatpump = _run(_with_api(sim, scenario))
+    assert heatpump["config"]["setpoint"] == 28.5
+    assert sim.requests == {"PATCH devices": 1, "GET devices": 1}
+
+
+def test_verified_boost_reads_boost_remaining():
+    sim = PoolSyncSimulator(SimulatorConfig(seed=1))
+
+    async def scenario(api):
+        on = await api.set_boost_mode(0, True, verify=True)
+        off = await api.set_boost_mode(0, False, verify=True)
+        return on, off
+
+    on, off = _run(_with_api(sim, scenario))
+    # The hub has no boost flag to read back
+    assert "boostMode" not in on["config"]
+    assert on["status"]["boostRemaining"] > 0
+    assert off["status"]["boostRemaining"] == 0
+    assert sim.requests["GET devices"] == 2
+
+
+def test_verified_write_that_never_applies_raises(monkeypatch):
+    monkeypatch.setattr(api_mod, "VERIFY_DELAYS", (0.01, 0.01))
+    sim = PoolSyncSimulator(SimulatorConfig(seed=1))
+    # The hub acknowledges the PATCH but ignores it
+    monkeypatch.setattr(sim, "_patch_device", lambda index, body: sim.state["devices"][index])
+
+    async def scenario(api):
+        try:
+            await api.set_chlor_output(0, 99, verify=True)
+        except PoolSyncVerifyError as err:
+            return err
+        return None
+
+    err = _run(_with_api(sim, scenario))
+    assert err is not None and err.expected == {"chlorOutput": 99}
+    assert sim.requests["GET devices"] == 3
+    assert "GET poolSync" not in sim.requests
+
+
+def test_unauthorized_requests_are_rejected():
+    sim = PoolSyncSimulator()
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            api = PoolSyncApi(hass=None, base_url=sim.base_url, session=session)
+            try:
+                await api.get_poolsync_all()
+            except RuntimeError as err:
+                return str(err)
+        return None
+
+    assert "status=401" in _run(scenario())
+
+
+def test_dropped_request_times_out_and_is_counted():
+    sim = PoolSyncSimulator(SimulatorConfig(drop_rate=1.0))
+
+    async def scenario(api):
+        status, _, _ = await api._request_json(
+            "GET", "/api/poolsync", params={"cmd": "poolSync", "all": ""}, timeout_total=0.2
+        )
+        return status, api.metrics.errors[ERROR_TIMEOUT]
+
+    assert _run(_with_api(sim, scenario)) == (0, 1)
+
+
+def test_timeouts_adapt_to_hub_latency():
+    sim = PoolSyncSimulator(SimulatorConfig(latency=0.01))
+
+    async def scenario(api):
+        adaptive = api.timeouts["GET"]
+        adaptive.floor = 0.3
+        for _ in range(adaptive.min_samples):
+            await api.get_poolsync_all()
+        learned = api.timeout_for("GET")
+
+        sim.config.drop_rate = 1.0
+        started = time.perf_counter()
+        status, _, _ = await api._request_json(
+            "GET", "/api/poolsync", params={"cmd": "poolSync", "all": ""}
+        )
+        return learned, status, time.perf_counter() - started, api.timeout_for("GET")
+
+    learned, status, elapsed, after = _run(_with_api(sim, scenario, request_timeout=10))
+    assert learned == 0.3
+    assert status == 0 and elapsed < 2
+    # The timeout it hit counts as a sample, so the next one backs off
+    assert after == 1.2
+
+
+def test_connection_limit_resets_excess_requests():
+    sim = PoolSyncSimulator(SimulatorConfig(latency=0.1, max_connections=2))
+
+    async def scenario(api):
+        results = await asyncio.gather(
+            *(
+                api._request_json("GET", "/api/poolsync", params={"cmd": "poolSync", "all": ""})
+                for _ in range(5)
+            )
+        )
+        return [status for status, _, _ in results]
+
+    statuses = _run(_with_api(sim, scenario))
+    assert statuses.count(200) == 2
+    assert statuses.count(0) == 3
+    assert sim.rejected >= 3
+
+
+def test_pushlink_exchange_against_simulator():
+    sim = PoolSyncSimulator(SimulatorConfig(press_after=0.3))
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            api = PoolSyncApi(hass=None, base_url=sim.base_url, session=session)
+            return await api.async_pushlink_exchange(None, poll_interval=0.1, timeout=5)
+
+    ok, mac, token, user, err = _run(scenario())
+    assert ok, err
+    assert mac == sim.mac
+    assert token == sim.password
+    assert user in sim.users
+
+
+def test_request_logging_is_sampled_and_redacted(caplog):
+    sim = PoolSyncSimulator(SimulatorConfig(press_after=0.2))
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            api = PoolSyncApi(hass=None, base_url=sim.base_url, session=session)
+            api.log_sampler.every = 5
+            for _ in range(3):
+                with contextlib.suppress(RuntimeError):
+                    await api.get_poolsync_all()
+            ok, *_ = await api.async_pushlink_exchange(None, poll_interval=0.05, timeout=5)
+            assert ok
+            for _ in range(10):
+                await api.get_poolsync_all()
+
+    with caplog.at_level(logging.DEBUG, logger="custom_components.poolsync.api"):
+        _run(scenario())
+
+    lines = [r.getMessage() for r in caplog.records if r.getMessage().startswith("hub=")]
+    # The 401s before pairing: logged once, repeats held back
+    assert sum("failed: status=401" in line for line in lines) == 1
+    assert 0 < sum("status=200" in line for line in lines) < 5
+    assert sim.password not in caplog.text
+
+
+def test_pushlink_gives_up_when_window_closes():
+    sim = PoolSyncSimulator(SimulatorConfig(pushlink_window=1))
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            api = PoolSyncApi(hass=None, base_url=sim.base_url, session=session)
+            started = time.monotonic()
+            result = await api.async_pushlink_exchange(None, poll_interval=0.1, timeout=30)
+            return result, time.monotonic() - started
+
+    (ok, _, token, _, err), elapsed = _run(scenario())
+    assert not ok and token is None
+    assert err
+    # Bounded by the hub's timeRemaining, not the 30s flow timeout
+    assert elapsed < 3
+
+
+def test_pushlink_backs_off_while_the_hub_waits():
+    # No waiting yet, and the first answers, keep the base interval
+    assert pushlink_interval(0.5, 0, 60) == 0.5
+    assert pushlink_interval(0.5, 1, 60) == 0.5
+    assert pushlink_interval(0.5, 2, 60) == 0.6
+    assert pushlink_interval(0.5, 30, 60) == 2.0
+    # Faster again as the window runs out
+    assert pushlink_interval(0.5, 30, 4) == 1.0
+    assert pushlink_interval(0.5, 30, 1) == 0.5
+
+    sim = PoolSyncSimulator(SimulatorConfig(pushlink_window=3))
+
+    async def scenario():
+        async with sim, aiohttp.ClientSession() as session:
+            api = PoolSyncApi(hass=None, base_url=sim.base_url, session=session)
+            return await api.async_pushlink_exchange(None, poll_interval=0.1, timeout=30)
+
+    ok, *_ = _run(scenario())
+    assert not ok
+    # The hub reports the window over about 2 s in: ~20 polls at a fixed 0.1 s
+    assert 5 <= sim.requests["GET pushLink"] <= 14
+
+
+def test_pushlink_many_pairs_hubs_concurrently():
+    sims = [PoolSyncSimulator(SimulatorConfig(press_after=0.3)) for _ in range(5)]
+    sims.append(PoolSyncSimulator(SimulatorConfig(pushlink_window=1)))  # never pressed
+    seen = []
+
+    async def scenario():
+        for sim in sims:
+            await sim.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                started = time.monotonic()
+                results = await async_pushlink_many(
+                    None,
+                    [sim.base_url for sim in sims],
+                    session=session,
+                    poll_interval=0.1,
+                    timeout=5,
+                    on_result=seen.append,
+                )
+                return results, time.monotonic() - started
+        finally:
+            for sim in sims:
+                await sim.stop()
+
+    results, elapsed = _run(scenario())
+    assert [r.base_url for r in results] == [sim.base_url for sim in sims]
+    assert [r.ok for r in results] == [True] * 5 + [False]
+    for sim, result in zip(sims, results[:5]):
+        assert result.mac == sim.mac and result.token == sim.password
+        assert result.user_id in sim.users
+    assert results[-1].error
+    assert len(seen) == 6
+    # Windows overlap: about one pairing, not five in a row
+    assert elapsed < 2.5
@@ -0,0 +1,98 @@
+import asyncio
+import copy
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from homeassistant.components.recorder.statistics import (  # test stubs
+    IMPORTED_STATISTICS,
+    LAST_STATISTICS,
+)
+
+from custom_components.poolsync import statistics as statistics_mod
+from custom_components.poolsync.model import PoolSyncSnapshot
+from custom_components.poolsync.statistics import PoolSyncStatistics
+from test_model import SAMPLE
+
+HOUR = datetime(2024, 6, 3, 10, tzinfo=timezone.utc)
+WIFI = "poolsync:hub0_wifi_disconnects"
+
+
+def _snapshot(wifi_disconnects) -> PoolSyncSnapshot:
+    data = copy.deepcopy(SAMPLE)
+    data["poolSync"]["stats"]["wifiDisconnects"] = wifi_disconnects
+    return PoolSyncSnapshot.from_dict(data)
+
+
+@pytest.fixture
+def record(monkeypatch):
+    """Feed (minutes past 10:00, wifiDisconnects) samples; return WIFI's rows."""
+    IMPORTED_STATISTICS.clear()
+    LAST_STATISTICS.clear()
+
+    def _record(samples, stats=None, flush=False):
+        async def scenario():
+            tasks = []
+            hass = SimpleNamespace(
+                async_create_task=lambda c: tasks.append(asyncio.ensure_future(c))
+            )
+            recorder = stats or PoolSyncStatistics(hass, hub_id="hub0", title="Pool")
+            recorder.hass = hass
+            for minutes, value in samples:
+                now = HOUR + timedelta(minutes=minutes)
+                monkeypatch.setattr(statistics_mod.dt_util, "utcnow", lambda: now)
+                recorder.async_record(_snapshot(value))
+                await asyncio.gather(*tasks)
+            if flush:
+                recorder.async_flush()
+                await asyncio.gather(*tasks)
+            return recorder
+
+        recorder = asyncio.run(scenario())
+        rows = [
+            (row["start"].hour, row["state"], row["sum"])
+            for metadata, batch in IMPORTED_STATISTICS
+            if metadata["statistic_id"] == WIFI
+            for row in batch
+        ]
+        IMPORTED_STATISTICS.clear()
+        return recorder, rows
+
+    yield _record
+    IMPORTED_STATISTICS.clear()
+    LAST_STATISTICS.clear()
+
+
+def test_reset_mid_hour_keeps_growth_before_and_after(record):
+    _, rows = record([(0, 100), (20, 120), (30, 5), (50, 8), (60, 10), (120, 10)])
+    # 100 -> 120, reset, 0 -> 8: 28; then 8 -> 10 in the next hour
+    assert rows == [(10, 8.0, 28.0), (11, 10.0, 30.0)]
+
+
+def test_hours_without_samples_get_no_rows(record):
+    _, rows = record([(0, 5), (10, 6), (190, 9), (250, 9)])
+    # Nothing for 11:00 and 12:00; their growth lands in 13:00
+    assert rows == [(10, 6.0, 1.0), (13, 9.0, 4.0)]
+
+
+def test_sum_continues_from_last_stored_row(record):
+    LAST_STATISTICS[WIFI] = [{"state": 50, "sum": 200}]
+    recorder, rows = record([(0, 55), (60, 3), (120, 4)])
+    # 50 -> 55 since the last stored row; the hub reset before 11:00
+    assert rows == [(10, 55.0, 205.0), (11, 3.0, 208.0)]
+
+    # Only the first import after a restart reads the database
+    LAST_STATISTICS[WIFI] = [{"state": 0, "sum": 0}]
+    _, rows = record([(180, 6)], stats=recorder)
+    assert rows == [(12, 4.0, 209.0)]
+
+
+def test_flush_imports_the_hour_in_progress(record):
+    _, rows = record([(0, 100), (20, 104)], flush=True)
+    assert rows == [(10, 104.0, 4.0)]
+
+    # After a reload the same hour is imported again, continuing the sum
+    LAST_STATISTICS[WIFI] = [{"state": 104, "sum": 4}]
+    _, rows = record([(30, 105), (60, 107)])
+    assert rows == [(10, 105.0, 5.0)]
@@ -0,0 +1,95 @@
+import asyncio
+import copy
+import json
+import os
+from pathlib import Path
+import threading
+from types import SimpleNamespace
+
+from custom_components.poolsync.trace import (
+    SnapshotTraceRecorder,
+    TraceWriter,
+    iter_trace,
+)
+from replay import async_replay
+
+FIXTURE = Path(__file__).parent / "fixtures" / "poolsync_all.json"
+
+
+def _payload() -> dict:
+    return json.loads(FIXTURE.read_text())
+
+
+def test_writer_appends_members_and_reads_back(tmp_path):
+    path = str(tmp_path / "traces" / "hub.jsonl.gz")
+    writer = TraceWriter(path)
+    writer.write([(1.0, {"a": 1}), (2.0, {"a": 2})])
+    writer.write([(3.0, {"a": 3})])
+
+    assert list(iter_trace(path)) == [(1.0, {"a": 1}), (2.0, {"a": 2}), (3.0, {"a": 3})]
+
+
+def test_writer_rotates_by_size(tmp_path):
+    path = str(tmp_path / "hub.jsonl.gz")
+    writer = TraceWriter(path, max_bytes=1, backups=2)
+    for i in range(4):
+        writer.write([(float(i), {"i": i})])
+
+    assert not os.path.exists(path)
+    assert list(iter_trace(path + ".1")) == [(3.0, {"i": 3})]
+    assert list(iter_trace(path + ".2")) == [(2.0, {"i": 2})]
+    assert not os.path.exists(path + ".3")
+
+
+def test_close_waits_for_the_write_in_flight(tmp_path):
+    path = str(tmp_path / "hub.jsonl.gz")
+    writer = TraceWriter(path)
+    release = threading.Event()
+    write = writer.write
+
+    def slow_write(records):
+        release.wait(5)
+        write(records)
+
+    writer.write = slow_write
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        hass = SimpleNamespace(
+            async_create_background_task=lambda coro, name: loop.create_task(coro),
+            async_add_executor_job=lambda fn, *args: loop.run_in_executor(None, fn, *args),
+        )
+        recorder = SnapshotTraceRecorder(hass, writer)
+        recorder.record({"i": 0})
+        await asyncio.sleep(0.01)
+        # Queued while the first batch is still being written
+        recorder.record({"i": 1})
+        closing = asyncio.ensure_future(recorder.async_close())
+        await asyncio.sleep(0.01)
+        assert not closing.done()
+        release.set()
+        await closing
+
+    asyncio.run(scenario())
+
+    assert [data for _, data in iter_trace(path)] == [{"i": 0}, {"i": 1}]
+
+
+def test_replay_counts_writes_and_changes():
+    base = _payload()
+    records = []
+    for i in range(5):
+        data = copy.deepcopy(base)
+        # Only the water temperature moves, and only on every other poll
+        data["devices"]["0"]["status"]["waterTemp"] = 25 + i // 2
+        records.append((1000.0 + 300 * i, data))
+
+    report = asyncio.run(async_replay(records))
+
+    assert report.ticks == 5
+    assert report.entities > 0
+    # Unchanged snapshots (polls 1 and 3) are not fanned out to the entities
+    assert report.state_writes == report.entities * 3
+    # Initial render, then a change at polls 2 and 4
+    assert report.entities < report.state_changes <= report.state_writes
+    assert report.trace_seconds == 1200.0
@@ -0,0 +1,77 @@
+from custom_components.poolsync.util import (
+    REDACTED,
+    LazyRedact,
+    RequestLogSampler,
+    _g,
+    redact,
+    redact_text,
+)
+
+
+def test_g_walks_dicts_and_lists():
+    data = {"devices": {"0": {"stats": [5, 6, 7]}}}
+    assert _g(data, "devices", "0", "stats", 2) == 7
+    assert _g(data, "devices", "0", "stats", 3) is None
+    assert _g(data, "devices", "1", "stats", default={}) == {}
+
+
+def test_redact_masks_credentials_case_insensitively():
+    data = {
+        "macAddress": "AA:BB",
+        "Password": "secret",
+        "headers": {"Authorization": "tok", "user": "uuid", "Accept": "application/json"},
+        "entries": [{"token": "t"}, {"token": None}],
+    }
+    out = redact(data)
+    assert out["macAddress"] == "AA:BB"
+    assert out["Password"] == REDACTED
+    assert out["headers"] == {
+        "Authorization": REDACTED,
+        "user": REDACTED,
+        "Accept": "application/json",
+    }
+    assert out["entries"] == [{"token": REDACTED}, {"token": None}]
+    assert data["Password"] == "secret"
+
+
+def test_lazy_redact_defers_work_until_formatted():
+    data = {"macAddress": "AA:BB", "password": "secret"}
+    lazy = LazyRedact(data)
+    data["password"] = "changed"
+    assert "changed" not in str(lazy) and REDACTED in str(lazy)
+    text = str(LazyRedact(data, limit=20))
+    assert len(text) == 21 and text.endswith("…")
+    assert str(LazyRedact("plain text")) == "plain text"
+
+
+def test_unparsed_bodies_are_redacted():
+    # Truncated JSON, a query string and a header line, none of which parse
+    body = '{"macAddress": "AA:BB", "password": "hunter2", "token": "abc'
+    assert redact_text(body) == (
+        '{"macAddress": "AA:BB", "password": "<redacted>", "token": "<redacted>'
+    )
+    assert redact_text("cmd=pushLink&pass=hunter2") == "cmd=pushLink&pass=<redacted>"
+    assert redact_text("Authorization: tok-1\nAccept: */*") == (
+        "Authorization: <redacted>\nAccept: */*"
+    )
+    # Known secrets go wherever they turn up, keys or not
+    assert redact_text("<html>tok-1 uuid-2</html>", secrets=("tok-1", "uuid-2", None)) == (
+        "<html><redacted> <redacted></html>"
+    )
+    lazy = LazyRedact('{"password": "hunter2"', 100, secrets=("hunter2",))
+    assert "hunter2" not in str(lazy)
+    unmasked = LazyRedact('{"password": "hunter2"', keys=frozenset())
+    assert str(unmasked) == '{"password": "hunter2"'
+
+
+def test_request_log_sampler():
+    sampler = RequestLogSampler(every=3, error_interval=60.0)
+    assert [sampler.success() for _ in range(7)] == [True, False, False, True, False, False, True]
+
+    assert sampler.failure("GET poolSync timeout", now=0.0) == 0
+    assert sampler.failure("GET poolSync timeout", now=10.0) is None
+    assert sampler.failure("GET poolSync timeout", now=20.0) is None
+    # A different failure has its own budget
+    assert sampler.failure("GET poolSync HTTP 500", now=20.0) == 0
+    assert sampler.failure("GET poolSync timeout", now=61.0) == 2
+    assert sampler.failure("GET poolSync timeout", now=62.0) is None